@@ -0,0 +1,87 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from esign_core import Placement, group_by_page, hex_to_rgb01, pdf_fontname, stamp_placements
+
+BASE14_CODES = {"Times-Italic": "tiit", "Helvetica-Bold": "hebo", "Helvetica": "helv"}
+COLORS = ["#1e293b", "#3b82f6"]
+
+
+def make_source(pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((50, 60), f"Page {i + 1}", fontsize=12)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_placements(count, pages, seed=0):
+    rng = random.Random(seed)
+    kinds = ["signature", "date", "text"]
+    return [Placement("JD" if i % 3 else "Initials: JD", kinds[i % 3], rng.uniform(40, 480), rng.uniform(80, 800),
+                      10, COLORS[i % 2], rng.randrange(pages)) for i in range(count)]
+
+
+def stamp_per_placement(doc, placements):
+    # The old loop: one insert_text, and so one content-stream fragment, per placement.
+    for sig in placements:
+        doc[sig.page].insert_text(fitz.Point(sig.x, sig.y), sig.text, fontsize=float(sig.size),
+                                  fontname=pdf_fontname(sig.type), fill=hex_to_rgb01(sig.color))
+
+
+def stamp_text_writers(doc, placements):
+    # The alternative considered: one TextWriter per page and colour (embeds CID copies of the fonts).
+    fonts = {}
+    for page_index, page_placements in group_by_page(doc, placements).items():
+        page = doc[page_index]
+        writers = {}
+        for sig in page_placements:
+            writer = writers.get(sig.color)
+            if writer is None:
+                writer = writers[sig.color] = fitz.TextWriter(page.rect)
+            fontname = pdf_fontname(sig.type)
+            font = fonts.get(fontname)
+            if font is None:
+                font = fonts[fontname] = fitz.Font(BASE14_CODES[fontname])
+            writer.append(fitz.Point(sig.x, sig.y), sig.text, font=font, fontsize=float(sig.size))
+        for color, writer in writers.items():
+            writer.write_text(page, color=hex_to_rgb01(color))
+
+
+def run(name, stamp, source, placements):
+    doc = fitz.open("pdf", source)
+    start = time.perf_counter()
+    stamp(doc, placements)
+    stamped = time.perf_counter() - start
+    data = doc.tobytes()
+    total = time.perf_counter() - start
+    doc.close()
+    print(f"{name:>22} {stamped:>9.2f} {total:>9.2f} {len(data) / 1e6:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-placement insert_text vs batched per-page writes")
+    parser.add_argument("--placements", type=int, default=10000)
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    source = make_source(args.pages)
+    placements = make_placements(args.placements, args.pages)
+    print(f"{args.placements} placements across {args.pages} pages (source {len(source) / 1e6:.2f} MB)")
+    print(f"{'':>22} {'stamp s':>9} {'+save s':>9} {'out MB':>9}")
+    run("insert_text per item", stamp_per_placement, source, placements)
+    run("Shape per page", stamp_placements, source, placements)
+    run("TextWriter per colour", stamp_text_writers, source, placements)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from esign_core import PlacementIndex
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+PADDING = 5
+
+
+def make_boxes(count, pages, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        x = rng.uniform(0, PAGE_WIDTH - 120)
+        y = rng.uniform(0, PAGE_HEIGHT - 20)
+        boxes.append((rng.randrange(pages), (x, y, x + rng.uniform(30, 120), y + rng.uniform(10, 20))))
+    return boxes
+
+
+def linear_hit(boxes, page, x, y):
+    # What get_signature_at_position did, minus the canvas.bbox() round trip it paid per item.
+    for i, (box_page, (x0, y0, x1, y1)) in enumerate(boxes):
+        if box_page == page and x0 - PADDING <= x <= x1 + PADDING and y0 - PADDING <= y <= y1 + PADDING:
+            return i
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Linear scan vs grid index for placement hit-testing")
+    parser.add_argument("--placements", type=int, default=10000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args(argv)
+    for pages in args.pages:
+        run(args.placements, pages, args.queries)
+
+
+def run(placements, pages, queries):
+    boxes = make_boxes(placements, pages)
+    rng = random.Random(1)
+    points = [(rng.randrange(pages), rng.uniform(0, PAGE_WIDTH), rng.uniform(0, PAGE_HEIGHT))
+              for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = PlacementIndex(64)
+    for i, (page, box) in enumerate(boxes):
+        index.insert(i, page, box)
+    build = time.perf_counter() - start
+
+    # The linear scan is slow enough at 10k items that a slice of the queries is plenty.
+    sample = points[:max(1, len(points) // 20)]
+    start = time.perf_counter()
+    expected = [linear_hit(boxes, page, x, y) for page, x, y in sample]
+    linear = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    found = [index.query_point(page, x, y, PADDING) for page, x, y in points]
+    indexed = (time.perf_counter() - start) / len(points)
+    assert found[:len(sample)] == expected, "index and linear scan disagree"
+
+    start = time.perf_counter()
+    for i in range(len(boxes)):
+        index.translate(i, 1.0, 1.0)
+    move = (time.perf_counter() - start) / len(boxes)
+
+    print(f"{placements} placements on {pages} page(s)")
+    print(f"  build index      {build * 1000:10.1f} ms")
+    print(f"  linear hit test  {linear * 1e6:10.1f} us/query")
+    print(f"  grid hit test    {indexed * 1e6:10.1f} us/query  ({linear / indexed:.1f}x)")
+    print(f"  move one item    {move * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
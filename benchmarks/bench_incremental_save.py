@@ -0,0 +1,77 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from esign_core import Placement, save_document, stamp_placements
+
+PLACEMENTS = [
+    Placement("Jane Doe", "signature", 320, 720, 18, "#3b82f6", 0),
+    Placement("October 18, 2026", "date", 320, 750, 14, "#1e293b", 0),
+    Placement("Approved", "text", 60, 750, 14, "#1e293b", -1),
+]
+
+
+def make_source(path, pages):
+    # Noise images compress poorly, so file size grows roughly linearly with page count.
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=595, height=842)
+        image = fitz.Pixmap(fitz.csRGB, 400, 300, os.urandom(400 * 300 * 3), False)
+        page.insert_image(fitz.Rect(50, 50, 545, 420), pixmap=image)
+        page.insert_text((50, 460), f"Scanned page {i + 1}", fontsize=12)
+    doc.save(path)
+    doc.close()
+
+
+def time_full_save(src, out):
+    # What save_pdf does today: re-open the source, stamp, and rewrite everything.
+    start = time.perf_counter()
+    doc = fitz.open(src)
+    stamp_placements(doc, PLACEMENTS)
+    save_document(doc, out)
+    doc.close()
+    return time.perf_counter() - start
+
+
+def time_incremental_save(src, work):
+    shutil.copyfile(src, work)
+    doc = fitz.open(work)  # already open in the viewer, so not timed
+    start = time.perf_counter()
+    stamp_placements(doc, PLACEMENTS)
+    save_document(doc, work, incremental=True)
+    elapsed = time.perf_counter() - start
+    doc.close()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full rewrite vs incremental save as source size grows")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="esign-bench-")
+    try:
+        print(f"{'pages':>6} {'size MB':>8} {'full ms':>9} {'incr ms':>9} {'appended KB':>12}")
+        for pages in args.pages:
+            src = os.path.join(tmp, f"src_{pages}.pdf")
+            make_source(src, pages)
+            size = os.path.getsize(src)
+            full = min(time_full_save(src, os.path.join(tmp, "full.pdf")) for _ in range(args.repeat))
+            work = os.path.join(tmp, "work.pdf")
+            incr = min(time_incremental_save(src, work) for _ in range(args.repeat))
+            appended = os.path.getsize(work) - size
+            print(f"{pages:>6} {size / 1e6:>8.1f} {full * 1000:>9.1f} {incr * 1000:>9.1f} {appended / 1024:>12.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+import pdf_esign
+from esign_core import Placement
+
+
+def legacy_redraw(canvas, placements, zoom_level):
+    # The pre-pooling draw: measure with a throwaway item, then rebuild shadows, background and text.
+    canvas.delete("legacy")
+    for i, sig in enumerate(placements):
+        x, y = pdf_esign.PAGE_MARGIN + sig.x * zoom_level, pdf_esign.PAGE_MARGIN + sig.y * zoom_level
+        font_style = ("Segoe UI", max(1, int(sig.size * zoom_level)))
+        canvas.create_text(x, y, text=sig.text, anchor="nw", font=font_style, fill=sig.color,
+                           tags=(f"lsig_{i}", "legacy"))
+        bbox = canvas.bbox(f"lsig_{i}")
+        canvas.delete(f"lsig_{i}")
+        canvas.create_text(x+2, y+2, text=sig.text, anchor="nw", font=font_style, fill="#e2e8f0",
+                           tags=(f"lsig_shadow2_{i}", "legacy"))
+        canvas.create_text(x+1, y+1, text=sig.text, anchor="nw", font=font_style, fill="#cbd5e1",
+                           tags=(f"lsig_shadow_{i}", "legacy"))
+        canvas.create_rectangle(bbox[0]-6, bbox[1]-6, bbox[2]+6, bbox[3]+6, fill="white", outline="#e2e8f0",
+                                width=1, tags=(f"lsig_bg_{i}", "legacy"))
+        canvas.create_text(x, y, text=sig.text, anchor="nw", font=font_style, fill=sig.color,
+                           tags=(f"lsig_{i}", "legacy"))
+        canvas.tag_lower(f"lsig_shadow2_{i}", f"lsig_shadow_{i}")
+        canvas.tag_lower(f"lsig_shadow_{i}", f"lsig_bg_{i}")
+        canvas.tag_lower(f"lsig_bg_{i}", f"lsig_{i}")
+
+
+def timed(root, func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        root.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full overlay redraw: recreate-per-redraw vs pooled canvas items")
+    parser.add_argument("--placements", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"Needs a display for Tk: {e}")
+        return 1
+
+    tmp = tempfile.mkdtemp(prefix="esign-bench-")
+    try:
+        path = os.path.join(tmp, "form.pdf")
+        doc = fitz.open()
+        doc.new_page(width=595, height=842)
+        doc.save(path)
+        doc.close()
+
+        pdf_esign.filedialog.askopenfilename = lambda **kwargs: path
+        app = pdf_esign.LivePDFESign(root)
+        app.open_pdf()
+        placements = [Placement(f"Field {i}", "text", 20 + (i % 10) * 56, 20 + (i // 10) * 16, 10, "#1e293b", 0)
+                      for i in range(args.placements)]
+        for placement in placements:
+            app.signatures.add(placement)
+        app.redraw_signatures()
+
+        legacy = timed(root, lambda: legacy_redraw(app.canvas, placements, 1.0), args.repeat)
+        app.canvas.delete("legacy")
+        unchanged = timed(root, app.redraw_signatures, args.repeat)
+
+        def rezoom():
+            # Every placement changes font and position, so each pooled item is reconfigured.
+            app.zoom_level = 1.25 if app.zoom_level == 1.0 else 1.0
+            app.redraw_signatures()
+        changed = timed(root, rezoom, args.repeat)
+
+        print(f"{args.placements} placements, median of {args.repeat}")
+        print(f"  recreate items        {legacy:8.1f} ms")
+        print(f"  pooled, all changed   {changed:8.1f} ms  ({legacy / changed:.1f}x)")
+        print(f"  pooled, unchanged     {unchanged:8.1f} ms  ({legacy / unchanged:.1f}x)")
+        app.render_pool.shutdown()
+        root.destroy()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from PIL import Image
+
+from esign_render import pixmap_to_image
+
+
+def make_a4_page():
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i in range(60):
+        page.insert_text((40, 40 + i * 13), f"Line {i:02d} - The quick brown fox jumps over the lazy dog. " * 2,
+                         fontsize=9)
+    page.draw_rect(fitz.Rect(300, 600, 550, 800), color=(0.2, 0.3, 0.8), fill=(0.9, 0.9, 1.0))
+    return doc, page
+
+
+def ppm_path(pix):
+    img = Image.open(io.BytesIO(pix.tobytes("ppm")))
+    img.load()
+    return img
+
+
+def buffer_path(pix):
+    img = pixmap_to_image(pix)
+    img.load()
+    return img
+
+
+def time_path(func, pix, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(pix)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def try_photo_factory():
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+        return root, ImageTk.PhotoImage
+    except Exception:
+        return None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PPM and sample-buffer pixmap conversion")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--zooms", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    args = parser.parse_args(argv)
+
+    doc, page = make_a4_page()
+    root, photo_factory = try_photo_factory()
+
+    print(f"{'zoom':>5} {'pixels':>10} {'ppm ms':>9} {'buffer ms':>10} {'speedup':>8}"
+          + (f" {'ppm+tk ms':>10} {'buf+tk ms':>10}" if photo_factory else ""))
+    for zoom in args.zooms:
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        ppm_ms = time_path(ppm_path, pix, args.repeat)
+        buf_ms = time_path(buffer_path, pix, args.repeat)
+        line = f"{zoom:>5.1f} {pix.width * pix.height:>10} {ppm_ms:>9.2f} {buf_ms:>10.2f} {ppm_ms / buf_ms:>7.1f}x"
+        if photo_factory:
+            ppm_tk = time_path(lambda p: photo_factory(ppm_path(p)), pix, args.repeat)
+            buf_tk = time_path(lambda p: photo_factory(buffer_path(p)), pix, args.repeat)
+            line += f" {ppm_tk:>10.2f} {buf_tk:>10.2f}"
+        print(line)
+
+    if root is not None:
+        root.destroy()
+    doc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import gc
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from esign_core import Placement
+
+
+def make_dicts(count):
+    # Today's shape once drawn: the PDF fields plus the canvas keys the viewer used to add.
+    return [{"text": "JD", "type": "text", "x": 500.0 + i % 7, "y": 780.0, "size": 10.0, "color": "#1e293b",
+             "page": i, "canvas_x": 525.0, "canvas_y": 805.0, "canvas_id": 1000 + i} for i in range(count)]
+
+
+def make_records(count):
+    return [Placement("JD", "text", 500.0 + i % 7, 780.0, 10.0, "#1e293b", i) for i in range(count)]
+
+
+def measure(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    items = factory(count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    payload = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+    dump = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(payload)
+    load = time.perf_counter() - start
+    return size, len(payload), dump, load
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory and pickling cost of placement dicts vs slotted records")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count} placements")
+    print(f"{'':>16} {'memory MB':>10} {'bytes/item':>11} {'pickle MB':>10} {'dump ms':>8} {'load ms':>8}")
+    for name, factory in (("dict", make_dicts), ("Placement", make_records)):
+        size, pickled, dump, load = measure(factory, args.count)
+        print(f"{name:>16} {size / 1e6:>10.1f} {size / args.count:>11.0f} {pickled / 1e6:>10.1f} "
+              f"{dump * 1000:>8.1f} {load * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
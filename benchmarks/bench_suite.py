@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz
+import PIL
+
+from esign_core import (PLACEMENT_TYPES, SAVE_PROFILES, Placement, PlacementIndex, default_text_metrics,
+                        sign_pdf)
+from esign_render import samples_to_image
+
+SUITE_VERSION = 1
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+PRESETS = {
+    "quick": {"pages": [1, 50], "placements": [0, 1000], "kinds": ["text", "image"]},
+    "full": {"pages": [1, 100, 1000, 5000], "placements": [0, 1000, 50000], "kinds": ["text", "image"]},
+}
+# Metrics whose name ends like this are better when higher; everything else is better when lower.
+HIGHER_IS_BETTER = ("_per_sec",)
+COLORS = ["#1e293b", "#3b82f6", "#ef4444"]
+LOREM = "The quick brown fox jumps over the lazy dog while the committee reviews clause {}. "
+
+
+def make_document(path, pages, kind, seed=0):
+    # Text-heavy pages carry ~60 lines of Helvetica; image-heavy pages a full-bleed noise scan.
+    # Scans share a handful of image objects so 5,000 pages stay a manageable file.
+    rng = random.Random(seed)
+    doc = fitz.open()
+    image_xrefs = []
+    for i in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        if kind == "image":
+            rect = fitz.Rect(30, 30, PAGE_WIDTH - 30, PAGE_HEIGHT - 60)
+            if len(image_xrefs) < 4:
+                noise = fitz.Pixmap(fitz.csRGB, 600, 850, rng.randbytes(600 * 850 * 3), False)
+                image_xrefs.append(page.insert_image(rect, pixmap=noise))
+            else:
+                page.insert_image(rect, xref=image_xrefs[i % len(image_xrefs)])
+            page.insert_text((40, PAGE_HEIGHT - 30), f"Scanned page {i + 1}", fontsize=10)
+        else:
+            lines = [LOREM.format(i * 60 + line)[:95] for line in range(60)]
+            page.insert_text((40, 40), lines, fontsize=9, lineheight=1.45)
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+    return path
+
+
+def make_placements(count, pages, seed=0):
+    rng = random.Random(seed)
+    return [Placement(f"JD {i}" if i % 3 else "Jane Doe", PLACEMENT_TYPES[i % 3], rng.uniform(20, 480),
+                      rng.uniform(30, 800), rng.choice([10, 14, 18]), COLORS[i % 3], rng.randrange(pages))
+            for i in range(count)]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def sample_pages(pages, count):
+    if pages <= count:
+        return list(range(pages))
+    step = pages / count
+    return [int(i * step) for i in range(count)]
+
+
+def bench_render(path, pages, zoom, page_count):
+    # Rasterize a spread of pages, then wrap the samples the way the viewer does.
+    doc = fitz.open(path)
+    raster, convert, pixels = [], [], 0
+    try:
+        for index in sample_pages(pages, page_count):
+            page = doc[index]
+            start = time.perf_counter()
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            raster.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            image = samples_to_image(pix.samples_mv, pix.width, pix.height, pix.stride, pix.alpha, pix.n)
+            image.load()
+            convert.append(time.perf_counter() - start)
+            pixels += pix.width * pix.height
+    finally:
+        doc.close()
+    total = sum(raster) + sum(convert)
+    return {
+        "pages_rendered": len(raster),
+        "raster_ms_median": statistics.median(raster) * 1000,
+        "raster_ms_p95": percentile(raster, 0.95) * 1000,
+        "convert_ms_median": statistics.median(convert) * 1000,
+        "pages_per_sec": len(raster) / total if total else 0.0,
+        "megapixels_per_sec": pixels / 1e6 / total if total else 0.0,
+    }
+
+
+def bench_hit_test(placements, pages, queries, seed=1):
+    # Boxes sized from real PDF text widths, as the overlay would index them at zoom 1.
+    start = time.perf_counter()
+    index = PlacementIndex()
+    for item_id, sig in enumerate(placements):
+        width = default_text_metrics.pdf_width(sig.text, sig.type, float(sig.size))
+        index.insert(item_id, sig.page, (sig.x, sig.y, sig.x + width, sig.y + sig.size * 1.3))
+    build = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    points = [(rng.randrange(pages), rng.uniform(0, PAGE_WIDTH), rng.uniform(0, PAGE_HEIGHT)) for _ in range(queries)]
+    latencies, hits = [], 0
+    for page, x, y in points:
+        start = time.perf_counter_ns()
+        found = index.query_point(page, x, y, 5)
+        latencies.append(time.perf_counter_ns() - start)
+        hits += found is not None
+    return {
+        "build_ms": build * 1000,
+        "query_us_median": statistics.median(latencies) / 1000,
+        "query_us_p95": percentile(latencies, 0.95) / 1000,
+        "query_us_p99": percentile(latencies, 0.99) / 1000,
+        "hit_ratio": hits / len(points),
+    }
+
+
+def bench_save(path, placements, work_dir, profile, incremental, repeat):
+    # The same calls save_pdf and save_pdf_in_place make, minus the UI thread hand-off.
+    times, size = [], 0
+    for attempt in range(repeat):
+        if incremental:
+            out = os.path.join(work_dir, "incremental.pdf")
+            shutil.copyfile(path, out)
+            start = time.perf_counter()
+            sign_pdf(out, placements, out, incremental=True)
+        else:
+            out = os.path.join(work_dir, f"{profile}.pdf")
+            start = time.perf_counter()
+            sign_pdf(path, placements, out, profile=profile)
+        times.append(time.perf_counter() - start)
+        size = os.path.getsize(out)
+        os.remove(out)
+    return {
+        "save_s_median": statistics.median(times),
+        "save_s_min": min(times),
+        "output_bytes": size,
+        "source_bytes": os.path.getsize(path),
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def environment(args):
+    commit, dirty = git_revision()
+    return {
+        "suite_version": SUITE_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def run_suite(args, report=print):
+    preset = PRESETS[args.preset]
+    kinds = args.kinds or preset["kinds"]
+    page_counts = args.pages or preset["pages"]
+    placement_counts = args.placements if args.placements is not None else preset["placements"]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="esign-suite-")
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+
+    def add(bench, params, metrics):
+        case_id = "/".join([bench] + [f"{k}={v}" for k, v in params.items()])
+        results.append({"id": case_id, "bench": bench, "params": params, "metrics": metrics})
+        shown = "  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items())
+        report(f"{case_id:<48} {shown}")
+
+    try:
+        for kind in kinds:
+            for pages in page_counts:
+                path = os.path.join(work_dir, f"{kind}-{pages}.pdf")
+                if not os.path.exists(path):
+                    start = time.perf_counter()
+                    make_document(path, pages, kind)
+                    report(f"# generated {os.path.basename(path)} in {time.perf_counter() - start:.1f} s")
+                for zoom in args.zooms:
+                    add("render", {"kind": kind, "pages": pages, "zoom": zoom},
+                        bench_render(path, pages, zoom, args.render_pages))
+                for count in placement_counts:
+                    placements = make_placements(count, pages)
+                    if kind == kinds[0] and count:
+                        add("hit_test", {"pages": pages, "placements": count},
+                            bench_hit_test(placements, pages, args.queries))
+                    for profile in args.profiles:
+                        add("save", {"kind": kind, "pages": pages, "placements": count, "mode": profile},
+                            bench_save(path, placements, work_dir, profile, False, args.repeat))
+                    add("save", {"kind": kind, "pages": pages, "placements": count, "mode": "incremental"},
+                        bench_save(path, placements, work_dir, None, True, args.repeat))
+    finally:
+        if args.work_dir is None and not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {"environment": environment(args), "results": results}
+
+
+def compare(baseline, current, threshold, report=print):
+    # Pairs results by id and flags metrics that moved the wrong way by more than the threshold.
+    old = {result["id"]: result["metrics"] for result in baseline["results"]}
+    regressions = 0
+    report(f"comparing against {baseline['environment'].get('commit') or 'unknown commit'}"
+           f" ({baseline['environment'].get('timestamp')})")
+    for result in current["results"]:
+        before = old.get(result["id"])
+        if before is None:
+            continue
+        for name, value in result["metrics"].items():
+            base = before.get(name)
+            if not isinstance(value, (int, float)) or not base or name in ("hit_ratio", "pages_rendered",
+                                                                           "source_bytes"):
+                continue
+            change = (value - base) / base
+            worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+            if worse > threshold:
+                regressions += 1
+                flag = "REGRESSION"
+            elif worse < -threshold:
+                flag = "improved"
+            else:
+                continue
+            report(f"{flag:<10} {result['id']:<48} {name:<20} {base:>12.4g} -> {value:<12.4g} ({change:+.1%})")
+    report(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless render, hit-test and save benchmarks on synthetic PDFs")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--kinds", nargs="+", choices=["text", "image"], default=None)
+    parser.add_argument("--pages", type=int, nargs="+", default=None, help="document sizes (overrides the preset)")
+    parser.add_argument("--placements", type=int, nargs="+", default=None,
+                        help="placement counts (overrides the preset)")
+    parser.add_argument("--zooms", type=float, nargs="+", default=[1.0, 2.0])
+    parser.add_argument("--render-pages", type=int, default=10, help="pages rasterized per document")
+    parser.add_argument("--queries", type=int, default=20000, help="hit-test queries per case")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(SAVE_PROFILES), default=sorted(SAVE_PROFILES))
+    parser.add_argument("--repeat", type=int, default=3, help="saves per case; the median is reported")
+    parser.add_argument("--work-dir", default=None, help="keep generated PDFs here and reuse them across runs")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary work directory")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", default=None,
+                        help="results file from an earlier commit to diff against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {len(results['results'])} results to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1184 @@
+import argparse
+import bisect
+import contextlib
+import datetime
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+PLACEMENT_TYPES = ("signature", "text", "date")
+DEFAULT_SIZES = {"signature": 18, "text": 14, "date": 14}
+DEFAULT_COLORS = {"signature": "#3b82f6", "text": "#1e293b", "date": "#1e293b"}
+PDF_FONTS = {"signature": "Times-Italic", "date": "Helvetica-Bold", "text": "Helvetica"}
+SAVE_PROFILES = {
+    # Interactive saves: objects are written as they are, with no garbage collection or recompression.
+    "fast": {"garbage": 0, "deflate": False, "deflate_images": False, "deflate_fonts": False},
+    # Archival and email: drop unused objects, deflate everything and pack objects into streams.
+    # garbage=3 would also merge duplicates, but that pass is quadratic and took 30 s on a 21k-object file.
+    "compact": {"garbage": 2, "deflate": True, "deflate_images": True, "deflate_fonts": True, "use_objstms": 1},
+}
+DEFAULT_SAVE_PROFILE = "fast"
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class SaveCancelled(Exception):
+    pass
+
+
+class PageRangeError(IndexError):
+    pass
+
+
+def hex_to_rgb01(color_str):
+    if not color_str:
+        return (0, 0, 0)
+    s = color_str.strip()
+    if s.startswith("#"):
+        s = s[1:]
+    if len(s) == 3:
+        s = "".join([c * 2 for c in s])
+    try:
+        r = int(s[0:2], 16) / 255.0
+        g = int(s[2:4], 16) / 255.0
+        b = int(s[4:6], 16) / 255.0
+        return (r, g, b)
+    except Exception:
+        return (0, 0, 0)
+
+
+def pdf_fontname(sig_type):
+    return PDF_FONTS.get(sig_type, "Helvetica")
+
+
+class Placement:
+    # PDF-space data only; anything the viewer draws is tracked by the viewer, keyed by item id.
+    __slots__ = ("text", "type", "x", "y", "size", "color", "page")
+
+    def __init__(self, text, sig_type, x, y, size, color, page=0):
+        self.text = text
+        self.type = sig_type
+        self.x = x
+        self.y = y
+        self.size = size
+        self.color = color
+        self.page = page
+
+    @classmethod
+    def from_dict(cls, data):
+        # Every kind of bad input raises ValueError, so loaders only have one exception to report.
+        if not isinstance(data, dict):
+            raise ValueError(f"Placement must be a JSON object: {data!r}")
+        sig_type = data.get("type", "text")
+        if sig_type not in PLACEMENT_TYPES:
+            raise ValueError(f"Unknown placement type: {sig_type!r}")
+        if "text" not in data or "x" not in data or "y" not in data:
+            raise ValueError(f"Placement needs text, x and y: {data!r}")
+        try:
+            x, y = float(data["x"]), float(data["y"])
+            size = float(data.get("size", DEFAULT_SIZES[sig_type]))
+            page = int(data.get("page", 0))
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(f"Invalid placement {data!r}: {e}") from None
+        if not all(math.isfinite(value) for value in (x, y, size)) or size <= 0:
+            raise ValueError(f"Placement needs finite x and y and a positive size: {data!r}")
+        return cls(str(data["text"]), sig_type, x, y, size, data.get("color", DEFAULT_COLORS[sig_type]), page)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def copy(self):
+        return Placement(self.text, self.type, self.x, self.y, self.size, self.color, self.page)
+
+    def __reduce__(self):
+        # A flat tuple pickles far smaller than the default slots state dict.
+        return Placement, (self.text, self.type, self.x, self.y, self.size, self.color, self.page)
+
+    def __repr__(self):
+        return f"Placement({self.text!r}, {self.type!r}, {self.x}, {self.y}, page={self.page})"
+
+
+class TextMetrics:
+    # LRU of text extents keyed by (text, font family, style, size, zoom); safe to share with a save thread.
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, compute):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def pdf_width(self, text, sig_type, size):
+        fontname = pdf_fontname(sig_type)
+        return self.lookup((text, fontname, "pdf", size, 1.0),
+                           lambda: fitz.get_text_length(text, fontname=fontname, fontsize=size))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+default_text_metrics = TextMetrics()
+
+
+class LatencyHistogram:
+    # Fixed log-spaced buckets: constant memory however many samples arrive.
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th sample, never more than the largest sample seen.
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {f"<={bound}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets) if n},
+            "overflow": self.buckets[-1],
+        }
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NO_TIMER = contextlib.nullcontext()
+
+
+class Profiler:
+    # Counters and latency histograms for the hot paths. When disabled, timer() hands back a shared
+    # no-op context and record()/count() return straight away.
+    def __init__(self, enabled=False, report_path="esign_profile.json"):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NO_TIMER
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = LatencyHistogram()
+            histogram.add(seconds * 1000)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timing(self, name):
+        with self.lock:
+            histogram = self.timings.get(name)
+            return histogram.to_dict() if histogram is not None else None
+
+    def report(self, extra=None):
+        with self.lock:
+            report = {
+                "uptime_s": round(time.perf_counter() - self.started, 3),
+                "counters": dict(self.counters),
+                "timings": {name: h.to_dict() for name, h in sorted(self.timings.items())},
+            }
+        if extra:
+            report.update(extra)
+        return report
+
+    def dump(self, path=None, extra=None):
+        path = path or self.report_path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(extra), f, indent=2)
+        return path
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.timings.clear()
+            self.started = time.perf_counter()
+
+
+profiler = Profiler(os.environ.get("ESIGN_PROFILE", "") not in ("", "0"),
+                    os.environ.get("ESIGN_PROFILE_REPORT", "esign_profile.json"))
+
+
+def load_placements(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("placements", [])
+    return [Placement.from_dict(item) for item in data]
+
+
+def resolve_page_index(doc, page_index):
+    # Negative indices count from the end, so templates can target "the last page".
+    page_count = len(doc)
+    resolved = page_index + page_count if page_index < 0 else page_index
+    if not 0 <= resolved < page_count:
+        raise PageRangeError(f"Page index {page_index} is out of range for a {page_count}-page document")
+    return resolved
+
+
+class PlacementStore:
+    # Placements bucketed by page under stable ids, so deleting one never renumbers the rest.
+    def __init__(self):
+        self.items = {}
+        self.pages = {}
+        self.next_id = 1
+
+    def add(self, placement, item_id=None):
+        if item_id is None:
+            item_id = self.next_id
+        self.next_id = max(self.next_id, item_id + 1)
+        self.items[item_id] = placement
+        self.pages.setdefault(placement.page, {})[item_id] = placement
+        return item_id
+
+    def remove(self, item_id):
+        placement = self.items.pop(item_id)
+        bucket = self.pages[placement.page]
+        del bucket[item_id]
+        if not bucket:
+            del self.pages[placement.page]
+        return placement
+
+    def move(self, item_id, page):
+        placement = self.remove(item_id)
+        placement.page = page
+        self.add(placement, item_id)
+        return placement
+
+    def on_page(self, page):
+        return list(self.pages.get(page, {}).items())
+
+    def count_on_page(self, page):
+        return len(self.pages.get(page, ()))
+
+    def by_page(self):
+        for page in sorted(self.pages):
+            yield page, list(self.pages[page].values())
+
+    def snapshot(self):
+        copy = PlacementStore()
+        for item_id, placement in self.items.items():
+            copy.add(placement.copy(), item_id)
+        return copy
+
+    def clear(self):
+        self.items.clear()
+        self.pages.clear()
+
+    def __getitem__(self, item_id):
+        return self.items[item_id]
+
+    def __contains__(self, item_id):
+        return item_id in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items.values())
+
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".esign-journal"
+
+
+def journal_path(pdf_path):
+    return pdf_path + JOURNAL_SUFFIX
+
+
+def _pdf_signature(pdf_path):
+    # Size and mtime tell us whether the PDF still matches the session that wrote the journal.
+    st = os.stat(pdf_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def apply_journal_op(store, op, forward=True):
+    kind = op["op"]
+    if kind in ("add", "delete"):
+        if (kind == "add") == forward:
+            store.add(Placement.from_dict(op["placement"]), op["id"])
+        else:
+            store.remove(op["id"])
+        return
+    fields = op["after"] if forward else op["before"]
+    if "page" in fields and fields["page"] != store[op["id"]].page:
+        store.move(op["id"], fields["page"])
+    placement = store[op["id"]]
+    for name, value in fields.items():
+        setattr(placement, name, value)
+
+
+class SessionJournal:
+    # Append-only JSON lines beside the PDF: a header, an optional compacted base, then one line per
+    # add/move/edit/delete plus undo/redo markers. Replaying it rebuilds the placements and the
+    # undo history without touching the PDF.
+    def __init__(self, pdf_path, compact_every=2000, keep_history=200):
+        self.pdf_path = pdf_path
+        self.path = journal_path(pdf_path)
+        self.compact_every = compact_every
+        self.keep_history = keep_history
+        self.history = []
+        self.cursor = 0
+        self.lines = 0
+        self.file = None
+
+    def restore(self, store):
+        # Returns how many placements came back; a missing, stale or unreadable journal starts afresh.
+        store.clear()
+        self.history = []
+        self.cursor = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                header = json.loads(f.readline() or "null")
+                if not isinstance(header, dict) or header.get("journal") != JOURNAL_VERSION or \
+                        header.get("pdf") != _pdf_signature(self.pdf_path):
+                    raise ValueError("journal does not match this PDF")
+                self.lines = 1
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # torn last write from a crash
+                    self.replay(store, json.loads(line))
+                    self.lines += 1
+        except FileNotFoundError:
+            self.lines = 0
+            return 0
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            # Valid JSON of the wrong shape lands here too. Kept aside rather than deleted, in case the
+            # placements are worth recovering by hand; if even that fails, the next edit overwrites it.
+            self.close()
+            try:
+                os.replace(self.path, self.path + ".bad")
+            except OSError:
+                pass
+            store.clear()
+            self.history = []
+            self.cursor = 0
+            self.lines = 0
+            return 0
+        # Rewritten straight away, so a torn last line never sits in front of new appends.
+        self.compact(store)
+        return len(store)
+
+    def replay(self, store, op):
+        kind = op["op"]
+        if kind == "base":
+            for item_id, data in op["items"]:
+                store.add(Placement.from_dict(data), item_id)
+            store.next_id = max(store.next_id, op.get("next_id", 1))
+        elif kind == "undo":
+            if self.cursor == 0:
+                raise IndexError("undo marker with nothing to undo")
+            self.cursor -= 1
+            apply_journal_op(store, self.history[self.cursor], forward=False)
+        elif kind == "redo":
+            apply_journal_op(store, self.history[self.cursor])
+            self.cursor += 1
+        else:
+            apply_journal_op(store, op)
+            del self.history[self.cursor:]
+            self.history.append(op)
+            self.cursor += 1
+
+    def header(self):
+        return json.dumps({"journal": JOURNAL_VERSION, "pdf": _pdf_signature(self.pdf_path)}) + "\n"
+
+    def append(self, op):
+        # Flushed per line: an app crash loses nothing, without paying for an fsync on every drop.
+        # The file only appears once there is something to keep.
+        if self.file is None:
+            self.file = open(self.path, "a" if self.lines else "w", encoding="utf-8")
+            if not self.lines:
+                self.file.write(self.header())
+                self.lines = 1
+        self.file.write(json.dumps(op, separators=(",", ":")) + "\n")
+        self.file.flush()
+        self.lines += 1
+
+    def record(self, store, op):
+        # The caller has already changed the store; this makes the change durable and undoable.
+        del self.history[self.cursor:]
+        self.history.append(op)
+        self.cursor += 1
+        self.append(op)
+        if self.lines >= self.compact_every:
+            self.compact(store)
+
+    def record_add(self, store, item_id):
+        self.record(store, {"op": "add", "id": item_id, "placement": store[item_id].to_dict()})
+
+    def record_delete(self, store, item_id, placement):
+        self.record(store, {"op": "delete", "id": item_id, "placement": placement.to_dict()})
+
+    def record_change(self, store, kind, item_id, before):
+        placement = store[item_id]
+        after = {name: getattr(placement, name) for name in before}
+        if after != before:
+            self.record(store, {"op": kind, "id": item_id, "before": before, "after": after})
+
+    def can_undo(self):
+        return self.cursor > 0
+
+    def can_redo(self):
+        return self.cursor < len(self.history)
+
+    def undo(self, store):
+        if not self.can_undo():
+            return None
+        self.cursor -= 1
+        op = self.history[self.cursor]
+        apply_journal_op(store, op, forward=False)
+        self.append({"op": "undo"})
+        return op
+
+    def redo(self, store):
+        if not self.can_redo():
+            return None
+        op = self.history[self.cursor]
+        apply_journal_op(store, op)
+        self.cursor += 1
+        self.append({"op": "redo"})
+        return op
+
+    def compact(self, store):
+        # Folds everything older than the last keep_history undo steps into one base line and swaps
+        # the new file in atomically. Undone steps are dropped: redo doesn't survive a compaction, so
+        # nothing undone can come back on a later replay.
+        done = self.history[:self.cursor]
+        kept = done[-self.keep_history:] if self.keep_history else []
+        base = PlacementStore()
+        for item_id, placement in store.items.items():
+            base.add(placement.copy(), item_id)
+        for op in reversed(kept):
+            apply_journal_op(base, op, forward=False)
+        base.next_id = store.next_id
+        self.history = kept
+        self.cursor = len(kept)
+        if not base.items and not kept:
+            self.discard()
+            return
+        part = partial_path(self.path)
+        with open(part, "w", encoding="utf-8") as f:
+            f.write(self.header())
+            f.write(json.dumps({"op": "base", "next_id": base.next_id,
+                                "items": [[item_id, p.to_dict()] for item_id, p in base.items.items()]},
+                               separators=(",", ":")) + "\n")
+            for op in kept:
+                f.write(json.dumps(op, separators=(",", ":")) + "\n")
+        self.close()
+        os.replace(part, self.path)
+        self.lines = 2 + len(kept)
+
+    def reset(self):
+        # The PDF itself changed (e.g. placements were saved into it); what was journaled no longer applies.
+        self.history = []
+        self.cursor = 0
+        self.discard()
+
+    def close(self, store=None):
+        if store is not None and self.lines:
+            self.compact(store)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        self.close()
+        self.lines = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+WORD_INDEX_VERSION = 1
+WORD_INDEX_CACHE_MB = 256
+# Pruning scans the whole cache directory, so each process does it on its first write and then every so often.
+WORD_INDEX_PRUNE_EVERY = 64
+ANCHOR_POSITIONS = ("right", "left", "above", "below")
+WORD_PUNCTUATION = ".,:;!?()[]{}\"'"
+
+
+def normalize_word(word):
+    return word.strip(WORD_PUNCTUATION).casefold()
+
+
+class WordIndex:
+    # Every word on every page with its box, plus a map from each normalized word to where it occurs,
+    # so a rule costs a dict lookup instead of a search_for pass over every page.
+    def __init__(self, pages):
+        self.pages = pages
+        self.positions = {}
+        for page_index, words in enumerate(pages):
+            for word_index, word in enumerate(words):
+                self.positions.setdefault(normalize_word(word[4]), []).append((page_index, word_index))
+
+    @classmethod
+    def build(cls, doc):
+        pages = []
+        for page in doc:
+            pages.append([(round(w[0], 2), round(w[1], 2), round(w[2], 2), round(w[3], 2), w[4])
+                          for w in page.get_text("words", sort=True)])
+        return cls(pages)
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def find(self, phrase, pages=None):
+        # Consecutive words matching the phrase, in document order, as (page, box) pairs.
+        tokens = [normalize_word(token) for token in phrase.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+        matches = []
+        for page_index, word_index in self.positions.get(tokens[0], ()):
+            if pages is not None and page_index not in pages:
+                continue
+            words = self.pages[page_index]
+            run = words[word_index:word_index + len(tokens)]
+            if len(run) == len(tokens) and all(normalize_word(w[4]) == t for w, t in zip(run, tokens)):
+                matches.append((page_index, (min(w[0] for w in run), min(w[1] for w in run),
+                                             max(w[2] for w in run), max(w[3] for w in run))))
+        return matches
+
+    def to_dict(self):
+        return {"version": WORD_INDEX_VERSION, "pages": self.pages}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != WORD_INDEX_VERSION:
+            raise ValueError("Word index was written by a different version")
+        return cls([[tuple(word) for word in words] for words in data["pages"]])
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def word_index_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("ESIGN_CACHE_DIR") or os.path.join(base, "pdf_esign", "words")
+
+
+def word_index_cache_limit():
+    try:
+        return int(float(os.environ.get("ESIGN_CACHE_MAX_MB", WORD_INDEX_CACHE_MB)) * 1024 * 1024)
+    except ValueError:
+        return WORD_INDEX_CACHE_MB * 1024 * 1024
+
+
+def prune_word_index_cache(cache_dir, max_bytes):
+    # Least recently used first: a cache hit refreshes its entry's mtime. Trims to 80% of the cap so
+    # the next few writes don't each trigger another pass.
+    entries = []
+    total = 0
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+    except OSError:
+        return 0
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes * 0.8:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # Another worker pruning the same directory got there first.
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+_word_cache_writes = {"count": 0}
+
+
+def load_word_index(pdf_path, doc=None, cache_dir=None, max_bytes=None):
+    # Cached by content hash, so a renamed or copied file still hits and an edited one never does.
+    cache_dir = cache_dir or word_index_cache_dir()
+    cache_path = os.path.join(cache_dir, file_sha256(pdf_path) + ".json")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            index = WordIndex.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    else:
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return index
+    own_doc = doc is None
+    if own_doc:
+        doc = fitz.open(pdf_path)
+    try:
+        index = WordIndex.build(doc)
+    finally:
+        if own_doc:
+            doc.close()
+    # The cache is an optimization; failing to write it is not an error.
+    part = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # A unique temp name per writer: batch and service workers may build the same hash at once.
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_dir, prefix=".words-", suffix=".part",
+                                         delete=False) as f:
+            part = f.name
+            json.dump(index.to_dict(), f, separators=(",", ":"))
+        os.replace(part, cache_path)
+    except OSError:
+        if part is not None:
+            with contextlib.suppress(OSError):
+                os.remove(part)
+        return index
+    _word_cache_writes["count"] += 1
+    if (_word_cache_writes["count"] - 1) % WORD_INDEX_PRUNE_EVERY == 0:
+        prune_word_index_cache(cache_dir, word_index_cache_limit() if max_bytes is None else max_bytes)
+    return index
+
+
+class AnchorRule:
+    # "Put <text> <offset>pt <position> of the words <anchor>", on the first or every occurrence.
+    __slots__ = ("anchor", "text", "type", "position", "offset", "occurrence", "pages", "size", "color")
+
+    def __init__(self, anchor, text, sig_type="signature", position="right", offset=10.0, occurrence="first",
+                 pages=None, size=None, color=None):
+        self.anchor = anchor
+        self.text = text
+        self.type = sig_type
+        self.position = position
+        self.offset = offset
+        self.occurrence = occurrence
+        self.pages = pages
+        self.size = size if size is not None else DEFAULT_SIZES[sig_type]
+        self.color = color or DEFAULT_COLORS[sig_type]
+
+    @classmethod
+    def from_dict(cls, data):
+        sig_type = data.get("type", "signature")
+        if sig_type not in PLACEMENT_TYPES:
+            raise ValueError(f"Unknown placement type: {sig_type!r}")
+        if not str(data.get("anchor", "")).strip() or "text" not in data:
+            raise ValueError(f"Rule needs anchor and text: {data!r}")
+        position = data.get("position", "right")
+        if position not in ANCHOR_POSITIONS:
+            raise ValueError(f"Unknown position {position!r}; expected one of {', '.join(ANCHOR_POSITIONS)}")
+        occurrence = data.get("occurrence", "first")
+        if occurrence not in ("first", "all"):
+            raise ValueError(f"Unknown occurrence {occurrence!r}; expected 'first' or 'all'")
+        pages = data.get("pages")
+        return cls(str(data["anchor"]), str(data["text"]), sig_type, position, float(data.get("offset", 10)),
+                   occurrence, None if pages is None else [int(p) for p in pages],
+                   float(data["size"]) if "size" in data else None, data.get("color"))
+
+
+def load_anchor_rules(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("rules", [])
+    return [AnchorRule.from_dict(item) for item in data]
+
+
+def resolve_anchor_rules(index, rules, metrics=None, today=None):
+    # Returns the placements the rules produce and the rules whose anchor text was not found.
+    metrics = metrics or default_text_metrics
+    date_text = (today or datetime.date.today()).strftime("%B %d, %Y")
+    placements, missing = [], []
+    for rule in rules:
+        pages = None
+        if rule.pages is not None:
+            pages = {p + index.page_count if p < 0 else p for p in rule.pages}
+        hits = index.find(rule.anchor, pages)
+        if not hits:
+            missing.append(rule)
+            continue
+        if rule.occurrence == "first":
+            hits = hits[:1]
+        text = rule.text.replace("{date}", date_text)
+        width = metrics.pdf_width(text, rule.type, float(rule.size))
+        for page_index, (x0, y0, x1, y1) in hits:
+            # Word boxes include the descender; stamped text sits on its baseline.
+            baseline = y1 - 0.2 * (y1 - y0)
+            if rule.position == "right":
+                x, y = x1 + rule.offset, baseline
+            elif rule.position == "left":
+                x, y = x0 - rule.offset - width, baseline
+            elif rule.position == "above":
+                x, y = x0, y0 - rule.offset
+            else:
+                x, y = x0, y1 + rule.offset + rule.size
+            placements.append(Placement(text, rule.type, max(0.0, x), max(0.0, y), rule.size, rule.color, page_index))
+    return placements, missing
+
+
+def group_by_page(doc, placements):
+    pages = {}
+    if isinstance(placements, PlacementStore):
+        for page, items in placements.by_page():
+            pages.setdefault(resolve_page_index(doc, page), []).extend(items)
+        return pages
+    for sig in placements:
+        pages.setdefault(resolve_page_index(doc, sig.page), []).append(sig)
+    return pages
+
+
+def check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise SaveCancelled()
+
+
+def stamp_placements(doc, placements, progress=None, cancel=None, metrics=None):
+    metrics = metrics or default_text_metrics
+    pages = group_by_page(doc, placements)
+    for done, (page_index, page_placements) in enumerate(pages.items(), 1):
+        check_cancelled(cancel)
+        page = doc[page_index]
+        # One Shape per page: a single content-stream fragment instead of one per placement.
+        shape = page.new_shape()
+        for sig in page_placements:
+            # Keep the whole run of text on the page, not just its starting point.
+            width = metrics.pdf_width(sig.text, sig.type, float(sig.size))
+            x = max(0, min(sig.x, page.rect.width - width))
+            y = max(0, min(sig.y, page.rect.height - 2))
+            shape.insert_text(
+                fitz.Point(x, y),
+                sig.text,
+                fontsize=float(sig.size),
+                fontname=pdf_fontname(sig.type),
+                fill=hex_to_rgb01(sig.color),
+            )
+        shape.commit()
+        if progress is not None:
+            progress("stamp", done, len(pages))
+
+
+class PlacementIndex:
+    # Uniform grid per page over placement boxes in PDF points; point queries never touch the canvas.
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.pages = {}
+        self.boxes = {}
+
+    def cells(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, key, page, bbox):
+        self.remove(key)
+        x0, y0, x1, y1 = bbox
+        grid = self.pages.setdefault(page, {})
+        for cell in self.cells(x0, y0, x1, y1):
+            grid.setdefault(cell, {})[key] = (x0, y0, x1, y1)
+        self.boxes[key] = (page, x0, y0, x1, y1)
+
+    def remove(self, key):
+        entry = self.boxes.pop(key, None)
+        if entry is None:
+            return
+        page, x0, y0, x1, y1 = entry
+        grid = self.pages[page]
+        for cell in self.cells(x0, y0, x1, y1):
+            bucket = grid.get(cell)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del grid[cell]
+
+    def translate(self, key, dx, dy):
+        entry = self.boxes.get(key)
+        if entry is not None:
+            page, x0, y0, x1, y1 = entry
+            self.insert(key, page, (x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+
+    def clear_page(self, page):
+        for bucket in self.pages.pop(page, {}).values():
+            for key in bucket:
+                self.boxes.pop(key, None)
+
+    def clear(self):
+        self.pages.clear()
+        self.boxes.clear()
+
+    def query_point(self, page, x, y, padding=0):
+        grid = self.pages.get(page)
+        if not grid:
+            return None
+        found = None
+        for cell in self.cells(x - padding, y - padding, x + padding, y + padding):
+            bucket = grid.get(cell)
+            if not bucket:
+                continue
+            for key, (x0, y0, x1, y1) in bucket.items():
+                if x0 - padding <= x <= x1 + padding and y0 - padding <= y <= y1 + padding:
+                    # Lowest key wins, matching the order items were placed.
+                    if found is None or key < found:
+                        found = key
+        return found
+
+
+def can_save_incrementally(doc, out_path):
+    return (bool(doc.name) and os.path.abspath(out_path) == os.path.abspath(doc.name)
+            and doc.can_save_incrementally())
+
+
+def partial_path(out_path):
+    return out_path + ".part"
+
+
+def save_options(doc, profile):
+    if profile not in SAVE_PROFILES:
+        raise ValueError(f"Unknown save profile: {profile!r} (choose from {', '.join(SAVE_PROFILES)})")
+    if profile == "compact":
+        try:
+            doc.subset_fonts()
+        except Exception:
+            # Subsetting is a size optimisation only; keep the full fonts if MuPDF can't do it.
+            pass
+    return SAVE_PROFILES[profile]
+
+
+def save_document(doc, out_path, incremental=False, cancel=None, profile=DEFAULT_SAVE_PROFILE):
+    check_cancelled(cancel)
+    if incremental:
+        # An append can't garbage-collect or recompress what is already on disk, so profiles don't apply.
+        if not can_save_incrementally(doc, out_path):
+            raise ValueError("Incremental save needs an unrepaired document written back to its own file")
+        # Appends only the objects changed since the file was opened.
+        doc.save(doc.name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+        return
+    # Full saves go through a side file so a cancelled or failed write never leaves a torn PDF behind.
+    options = save_options(doc, profile)
+    part = partial_path(out_path)
+    try:
+        doc.save(part, **options)
+        check_cancelled(cancel)
+        os.replace(part, out_path)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+
+def sign_pdf(src_path, placements, out_path, incremental=False, progress=None, cancel=None, metrics=None,
+             profile=DEFAULT_SAVE_PROFILE):
+    doc = fitz.open(src_path)
+    try:
+        with profiler.timer("stamp"):
+            stamp_placements(doc, placements, progress, cancel, metrics)
+        with profiler.timer("save"):
+            save_document(doc, out_path, incremental=incremental, cancel=cancel, profile=profile)
+    finally:
+        doc.close()
+    return out_path
+
+
+def compare_profiles(src_path, placements, repeat=1, report=print):
+    tmp = tempfile.mkdtemp(prefix="esign-profiles-")
+    results = {}
+    try:
+        report(f"{'profile':>10} {'save ms':>10} {'size KB':>10} {'vs source':>10}")
+        source_size = os.path.getsize(src_path)
+        for profile in SAVE_PROFILES:
+            out_path = os.path.join(tmp, f"{profile}.pdf")
+            seconds = min(_timed_sign(src_path, placements, out_path, profile) for _ in range(repeat))
+            size = os.path.getsize(out_path)
+            results[profile] = {"seconds": seconds, "bytes": size}
+            report(f"{profile:>10} {seconds * 1000:>10.1f} {size / 1024:>10.1f} {size / source_size:>9.0%}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def _timed_sign(src_path, placements, out_path, profile):
+    start = time.perf_counter()
+    sign_pdf(src_path, placements, out_path, profile=profile)
+    return time.perf_counter() - start
+
+
+_batch_settings = {"placements": [], "profile": DEFAULT_SAVE_PROFILE, "rules": []}
+
+
+def _init_batch_worker(placements, profile=DEFAULT_SAVE_PROFILE, rules=()):
+    _batch_settings["placements"] = placements
+    _batch_settings["profile"] = profile
+    _batch_settings["rules"] = list(rules)
+
+
+def _sign_batch_file(job):
+    src_path, out_path = job
+    start = time.perf_counter()
+    missing = []
+    try:
+        placements = _batch_settings["placements"]
+        if _batch_settings["rules"]:
+            # Anchors differ per document, so rules are resolved here against its cached word index.
+            anchored, missing = resolve_anchor_rules(load_word_index(src_path), _batch_settings["rules"])
+            placements = list(placements) + anchored
+        sign_pdf(src_path, placements, out_path, profile=_batch_settings["profile"])
+        error = None
+        size = os.path.getsize(out_path)
+    except Exception as e:
+        error = str(e)
+        size = 0
+    return src_path, out_path, time.perf_counter() - start, size, error, [rule.anchor for rule in missing]
+
+
+def find_batch_jobs(input_dir, output_dir, pattern="*.pdf", recursive=False, suffix="_signed"):
+    search = os.path.join(input_dir, "**", pattern) if recursive else os.path.join(input_dir, pattern)
+    jobs = []
+    for src_path in sorted(glob.glob(search, recursive=recursive)):
+        if not os.path.isfile(src_path):
+            continue
+        relative = os.path.relpath(src_path, input_dir)
+        stem, ext = os.path.splitext(relative)
+        jobs.append((src_path, os.path.join(output_dir, stem + suffix + ext)))
+    return jobs
+
+
+def batch_sign(jobs, placements, workers=None, report=print, profile=DEFAULT_SAVE_PROFILE, rules=()):
+    for out_dir in {os.path.dirname(out_path) for _, out_path in jobs}:
+        os.makedirs(out_dir or ".", exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # Small chunks keep per-file progress flowing while amortising IPC over large runs.
+    chunksize = max(1, min(32, len(jobs) // (workers * 8) or 1))
+    done = failed = incomplete = total_bytes = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(placements, profile, rules)) as executor:
+        for src_path, out_path, seconds, size, error, missing in executor.map(_sign_batch_file, jobs,
+                                                                              chunksize=chunksize):
+            done += 1
+            total_bytes += size
+            # Workers are separate processes, so the parent records each file's round trip.
+            profiler.record("batch_file", seconds)
+            profiler.count("batch_failed" if error else "batch_signed")
+            if error:
+                failed += 1
+                report(f"FAILED {seconds * 1000:8.1f} ms  {src_path}: {error}")
+            else:
+                report(f"ok     {seconds * 1000:8.1f} ms {size / 1024:9.1f} KB  {src_path} -> {out_path}")
+            if missing:
+                incomplete += 1
+                report(f"       anchor not found: {', '.join(repr(anchor) for anchor in missing)}")
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    report(f"{done} documents ({failed} failed, {incomplete} missing anchors) in {elapsed:.2f} s - "
+           f"{rate:.1f} docs/sec with {workers} workers, {total_bytes / 1e6:.1f} MB written ({profile} profile)")
+    return {"documents": done, "failed": failed, "missing_anchors": incomplete, "seconds": elapsed,
+            "docs_per_sec": rate, "bytes": total_bytes}
+
+
+def run_batch(args):
+    if not args.template and not args.rules:
+        print("batch needs a --template, --rules, or both", file=sys.stderr)
+        return 2
+    placements = load_placements(args.template) if args.template else []
+    rules = load_anchor_rules(args.rules) if args.rules else []
+    jobs = find_batch_jobs(args.input_dir, args.output_dir, args.pattern, args.recursive, args.suffix)
+    if not jobs:
+        print(f"No files matching {args.pattern!r} in {args.input_dir}", file=sys.stderr)
+        return 1
+    summary = batch_sign(jobs, placements, workers=args.workers, profile=args.profile, rules=rules)
+    # Like the anchors command: a document signed without one of its anchored items is not a success.
+    return 1 if summary["failed"] or summary["missing_anchors"] else 0
+
+
+def run_anchors(args):
+    rules = load_anchor_rules(args.rules)
+    start = time.perf_counter()
+    placements, missing = resolve_anchor_rules(load_word_index(args.pdf), rules)
+    elapsed = time.perf_counter() - start
+    data = json.dumps([p.to_dict() for p in placements], indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+    for rule in missing:
+        print(f"anchor not found: {rule.anchor!r}", file=sys.stderr)
+    print(f"{len(placements)} placement(s) from {len(rules)} rule(s) in {elapsed * 1000:.0f} ms", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def run_serve(args):
+    from esign_service import serve
+    try:
+        return serve(args.host, args.port, workers=args.workers, max_queue=args.queue, max_mb=args.max_mb,
+                     timeout=args.timeout, profile=args.profile, verbose=args.verbose)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+
+def run_profiles(args):
+    compare_profiles(args.pdf, load_placements(args.template), repeat=args.repeat)
+    return 0
+
+
+CLI_COMMANDS = ("batch", "anchors", "serve", "profiles")
+
+
+def is_cli_invocation(argv):
+    # pdf_esign.py opens the editor unless the first argument after the shared --perf flags is a command.
+    args = iter(argv)
+    for arg in args:
+        if arg == "--perf" or arg.startswith("--perf-report="):
+            continue
+        if arg == "--perf-report":
+            next(args, None)
+            continue
+        return arg in CLI_COMMANDS
+    return False
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pdf_esign", description="Headless PDF e-sign tools")
+    parser.add_argument("--perf", action="store_true",
+                        help="time the hot paths and write a JSON report on exit (also ESIGN_PROFILE=1)")
+    parser.add_argument("--perf-report", default=None, metavar="PATH",
+                        help=f"where --perf writes its report (default: {profiler.report_path})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="apply a placement template to every PDF in a directory",
+                                description="Exits 1 if any document failed or had an anchor that wasn't found.")
+    batch.add_argument("input_dir")
+    batch.add_argument("output_dir")
+    batch.add_argument("-t", "--template", default=None,
+                       help="JSON list of placements (text, type, x, y, size, color, page)")
+    batch.add_argument("-r", "--rules", default=None,
+                       help="JSON list of anchor rules (anchor, text, type, position, offset, occurrence, pages)")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    batch.add_argument("--pattern", default="*.pdf")
+    batch.add_argument("--recursive", action="store_true")
+    batch.add_argument("--suffix", default="_signed", help="appended to each output file name")
+    batch.add_argument("--profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                       help="fast: no garbage collection or recompression; compact: smallest output")
+    batch.set_defaults(func=run_batch)
+
+    anchors = commands.add_parser("anchors", help="resolve anchor rules against one PDF and print the placements")
+    anchors.add_argument("pdf")
+    anchors.add_argument("-r", "--rules", required=True,
+                         help="JSON list of anchor rules (anchor, text, type, position, offset, occurrence, pages)")
+    anchors.add_argument("-o", "--output", default=None, help="write the placements here as a batch template")
+    anchors.set_defaults(func=run_anchors)
+
+    serve = commands.add_parser("serve", help="run a localhost HTTP service that signs uploaded PDFs")
+    serve.add_argument("--host", default="127.0.0.1", help="loopback address to listen on")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("-w", "--workers", type=int, default=None,
+                       help="worker processes (default: CPU count - 1)")
+    serve.add_argument("--queue", type=int, default=16,
+                       help="requests allowed to wait for a worker before answering 429")
+    serve.add_argument("--max-mb", type=int, default=256, help="largest PDF accepted, in MB")
+    serve.add_argument("--timeout", type=float, default=300, help="seconds a single signing may take")
+    serve.add_argument("--profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                       help="save profile when the request doesn't name one")
+    serve.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    serve.set_defaults(func=run_serve)
+
+    profiles = commands.add_parser("profiles", help="sign one PDF with every save profile and compare size and time")
+    profiles.add_argument("pdf")
+    profiles.add_argument("-t", "--template", required=True,
+                          help="JSON list of placements (text, type, x, y, size, color, page)")
+    profiles.add_argument("--repeat", type=int, default=3)
+    profiles.set_defaults(func=run_profiles)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.perf:
+        profiler.enabled = True
+    if args.perf_report:
+        profiler.report_path = args.perf_report
+    try:
+        return args.func(args)
+    finally:
+        if profiler.enabled:
+            print(f"Performance report: {profiler.dump()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
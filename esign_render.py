@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict, deque
+
+from PIL import Image
+
+from esign_core import profiler
+
+PIXMAP_MODES = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}
+
+
+def samples_to_image(samples, width, height, stride, alpha=False, n=None):
+    # Wraps the raw sample buffer directly; no PPM encode/decode round trip.
+    mode = PIXMAP_MODES[n if n is not None else (4 if alpha else 3)]
+    return Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1)
+
+
+def pixmap_to_image(pix):
+    samples = pix.samples_mv if hasattr(pix, "samples_mv") else pix.samples
+    return samples_to_image(samples, pix.width, pix.height, pix.stride, pix.alpha, pix.n)
+
+
+class FrameScheduler:
+    # Coalesces UI updates into at most one batch per frame; root only needs Tk's after/after_idle.
+    def __init__(self, root, frame_ms=16, history=240):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.pending = OrderedDict()
+        self.job = None
+        self.last_frame = 0.0
+        self.frame_times = deque(maxlen=history)
+        self.frames = 0
+        self.posted = 0
+        self.coalesced = 0
+
+    def post(self, name, callback, *args):
+        # Only the latest update per name survives until the next frame.
+        self.posted += 1
+        if name in self.pending:
+            self.coalesced += 1
+        self.pending[name] = (callback, args)
+        if self.job is None:
+            wait = self.frame_ms - (time.perf_counter() - self.last_frame) * 1000
+            if wait > 0:
+                self.job = self.root.after(int(wait) + 1, self.run_frame)
+            else:
+                self.job = self.root.after_idle(self.run_frame)
+
+    def cancel(self, name):
+        self.pending.pop(name, None)
+
+    def flush(self, name):
+        update = self.pending.pop(name, None)
+        if update is not None:
+            callback, args = update
+            callback(*args)
+
+    def run_frame(self):
+        self.job = None
+        start = time.perf_counter()
+        updates, self.pending = self.pending, OrderedDict()
+        for callback, args in updates.values():
+            callback(*args)
+        self.last_frame = time.perf_counter()
+        self.frame_times.append((self.last_frame - start) * 1000)
+        self.frames += 1
+        profiler.record("frame", self.last_frame - start)
+
+    def stats(self):
+        times = sorted(self.frame_times)
+        return {
+            "frames": self.frames,
+            "posted": self.posted,
+            "coalesced": self.coalesced,
+            "avg_ms": (sum(times) / len(times)) if times else 0.0,
+            "p95_ms": times[int(len(times) * 0.95)] if times else 0.0,
+            "max_ms": times[-1] if times else 0.0,
+        }
+
+
+class PageRenderCache:
+    # LRU of rendered buffers bounded by bytes and entries; keys lead with the document token.
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return
+        self.entries[key] = (value, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def invalidate_document(self, doc_token):
+        for key in [k for k in self.entries if k[0] == doc_token]:
+            self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,512 @@
+import ipaddress
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import HeaderParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import fitz
+
+from esign_core import (DEFAULT_SAVE_PROFILE, SAVE_PROFILES, AnchorRule, LatencyHistogram, PageRangeError,
+                        Placement, load_word_index, resolve_anchor_rules, sign_pdf)
+
+# POST /sign[?profile=fast|compact], with Content-Length or chunked transfer encoding, as either
+#   application/pdf       the PDF as the body; placements and anchor rules as JSON lists in the
+#                         X-Placements and X-Rules headers, which http.server caps at 64 KB a line
+#   multipart/form-data   a "pdf" part plus "placements" and/or "rules" parts holding the same JSON
+#                         lists; for placement sets too large for a header
+#   -> 200 application/pdf, 400 bad request, 413 too large, 422 PDF or placements can't be signed,
+#      429 queue full, 431 headers too large, 500 worker crashed, 504 timed out
+# Clients sending "Expect: 100-continue" hear about 429 and 431 before uploading anything.
+# GET /metrics -> JSON counters, throughput, queue depth and latency histogram
+# GET /healthz -> 200 "ok"
+
+COPY_CHUNK = 64 * 1024
+MAX_PART_HEADERS = 16 * 1024
+MULTIPART_FIELDS = ("pdf", "placements", "rules")
+
+
+def _warm_worker():
+    # Pays fitz's import and font setup once per worker instead of on the first request.
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "warm", fontname="Times-Italic")
+    doc.tobytes()
+    doc.close()
+    fitz.get_text_length("warm", fontname="Helvetica-Bold")
+
+
+def _sign_job(in_path, out_path, placements, rules, profile):
+    # Pages are resolved like the batch CLI's, negative ones from the end, inside sign_pdf's one open.
+    start = time.perf_counter()
+    missing = []
+    if rules:
+        anchored, missing = resolve_anchor_rules(load_word_index(in_path), rules)
+        placements = list(placements) + anchored
+    sign_pdf(in_path, placements, out_path, profile=profile)
+    return len(placements), [rule.anchor for rule in missing], time.perf_counter() - start
+
+
+def _start_pool(workers, warm=True):
+    # Spawned, not forked: pools are started while request threads are running.
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    if warm:
+        # Start every worker now so the first requests don't pay for process start-up.
+        for future in [executor.submit(time.sleep, 0) for _ in range(workers)]:
+            future.result()
+    return executor
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SigningJob:
+    # Holds an admission slot and two temp files, handed back only once no worker can still be using them.
+    def __init__(self, service):
+        self.service = service
+        name = uuid.uuid4().hex
+        self.in_path = os.path.join(service.tmp_dir, name + "-in.pdf")
+        self.out_path = os.path.join(service.tmp_dir, name + "-out.pdf")
+        self.abandoned = False
+
+    def finish(self):
+        for path in (self.in_path, self.out_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.service.release()
+
+
+class SigningService:
+    # Admission is a semaphore sized to the workers plus the queue, taken before the body is read,
+    # so an overloaded service turns callers away cheaply instead of spooling uploads it can't serve.
+    def __init__(self, workers=None, max_queue=16, max_bytes=256 * 1024 * 1024, timeout=300,
+                 profile=DEFAULT_SAVE_PROFILE, tmp_dir=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_queue = max_queue
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.profile = profile
+        self.tmp_dir = tmp_dir or tempfile.mkdtemp(prefix="esign-service-")
+        self.executor = _start_pool(self.workers)
+        self.pool_lock = threading.Lock()
+        self.slots = threading.Semaphore(self.workers + max_queue)
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.admitted = 0
+        self.signing = 0
+        self.counters = {"requests": 0, "signed": 0, "failed": 0, "rejected": 0, "timed_out": 0,
+                         "worker_restarts": 0, "bytes_in": 0, "bytes_out": 0}
+        self.latency = LatencyHistogram()
+        self.completions = deque(maxlen=10000)
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    def admit(self):
+        with self.lock:
+            self.counters["requests"] += 1
+        if not self.slots.acquire(blocking=False):
+            self.count("rejected")
+            return False
+        with self.lock:
+            self.admitted += 1
+        return True
+
+    def is_full(self):
+        with self.lock:
+            return self.admitted >= self.capacity
+
+    def reject(self):
+        with self.lock:
+            self.counters["requests"] += 1
+            self.counters["rejected"] += 1
+
+    def release(self):
+        with self.lock:
+            self.admitted -= 1
+        self.slots.release()
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def track(self, future):
+        # Counted until the worker is done with it, whether or not anyone is still waiting.
+        with self.lock:
+            self.signing += 1
+        future.add_done_callback(self.untrack)
+
+    def untrack(self, future):
+        with self.lock:
+            self.signing -= 1
+
+    def submit(self, args):
+        executor = self.executor
+        try:
+            future = executor.submit(_sign_job, *args)
+        except BrokenProcessPool:
+            executor = self.restart_pool(executor)
+            future = executor.submit(_sign_job, *args)
+        self.track(future)
+        return executor, future
+
+    def restart_pool(self, broken):
+        # Only the first request to notice replaces the pool; the others pick up its replacement.
+        with self.pool_lock:
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = _start_pool(self.workers)
+                self.count("worker_restarts")
+            return self.executor
+
+    def run_isolated(self, job, args, deadline):
+        # One throwaway process: if this PDF is what killed the pool, it crashes only itself this time.
+        executor = _start_pool(1, warm=False)
+        try:
+            future = executor.submit(_sign_job, *args)
+        finally:
+            executor.shutdown(wait=False)
+        self.track(future)
+        return self.wait(job, future, deadline)
+
+    def wait(self, job, future, deadline):
+        try:
+            return future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except TimeoutError:
+            # A running worker can't be interrupted, so the slot and the files stay taken until it is done
+            # with them; otherwise repeated timeouts would let work pile up past the queue bound.
+            future.cancel()
+            job.abandoned = True
+            future.add_done_callback(lambda f: job.finish())
+            self.count("timed_out")
+            raise RequestError(504, f"Signing took longer than {self.timeout:g} s")
+
+    def sign(self, job, placements, rules, profile):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        args = (job.in_path, job.out_path, placements, rules, profile)
+        try:
+            executor, future = self.submit(args)
+            try:
+                result = self.wait(job, future, deadline)
+            except BrokenProcessPool:
+                # A worker died - MuPDF crashing on a hostile PDF, say - and failed every job in its pool.
+                # The pool is replaced for everyone, and each of those jobs gets one more try on its own.
+                self.restart_pool(executor)
+                result = self.run_isolated(job, args, deadline)
+        except BrokenProcessPool:
+            self.count("failed")
+            raise RequestError(500, "The signing worker crashed on this PDF")
+        except Exception:
+            self.count("failed")
+            raise
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.counters["signed"] += 1
+            self.latency.add(elapsed * 1000)
+            self.completions.append(time.perf_counter())
+        return result
+
+    def metrics(self):
+        now = time.perf_counter()
+        with self.lock:
+            uptime = now - self.started
+            recent = sum(1 for t in self.completions if now - t <= 60)
+            return {
+                "uptime_s": round(uptime, 3),
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.admitted,
+                "signing": self.signing,
+                # Jobs handed to the pool beyond what the workers can run at once are waiting.
+                "queue_depth": max(0, self.signing - self.workers),
+                **self.counters,
+                "docs_per_sec": round(self.counters["signed"] / uptime, 3) if uptime > 0 else 0.0,
+                "docs_per_sec_1m": round(recent / min(60.0, uptime), 3) if uptime > 0 else 0.0,
+                "latency": self.latency.to_dict(),
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def _parse_json_list(value, parse, what):
+    if not value:
+        return []
+    try:
+        data = json.loads(value)
+        if not isinstance(data, list):
+            raise ValueError(f"{what} must be a JSON list")
+        return [parse(item) for item in data]
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise RequestError(400, f"Invalid {what}: {e}")
+
+
+def read_multipart(chunks, boundary, open_part):
+    # Streams a multipart/form-data body part by part; open_part(name) returns a write callable.
+    # Only a delimiter's worth of bytes is held back between chunks, so a large PDF part goes
+    # straight through to its file.
+    delimiter = b"\r\n--" + boundary
+    chunks = iter(chunks)
+    buf = b"\r\n"  # the first delimiter has no CRLF in front of it
+
+    def more(buf):
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise RequestError(400, "Multipart body ended early")
+        return buf + chunk
+
+    while (i := buf.find(delimiter)) < 0:
+        buf = more(buf[-len(delimiter):])
+    buf = buf[i + len(delimiter):]
+    while True:
+        while len(buf) < 2:
+            buf = more(buf)
+        if buf.startswith(b"--"):
+            for _ in chunks:
+                pass  # epilogue
+            return
+        if not buf.startswith(b"\r\n"):
+            raise RequestError(400, "Malformed multipart delimiter")
+        while (end := buf.find(b"\r\n\r\n", 2)) < 0:
+            if len(buf) > MAX_PART_HEADERS:
+                raise RequestError(400, "Multipart part headers are too large")
+            buf = more(buf)
+        headers = HeaderParser().parsestr(buf[2:end].decode("latin-1"))
+        write = open_part(headers.get_param("name", header="content-disposition"))
+        buf = buf[end + 4:]
+        while (i := buf.find(delimiter)) < 0:
+            keep = len(delimiter)
+            if len(buf) > keep:
+                write(buf[:-keep])
+                buf = buf[-keep:]
+            buf = more(buf)
+        write(buf[:i])
+        buf = buf[i + len(delimiter):]
+
+
+class SigningRequestHandler(BaseHTTPRequestHandler):
+    server_version = "pdf-esign/1"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self.send_json(200, self.service.metrics())
+        elif path == "/healthz":
+            self.send_bytes(200, b"ok\n", "text/plain")
+        else:
+            self.send_json(404, {"error": f"No such endpoint: {path}"})
+
+    def handle_expect_100(self):
+        if urlparse(self.path).path == "/sign" and self.service.is_full():
+            self.service.reject()
+            self.reject_busy()
+            return False
+        return super().handle_expect_100()
+
+    def reject_busy(self):
+        # The body is never read, so this connection can't carry another request.
+        self.close_connection = True
+        self.send_json(429, {"error": "Signing queue is full, retry shortly"}, {"Retry-After": "1"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/sign":
+            self.close_connection = True
+            self.send_json(404, {"error": f"No such endpoint: {url.path}"})
+            return
+        if not self.service.admit():
+            self.reject_busy()
+            return
+        job = SigningJob(self.service)
+        try:
+            profile = parse_qs(url.query).get("profile", [self.service.profile])[0]
+            if profile not in SAVE_PROFILES:
+                raise RequestError(400, f"Unknown profile {profile!r}; expected one of {', '.join(sorted(SAVE_PROFILES))}")
+            fields = {"placements": self.headers.get("X-Placements"), "rules": self.headers.get("X-Rules")}
+            if self.headers.get_content_type() == "multipart/form-data":
+                fields.update(self.receive_multipart(job.in_path))
+            else:
+                with open(job.in_path, "wb") as f:
+                    for chunk in self.body_chunks():
+                        f.write(chunk)
+            placements = _parse_json_list(fields["placements"], Placement.from_dict, "placements")
+            rules = _parse_json_list(fields["rules"], AnchorRule.from_dict, "rules")
+            if not placements and not rules:
+                raise RequestError(400, "Send placements and/or anchor rules, in headers or multipart parts")
+            count, missing, seconds = self.service.sign(job, placements, rules, profile)
+            headers = {"X-Esign-Placements": str(count), "X-Esign-Seconds": f"{seconds:.3f}"}
+            if missing:
+                headers["X-Esign-Missing-Anchors"] = json.dumps(missing)
+            self.send_file(job.out_path, headers)
+        except RequestError as e:
+            self.fail(e.status, str(e))
+        except PageRangeError as e:
+            self.fail(422, str(e))
+        except (fitz.FileDataError, ValueError, IndexError, KeyError) as e:
+            # The details name server-side temp files; they go to the log, not the caller.
+            self.log_error("could not sign upload: %r", e)
+            self.fail(422, "Could not read or sign this PDF")
+        except Exception as e:
+            self.log_error("signing failed: %r", e)
+            self.fail(500, "Failed to sign PDF")
+        finally:
+            if not job.abandoned:
+                job.finish()
+
+    def fail(self, status, message):
+        self.close_connection = True
+        self.send_json(status, {"error": message})
+
+    def body_chunks(self):
+        # Yields the body as it arrives; nothing here holds more than one chunk.
+        limit = self.service.max_bytes
+        too_large = RequestError(413, f"Upload is larger than {limit / (1024 * 1024):g} MB")
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            total = 0
+            while True:
+                try:
+                    size = int(self.rfile.readline(1024).split(b";")[0].strip() or b"0", 16)
+                except ValueError:
+                    raise RequestError(400, "Malformed chunked body")
+                if size == 0:
+                    while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                total += size
+                if total > limit:
+                    raise too_large
+                yield from self.read_exact(size)
+                self.rfile.readline(1024)
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise RequestError(411, "Content-Length or chunked transfer encoding required")
+        try:
+            length = int(length)
+        except ValueError:
+            raise RequestError(400, "Malformed Content-Length")
+        if length > limit:
+            raise too_large
+        yield from self.read_exact(length)
+
+    def read_exact(self, remaining):
+        while remaining:
+            chunk = self.rfile.read(min(COPY_CHUNK, remaining))
+            if not chunk:
+                raise RequestError(400, "Request body ended early")
+            self.service.count("bytes_in", len(chunk))
+            remaining -= len(chunk)
+            yield chunk
+
+    def receive_multipart(self, pdf_path):
+        boundary = self.headers.get_param("boundary")
+        if not boundary:
+            raise RequestError(400, "multipart/form-data needs a boundary")
+        fields = {}
+        with open(pdf_path, "wb") as pdf:
+            def open_part(name):
+                if name not in MULTIPART_FIELDS:
+                    raise RequestError(400, f"Unexpected part {name!r}; expected {', '.join(MULTIPART_FIELDS)}")
+                if name in fields:
+                    raise RequestError(400, f"Part {name!r} was sent twice")
+                if name == "pdf":
+                    fields[name] = True
+                    return pdf.write
+                fields[name] = bytearray()
+                return fields[name].extend
+            read_multipart(self.body_chunks(), boundary.encode("latin-1"), open_part)
+        if "pdf" not in fields:
+            raise RequestError(400, "Multipart body has no 'pdf' part")
+        del fields["pdf"]
+        return fields
+
+    def send_file(self, path, headers):
+        size = os.path.getsize(path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(size))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, COPY_CHUNK)
+        self.service.count("bytes_out", size)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_bytes(status, (json.dumps(payload, indent=2) + "\n").encode("utf-8"), "application/json", headers)
+
+    def send_bytes(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(host="127.0.0.1", port=8765, workers=None, max_queue=16, max_mb=256, timeout=300,
+          profile=DEFAULT_SAVE_PROFILE, verbose=False, ready=None):
+    if not is_loopback(host):
+        raise ValueError(f"The signing service only listens on loopback addresses, not {host!r}")
+    server = ThreadingHTTPServer((host, port), SigningRequestHandler)
+    service = SigningService(workers=workers, max_queue=max_queue, max_bytes=max_mb * 1024 * 1024,
+                             timeout=timeout, profile=profile)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    print(f"Signing service on http://{host}:{server.server_address[1]} - {service.workers} workers, "
+          f"queue {max_queue}, {profile} profile", file=sys.stderr)
+    if threading.current_thread() is threading.main_thread():
+        # SIGTERM stops the server like Ctrl+C, so the worker pool and temp files get cleaned up.
+        # shutdown() waits for serve_forever, which runs on this thread, hence the helper thread.
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    if ready is not None:
+        ready(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
@@ -1,13 +1,35 @@
+import sys
+
+import esign_core
+
+if __name__ == "__main__" and esign_core.is_cli_invocation(sys.argv[1:]):
+    # The headless commands run on servers without Tk, so they dispatch before the GUI imports.
+    sys.exit(esign_core.main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from tkinter import ttk
+from tkinter import font as tkfont
+import argparse
 import fitz
-from PIL import Image, ImageTk
-import io
+from PIL import Image, ImageDraw, ImageFont, ImageTk
 import os
+import bisect
 from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import queue
+import threading
 import time
 
+from esign_core import (DEFAULT_SAVE_PROFILE, SAVE_PROFILES, Placement, PlacementIndex, PlacementStore,
+                        SaveCancelled, SessionJournal,
+                        load_anchor_rules, load_word_index, profiler, resolve_anchor_rules,
+                        TextMetrics, can_save_incrementally, partial_path, save_document, sign_pdf,
+                        stamp_placements)
+from esign_render import FrameScheduler, PageRenderCache, samples_to_image
+
 class SignatureDialog(simpledialog.Dialog):
     def __init__(self, parent, sig_type="text", initial=""):
         self.sig_type = sig_type
@@ -29,8 +51,222 @@ class SignatureDialog(simpledialog.Dialog):
     def apply(self):
         self.result = self.entry.get().strip()
 
+PAGE_MARGIN = 25
+PAGE_GAP = 16
+TILE_SIZE = 512
+MIN_ZOOM = 0.25
+MAX_ZOOM = 8.0
+ZOOM_STEP = 1.25
+THUMB_WIDTH = 110
+THUMB_PAD = 12
+THUMB_LABEL = 18
+
+PageBuffer = namedtuple("PageBuffer", "width height stride n alpha samples")
+PageGeometry = namedtuple("PageGeometry", "width height rotation")
+
+def read_page_geometry(doc):
+    # Read once at open time so the UI thread never has to call into fitz afterwards.
+    geometry = []
+    for page in doc:
+        geometry.append(PageGeometry(page.rect.width, page.rect.height, page.rotation))
+    return geometry
+
+def buffer_to_photo(buf):
+    with profiler.timer("to_photo"):
+        return ImageTk.PhotoImage(samples_to_image(buf.samples, buf.width, buf.height, buf.stride, buf.alpha, buf.n))
+
+SPRITE_MARGIN = 14
+SPRITE_FONT_FILES = {
+    ("Times", "italic"): ["timesi.ttf", "Times New Roman Italic.ttf", "LiberationSerif-Italic.ttf",
+                          "DejaVuSerif-Italic.ttf", "DejaVuSerif.ttf"],
+    ("Segoe UI", "bold"): ["segoeuib.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf"],
+    ("Segoe UI", ""): ["segoeui.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+}
+_sprite_fonts = {}
+
+def sprite_font(family, size, style):
+    font = _sprite_fonts.get((family, size, style))
+    if font is None:
+        for name in SPRITE_FONT_FILES.get((family, style), []):
+            try:
+                font = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        else:
+            font = ImageFont.load_default(size=size)
+        _sprite_fonts[(family, size, style)] = font
+    return font
+
+def render_placement_sprite(text, font_style, color, selected, accent):
+    # Background, text and (when selected) the selection frame, flattened into one RGBA image.
+    family, size = font_style[0], font_style[1]
+    font = sprite_font(family, size, font_style[2] if len(font_style) > 2 else "")
+    ascent, descent = font.getmetrics()
+    width, height = int(font.getlength(text)) + 1, ascent + descent
+    m = SPRITE_MARGIN
+    image = Image.new("RGBA", (width + 2 * m, height + 2 * m), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((m - 6, m - 6, m + width + 6, m + height + 6), fill="white", outline="#e2e8f0")
+    draw.text((m, m), text, font=font, fill=color)
+    if selected:
+        draw.rectangle((m - 8, m - 8, m + width + 8, m + height + 8), outline=accent + "80", width=3)
+        draw.rectangle((m - 6, m - 4, m + width + 6, m + height + 4), outline=accent, width=2)
+        for cx, cy in [(m - 6, m - 4), (m + width + 6, m - 4), (m - 6, m + height + 4), (m + width + 6, m + height + 4)]:
+            draw.ellipse((cx - 5, cy - 5, cx + 5, cy + 5), fill=accent, outline="white", width=2)
+    return image, (width, height)
+
+_worker_doc = {}
+
+def worker_document(path, doc_token):
+    # Runs inside a render worker process; each worker keeps the current document open.
+    cached = _worker_doc.get("doc")
+    if cached is None or cached[0] != (path, doc_token):
+        if cached is not None:
+            cached[1].close()
+        cached = ((path, doc_token), fitz.open(path))
+        _worker_doc["doc"] = cached
+    return cached[1]
+
+def render_tile_buffer(path, doc_token, page_index, zoom_level, col, row, tile_size=TILE_SIZE):
+    page = worker_document(path, doc_token)[page_index]
+    clip = fitz.Rect(col * tile_size, row * tile_size, (col + 1) * tile_size, (row + 1) * tile_size) / zoom_level
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom_level, zoom_level), clip=clip & page.rect)
+    return PageBuffer(pix.width, pix.height, pix.stride, pix.n, pix.alpha, pix.samples)
+
+def is_tile_key(key):
+    # (doc_token, page_index, zoom, rotation, col, row); thumbnails and text indexes use a string tag.
+    return isinstance(key[1], int)
+
+def render_thumbnail_buffer(path, doc_token, page_index, width=THUMB_WIDTH):
+    page = worker_document(path, doc_token)[page_index]
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    return PageBuffer(pix.width, pix.height, pix.stride, pix.n, pix.alpha, pix.samples)
+
+def build_word_index(path, doc_token):
+    return load_word_index(path, doc=worker_document(path, doc_token))
+
+class RenderPool:
+    def __init__(self, root, on_result, max_workers=None, poll_interval=10):
+        self.root = root
+        self.on_result = on_result
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.poll_interval = poll_interval
+        self.executor = None
+        self.pending = {}
+        self.results = queue.Queue()
+        self.polling = False
+
+    def submit(self, key, func, *args):
+        if key in self.pending:
+            return
+        if self.executor is None:
+            # Workers start lazily, possibly while a save thread is inside MuPDF; forking then would copy
+            # its held locks into the child, so they are spawned fresh instead.
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        future = self.executor.submit(func, *args)
+        self.pending[key] = future
+        profiler.count("render_submitted")
+        # Done callbacks fire on the executor's thread; only the queue is touched there.
+        future.add_done_callback(lambda f, key=key, t=time.perf_counter(): self.results.put((key, f, t)))
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self.poll_results)
+
+    def is_pending(self, key):
+        return key in self.pending
+
+    def cancel_stale(self, keep):
+        for key, future in list(self.pending.items()):
+            if not keep(key) and future.cancel():
+                del self.pending[key]
+                profiler.count("render_cancelled")
+
+    def poll_results(self):
+        while True:
+            try:
+                key, future, submitted = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.pending.get(key) is future:
+                del self.pending[key]
+            if future.cancelled():
+                continue
+            # Queue wait, rasterizing in the worker and the trip back: what the user waits for.
+            profiler.record("render", time.perf_counter() - submitted)
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            self.on_result(key, result, error)
+        if self.pending or not self.results.empty():
+            self.root.after(self.poll_interval, self.poll_results)
+        else:
+            self.polling = False
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+
+class SaveJob:
+    def __init__(self, target, out_path, in_place):
+        self.out_path = out_path
+        self.in_place = in_place
+        self.cancel = threading.Event()
+        self.events = queue.Queue()
+        self.pages_done = 0
+        self.pages_total = 0
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, args=(target,), daemon=True)
+        self.thread.start()
+
+    def run(self, target):
+        try:
+            target(self.progress, self.cancel)
+            self.events.put(("done", None, None))
+        except SaveCancelled:
+            self.events.put(("cancelled", None, None))
+        except Exception as e:
+            self.events.put(("error", e, None))
+
+    def progress(self, stage, done, total):
+        self.events.put((stage, done, total))
+
+    def bytes_written(self):
+        try:
+            return os.path.getsize(partial_path(self.out_path))
+        except OSError:
+            return 0
+
+class ScreenTextMetrics(TextMetrics):
+    # Adds on-screen extents measured with Tk font metrics, so no throwaway canvas items are needed.
+    def __init__(self, max_entries=4096):
+        super().__init__(max_entries)
+        self.fonts = {}
+
+    def font(self, family, size, style):
+        font = self.fonts.get((family, size, style))
+        if font is None:
+            font = tkfont.Font(family=family, size=size, weight="bold" if style == "bold" else "normal",
+                               slant="italic" if style == "italic" else "roman")
+            self.fonts[(family, size, style)] = font
+        return font
+
+    def screen_size(self, text, font_style, zoom_level):
+        family, size = font_style[0], font_style[1]
+        style = font_style[2] if len(font_style) > 2 else ""
+        font = self.font(family, size, style)
+        return self.lookup((text, family, style, size, zoom_level),
+                           lambda: (font.measure(text), font.metrics("linespace")))
+
 class LivePDFESign:
-    def __init__(self, root):
+    def __init__(self, root, save_profile=DEFAULT_SAVE_PROFILE):
+        if save_profile not in SAVE_PROFILES:
+            raise ValueError(f"Unknown save profile: {save_profile!r} (choose from {', '.join(SAVE_PROFILES)})")
         self.root = root
         self.root.title("Live PDF E-Sign - Professional Document Signing")
         self.root.geometry("1400x900")
@@ -44,8 +280,23 @@ class LivePDFESign:
 
         self.pdf_doc = None
         self.pdf_path = None
+        self.page_geometry = []
+        self.doc_token = 0
         self.current_page = 0
-        self.signatures = []
+        self.signatures = PlacementStore()
+        self.listbox_ids = []
+        # Where each drawn placement's text sits on the canvas; rebuilt on every redraw.
+        self.canvas_positions = {}
+        self.overlay_items = {}
+        self.free_overlay_items = []
+        self.overlay_pool_slack = 32
+        self.selection_items = None
+        self.selection_box = None
+        self.sprite_mode = os.environ.get("ESIGN_SPRITES", "") not in ("", "0")
+        self.sprite_cache = PageRenderCache(max_bytes=32 * 1024 * 1024, max_entries=2048)
+        self.placement_index = PlacementIndex()
+        self.text_metrics = ScreenTextMetrics()
+        self.hit_padding = 5
 
         self.dragging_item = None
         self.drag_start_x = 0
@@ -78,11 +329,55 @@ class LivePDFESign:
         self.text_color = self.colors['text_primary']
         self.text_size = 14
 
-        self.last_drag_time = 0
-        self.drag_update_interval = 16
+        self.frames = FrameScheduler(self.root)
+        self.perf_interval = 500
+        self.hover_item = None
+
+        self.save_job = None
+        # Set while an in-place save stamps and appends to the open document and its file.
+        self.document_locked = False
+        self.save_poll_interval = 100
+        self.save_profile = save_profile
+
+        self.render_cache = PageRenderCache()
+        self.render_pool = RenderPool(self.root, self.on_page_rendered)
+        self.page_layer_key = None
+        self.prefetch_radius = 2
+        self.zoom_level = 1.0
+        self.tile_margin = TILE_SIZE // 2
+        self.tile_items = {}
+        self.free_tile_items = []
+        self.visible_tiles = set()
+        self.tile_update_pending = False
+        self.scroll_region = (0, 0, 0, 0)
+        self.preview = None
+        self.zoom_settle_job = None
+        self.zoom_settle_ms = 120
+
+        # Continuous mode stacks every page vertically; only pages near the viewport get items.
+        self.continuous = os.environ.get("ESIGN_CONTINUOUS", "") not in ("", "0")
+        self.page_origins = []
+        self.page_tops = []
+        self.page_frames = {}
+        self.free_page_frames = []
+        self.drawn_pages = set()
+        self.viewport_page = None
+        self.drag_before = None
+        self.journal = None
+        self.word_index = None
+        self.pending_rules = None
+
+        self.thumb_offsets = []
+        self.thumb_total = 0
+        self.thumb_items = {}
+        self.free_thumb_items = []
+        self.thumb_margin = 300
+        self.thumb_update_pending = False
 
         self.setup_modern_styles()
         self.setup_ui()
+        self.bind_shortcuts()
+        self.root.protocol("WM_DELETE_WINDOW", self.close_app)
 
     def setup_modern_styles(self):
         style = ttk.Style()
@@ -144,6 +439,31 @@ class LivePDFESign:
                        foreground=self.colors['text_primary'],
                        font=('Segoe UI', 11, 'bold'))
 
+    def bind_shortcuts(self):
+        self.root.bind("<Next>", self.page_key(self.next_page))
+        self.root.bind("<Prior>", self.page_key(self.prev_page))
+        self.root.bind("<Right>", self.page_key(self.next_page))
+        self.root.bind("<Left>", self.page_key(self.prev_page))
+        self.root.bind("<Home>", self.page_key(self.first_page))
+        self.root.bind("<End>", self.page_key(self.last_page))
+        self.root.bind("<Control-g>", self.jump_to_page)
+        self.root.bind("<Control-plus>", self.zoom_in)
+        self.root.bind("<Control-equal>", self.zoom_in)
+        self.root.bind("<Control-minus>", self.zoom_out)
+        self.root.bind("<Control-0>", self.zoom_reset)
+        self.root.bind("<Escape>", self.cancel_save)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Z>", self.redo)
+
+    def page_key(self, handler):
+        # Root bindings also fire inside entries and lists, where these keys move the cursor or selection.
+        def on_key(event):
+            if isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Spinbox, tk.Listbox, tk.Text)):
+                return None
+            return handler(event)
+        return on_key
+
     def setup_ui(self):
         main_container = tk.Frame(self.root, bg=self.colors['lighter'])
         main_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -155,6 +475,7 @@ class LivePDFESign:
         content_frame.pack(fill=tk.BOTH, expand=True, pady=(20, 0))
 
         self.create_left_panel(content_frame)
+        self.create_thumbnail_sidebar(content_frame)
         self.create_pdf_viewer(content_frame)
 
         self.create_status_bar(main_container)
@@ -204,7 +525,20 @@ class LivePDFESign:
                            activebackground=self.colors['primary_hover'])
         open_btn.pack(side=tk.LEFT, padx=(0, 10))
 
-        save_btn = tk.Button(file_frame,
+        self.save_in_place_btn = tk.Button(file_frame,
+                                    text="💾 Save",
+                                    command=self.save_pdf_in_place,
+                                    bg=self.colors['success'],
+                                    fg='white',
+                                    font=('Segoe UI', 11, 'bold'),
+                                    relief='flat',
+                                    padx=20,
+                                    pady=10,
+                                    cursor='hand2',
+                                    activebackground='#059669')
+        self.save_in_place_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.save_btn = tk.Button(file_frame,
                            text="💾 Save As…",
                            command=self.save_pdf,
                            bg=self.colors['success'],
@@ -215,7 +549,7 @@ class LivePDFESign:
                            pady=10,
                            cursor='hand2',
                            activebackground='#059669')
-        save_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.save_btn.pack(side=tk.LEFT, padx=(0, 10))
 
         close_btn = tk.Button(file_frame,
                             text="❌ Close",
@@ -230,6 +564,103 @@ class LivePDFESign:
                             activebackground='#dc2626')
         close_btn.pack(side=tk.LEFT)
 
+        nav_frame = tk.Frame(inner_toolbar, bg=self.colors['white'])
+        nav_frame.pack(side=tk.RIGHT)
+
+        prev_btn = tk.Button(nav_frame,
+                           text="◀ Prev",
+                           command=self.prev_page,
+                           bg=self.colors['secondary'],
+                           fg='white',
+                           font=('Segoe UI', 10, 'bold'),
+                           relief='flat',
+                           padx=12,
+                           pady=8,
+                           cursor='hand2',
+                           activebackground='#475569')
+        prev_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.page_var = tk.StringVar(value="")
+        page_entry = tk.Entry(nav_frame,
+                            textvariable=self.page_var,
+                            width=5,
+                            justify='center',
+                            font=('Segoe UI', 11),
+                            relief='solid',
+                            bd=1)
+        page_entry.pack(side=tk.LEFT)
+        page_entry.bind("<Return>", self.on_page_entry)
+
+        self.page_total_var = tk.StringVar(value="/ 0")
+        tk.Label(nav_frame,
+                textvariable=self.page_total_var,
+                font=('Segoe UI', 11),
+                bg=self.colors['white'],
+                fg=self.colors['text_secondary']).pack(side=tk.LEFT, padx=(5, 10))
+
+        next_btn = tk.Button(nav_frame,
+                           text="Next ▶",
+                           command=self.next_page,
+                           bg=self.colors['secondary'],
+                           fg='white',
+                           font=('Segoe UI', 10, 'bold'),
+                           relief='flat',
+                           padx=12,
+                           pady=8,
+                           cursor='hand2',
+                           activebackground='#475569')
+        next_btn.pack(side=tk.LEFT)
+
+        zoom_frame = tk.Frame(inner_toolbar, bg=self.colors['white'])
+        zoom_frame.pack(side=tk.RIGHT, padx=(0, 20))
+
+        zoom_out_btn = tk.Button(zoom_frame,
+                               text="−",
+                               command=self.zoom_out,
+                               bg=self.colors['secondary'],
+                               fg='white',
+                               font=('Segoe UI', 11, 'bold'),
+                               relief='flat',
+                               padx=10,
+                               pady=6,
+                               cursor='hand2',
+                               activebackground='#475569')
+        zoom_out_btn.pack(side=tk.LEFT)
+
+        self.zoom_var = tk.StringVar(value="100%")
+        tk.Label(zoom_frame,
+                textvariable=self.zoom_var,
+                width=6,
+                font=('Segoe UI', 11),
+                bg=self.colors['white'],
+                fg=self.colors['text_secondary']).pack(side=tk.LEFT, padx=5)
+
+        zoom_in_btn = tk.Button(zoom_frame,
+                              text="+",
+                              command=self.zoom_in,
+                              bg=self.colors['secondary'],
+                              fg='white',
+                              font=('Segoe UI', 11, 'bold'),
+                              relief='flat',
+                              padx=10,
+                              pady=6,
+                              cursor='hand2',
+                              activebackground='#475569')
+        zoom_in_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        fit_btn = tk.Button(zoom_frame,
+                          text="↔ Fit",
+                          command=self.zoom_fit_width,
+                          bg=self.colors['secondary'],
+                          fg='white',
+                          font=('Segoe UI', 10, 'bold'),
+                          relief='flat',
+                          padx=12,
+                          pady=8,
+                          cursor='hand2',
+                          activebackground='#475569')
+        fit_btn.pack(side=tk.LEFT)
+
     def create_left_panel(self, parent):
         self.left_panel = tk.Frame(parent, width=280, bg=self.colors['lighter'])
         self.left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 20))
@@ -314,7 +745,40 @@ class LivePDFESign:
                            relief='flat',
                            cursor='hand2',
                            activebackground='#7c3aed')
-        date_btn.pack(fill=tk.X, ipady=8)
+        date_btn.pack(fill=tk.X, ipady=8, pady=(0, 10))
+
+        rules_btn = tk.Button(actions_content,
+                            text="📌 Apply Placement Rules",
+                            command=self.apply_rules_dialog,
+                            bg=self.colors['secondary'],
+                            fg='white',
+                            font=('Segoe UI', 10, 'bold'),
+                            relief='flat',
+                            cursor='hand2',
+                            activebackground='#475569')
+        rules_btn.pack(fill=tk.X, ipady=8)
+
+        self.sprite_var = tk.BooleanVar(value=self.sprite_mode)
+        sprite_check = tk.Checkbutton(actions_content,
+                                      text="Draw items as cached images",
+                                      variable=self.sprite_var,
+                                      command=self.toggle_sprite_mode,
+                                      bg=self.colors['white'],
+                                      fg=self.colors['text_secondary'],
+                                      font=('Segoe UI', 9),
+                                      activebackground=self.colors['white'])
+        sprite_check.pack(anchor='w', pady=(10, 0))
+
+        self.continuous_var = tk.BooleanVar(value=self.continuous)
+        continuous_check = tk.Checkbutton(actions_content,
+                                          text="Continuous scroll",
+                                          variable=self.continuous_var,
+                                          command=self.toggle_continuous,
+                                          bg=self.colors['white'],
+                                          fg=self.colors['text_secondary'],
+                                          font=('Segoe UI', 9),
+                                          activebackground=self.colors['white'])
+        continuous_check.pack(anchor='w')
 
         list_card = tk.Frame(self.left_panel, bg=self.colors['white'], relief='solid', bd=1)
         list_card.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 20))
@@ -390,13 +854,33 @@ class LivePDFESign:
         tip_icon.pack()
 
         tip_text = tk.Label(tips_content,
-                           text="Drag & Drop Magic!\nClick and drag signatures\nto reposition them perfectly",
+                           text="Drag & Drop Magic!\nClick and drag signatures\nto reposition them perfectly\n\nPgUp/PgDn or ◀ ▶ to turn pages\nCtrl+G to jump to a page",
                            font=('Segoe UI', 9, 'italic'),
                            bg='#e0f2fe',
                            fg='#0369a1',
                            justify='center')
         tip_text.pack(pady=(5, 0))
 
+    def create_thumbnail_sidebar(self, parent):
+        sidebar = tk.Frame(parent, bg=self.colors['white'], relief='solid', bd=1)
+        sidebar.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 20))
+
+        self.thumb_canvas = tk.Canvas(sidebar,
+                                      width=THUMB_WIDTH + 2 * THUMB_PAD,
+                                      bg=self.colors['light'],
+                                      highlightthickness=0,
+                                      cursor='hand2')
+        thumb_scroll = ttk.Scrollbar(sidebar, orient="vertical", command=self.thumb_canvas.yview)
+        self.thumb_canvas.configure(yscrollcommand=lambda *args: self.on_thumbnails_scrolled(thumb_scroll, *args))
+        self.thumb_canvas.pack(side=tk.LEFT, fill=tk.Y)
+        thumb_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.thumb_canvas.bind("<Button-1>", self.on_thumbnail_click)
+        self.thumb_canvas.bind("<Configure>", self.schedule_thumbnail_update)
+        self.thumb_canvas.bind("<MouseWheel>", self.on_thumbnail_wheel)
+        self.thumb_canvas.bind("<Button-4>", self.on_thumbnail_wheel)
+        self.thumb_canvas.bind("<Button-5>", self.on_thumbnail_wheel)
+
     def create_pdf_viewer(self, parent):
         viewer_container = tk.Frame(parent, bg=self.colors['lighter'])
         viewer_container.pack(fill=tk.BOTH, expand=True)
@@ -415,7 +899,8 @@ class LivePDFESign:
         
         v_scroll = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
         h_scroll = ttk.Scrollbar(canvas_frame, orient="horizontal", command=self.canvas.xview)
-        self.canvas.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        self.canvas.configure(yscrollcommand=lambda *args: self.on_canvas_scrolled(v_scroll, *args),
+                              xscrollcommand=lambda *args: self.on_canvas_scrolled(h_scroll, *args))
 
         self.canvas.grid(row=0, column=0, sticky="nsew")
         v_scroll.grid(row=0, column=1, sticky="ns")
@@ -429,9 +914,54 @@ class LivePDFESign:
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
         self.canvas.bind("<Motion>", self.on_mouse_motion)
         self.canvas.bind("<Double-Button-1>", self.on_canvas_double_click)
+        self.canvas.bind("<Configure>", self.schedule_tile_update)
+        self.canvas.bind("<Control-MouseWheel>", self.on_zoom_wheel)
+        self.canvas.bind("<Control-Button-4>", self.on_zoom_wheel)
+        self.canvas.bind("<Control-Button-5>", self.on_zoom_wheel)
+        self.canvas.bind("<MouseWheel>", self.on_scroll_wheel)
+        self.canvas.bind("<Button-4>", self.on_scroll_wheel)
+        self.canvas.bind("<Button-5>", self.on_scroll_wheel)
+
+        if profiler.enabled:
+            self.perf_label = tk.Label(canvas_frame,
+                                       font=('Consolas', 9),
+                                       bg=self.colors['darker'],
+                                       fg='#a7f3d0',
+                                       justify='left',
+                                       padx=8,
+                                       pady=6)
+            self.perf_label.place(relx=1.0, x=-24, y=8, anchor='ne')
+            self.root.after(self.perf_interval, self.update_perf_overlay)
 
         self.show_welcome_message()
 
+    def perf_extras(self):
+        return {"frames": self.frames.stats(),
+                "render_cache": self.render_cache.stats(),
+                "sprite_cache": self.sprite_cache.stats(),
+                "text_metrics": self.text_metrics.stats()}
+
+    def update_perf_overlay(self):
+        frames = self.frames.stats()
+        render = profiler.timing("render") or {}
+        cache = self.render_cache.stats()
+        self.perf_label.configure(text=(
+            f"frame   {frames['avg_ms']:5.1f} ms  p95 {frames['p95_ms']:5.1f}\n"
+            f"render  {render.get('mean_ms', 0.0):5.1f} ms  p95 {render.get('p95_ms', 0.0):5.1f}"
+            f"  ({len(self.render_pool.pending)} queued)\n"
+            f"cache   {cache['hit_rate']:5.0%} hit  {cache['bytes'] / 1e6:5.1f} MB"))
+        self.root.after(self.perf_interval, self.update_perf_overlay)
+
+    def on_canvas_scrolled(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self.schedule_tile_update()
+
+    def on_scroll_wheel(self, event):
+        if getattr(event, "num", None) == 5 or getattr(event, "delta", 0) < 0:
+            self.canvas.yview_scroll(3, "units")
+        else:
+            self.canvas.yview_scroll(-3, "units")
+
     def create_status_bar(self, parent):
         status_container = tk.Frame(parent, bg=self.colors['dark'], height=40)
         status_container.pack(fill=tk.X, pady=(20, 0))
@@ -447,7 +977,18 @@ class LivePDFESign:
                                bg=self.colors['dark'],
                                fg='white',
                                anchor='w')
-        status_label.pack(fill=tk.X)
+        status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.cancel_save_btn = tk.Button(status_content,
+                                       text="✖ Cancel save",
+                                       command=self.cancel_save,
+                                       bg=self.colors['danger'],
+                                       fg='white',
+                                       font=('Segoe UI', 9, 'bold'),
+                                       relief='flat',
+                                       padx=10,
+                                       cursor='hand2',
+                                       activebackground='#dc2626')
 
     def show_welcome_message(self):
         self.canvas.delete("all")
@@ -502,218 +1043,930 @@ class LivePDFESign:
                             fill=self.colors['primary'],
                             anchor="center")
 
-    def open_pdf(self):
-        file_path = filedialog.askopenfilename(
-            title="Select PDF Document", 
-            filetypes=[("PDF files", "*.pdf")]
-        )
+    def open_pdf(self, file_path=None):
+        if self.refuse_while_saving():
+            return
+        if file_path is None:
+            file_path = filedialog.askopenfilename(
+                title="Select PDF Document", 
+                filetypes=[("PDF files", "*.pdf")]
+            )
         if not file_path:
             return
         try:
-            if self.pdf_doc:
+            if self.pdf_doc is not None:
+                self.close_journal()
                 self.pdf_doc.close()
+                self.render_cache.invalidate_document(self.doc_token)
             self.pdf_doc = fitz.open(file_path)
             self.pdf_path = file_path
+            self.page_geometry = read_page_geometry(self.pdf_doc)
+            self.doc_token += 1
             self.current_page = 0
-            self.signatures = []
+            self.viewport_page = None
+            self.signatures.clear()
+            self.placement_index.clear()
             self.selected_item = None
             self.dragging_item = None
+            restored, restore_ms = self.open_journal(file_path)
 
             self.create_tools_panel()
+            self.layout_thumbnails()
             self.display_page()
+            self.update_page_nav()
 
             filename = os.path.basename(file_path)
-            self.status_var.set(f"📄 Loaded: {filename}")
+            if restored:
+                self.set_status(f"📄 Loaded: {filename} - restored {restored} item(s) from the session journal "
+                                f"({restore_ms:.0f} ms)")
+            else:
+                self.set_status(f"📄 Loaded: {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open PDF:\n{e}")
 
     def close_app(self):
-        if self.pdf_doc:
+        job = self.save_job
+        if job is not None:
+            if not messagebox.askyesno("Save In Progress", "A save is still running.\n\nCancel it and quit?"):
+                return
+            job.cancel.set()
+            # Cancelling only takes effect between pages; an append already writing has to finish,
+            # or exiting under the daemon thread would tear the file.
+            job.thread.join()
+            self.save_job = None
+            self.document_locked = False
+            outcome = None
+            while not job.events.empty():
+                event = job.events.get_nowait()
+                if event[0] != "stamp":
+                    outcome = event[0]
+            if job.in_place and outcome == "done":
+                self.journal_record("reset")
+        self.render_pool.shutdown()
+        self.close_journal()
+        if profiler.enabled:
+            try:
+                print(f"Performance report: {profiler.dump(extra=self.perf_extras())}", file=sys.stderr)
+            except OSError as e:
+                print(f"Could not write performance report: {e}", file=sys.stderr)
+        if self.pdf_doc is not None:
             self.pdf_doc.close()
+            self.render_cache.clear()
         self.root.destroy()
 
     def display_page(self):
-        if not self.pdf_doc:
+        if self.pdf_doc is None:
             self.show_welcome_message()
             return
         try:
-            page = self.pdf_doc[self.current_page]
-            zoom_level = 1.0
-            mat = fitz.Matrix(zoom_level, zoom_level)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("ppm")
+            with profiler.timer("display_page"):
+                self.render_page_layer()
+                self.redraw_signatures()
+                self.update_items_listbox()
 
-            pil_image = Image.open(io.BytesIO(img_data))
-            self.photo = ImageTk.PhotoImage(pil_image)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to display page:\n{e}")
 
-            self.canvas.delete("all")
-            self.canvas.create_image(25, 25, anchor="nw", image=self.photo, tags="pdf_page")
+    def page_origin(self, index=None):
+        if self.continuous and self.page_origins:
+            return self.page_origins[self.current_page if index is None else index]
+        return PAGE_MARGIN, PAGE_MARGIN
+
+    def pdf_to_canvas(self, x, y, page=None):
+        ox, oy = self.page_origin(page)
+        return ox + x * self.zoom_level, oy + y * self.zoom_level
+
+    def canvas_to_pdf(self, canvas_x, canvas_y, page=None):
+        ox, oy = self.page_origin(page)
+        return (canvas_x - ox) / self.zoom_level, (canvas_y - oy) / self.zoom_level
+
+    def page_at(self, canvas_y):
+        # A point in the gap below a page belongs to that page.
+        if not self.continuous or not self.page_tops:
+            return self.current_page
+        index = bisect.bisect_right(self.page_tops, canvas_y) - 1
+        return max(0, min(index, len(self.page_tops) - 1))
+
+    def pages_in(self, viewport):
+        if not self.continuous or not self.page_tops:
+            return [self.current_page]
+        last = bisect.bisect_left(self.page_tops, viewport[3]) - 1
+        return list(range(self.page_at(viewport[1]), max(0, last) + 1))
+
+    def layout_pages(self):
+        if not self.continuous:
+            self.page_origins = []
+            self.page_tops = []
+            page = self.page_geometry[self.current_page]
+            x0, y0 = self.page_origin()
+            self.scroll_region = (x0-3, y0-3, x0 + page.width * self.zoom_level + 1,
+                                  y0 + page.height * self.zoom_level + 1)
+            return
+        # Positions only; nothing is rendered until a page comes near the viewport.
+        widest = max(page.width for page in self.page_geometry) * self.zoom_level
+        origins = []
+        y = PAGE_MARGIN
+        for page in self.page_geometry:
+            origins.append((PAGE_MARGIN + (widest - page.width * self.zoom_level) / 2, y))
+            y += page.height * self.zoom_level + PAGE_GAP
+        self.page_origins = origins
+        self.page_tops = [origin[1] for origin in origins]
+        self.scroll_region = (PAGE_MARGIN-3, PAGE_MARGIN-3, PAGE_MARGIN + widest + 1, y - PAGE_GAP + 1)
+
+    def render_page_layer(self):
+        if self.continuous:
+            layer_key = (self.doc_token, "continuous", self.zoom_level, len(self.page_geometry))
+        else:
+            page = self.page_geometry[self.current_page]
+            layer_key = (self.doc_token, self.current_page, self.zoom_level, page.rotation)
+        if layer_key == self.page_layer_key and self.canvas.find_withtag("pdf_border"):
+            if not self.tile_update_pending:
+                self.update_visible_tiles()
+            return
 
-            bbox = self.canvas.bbox("pdf_page")
-            if bbox:
-                self.canvas.create_rectangle(bbox[0]-1, bbox[1]-1, bbox[2]+1, bbox[3]+1, 
-                                           outline='#cbd5e1', width=2, tags="pdf_shadow")
-                self.canvas.create_rectangle(bbox[0]-3, bbox[1]-3, bbox[2]+1, bbox[3]+1, 
-                                           outline='#e2e8f0', width=1, tags="pdf_border")
+        if self.canvas.find_withtag("pdf_border"):
+            for tile_key in list(self.tile_items):
+                self.release_tile(tile_key)
+            for index in list(self.page_frames):
+                self.release_page_frame(index)
+        else:
+            self.canvas.delete("all")
+            self.tile_items.clear()
+            self.free_tile_items.clear()
+            self.page_frames.clear()
+            self.free_page_frames.clear()
+            self.overlay_items.clear()
+            self.free_overlay_items.clear()
+            self.selection_items = None
+            self.selection_box = None
+
+        self.drop_zoom_preview()
+        self.layout_pages()
+        self.canvas.configure(scrollregion=self.scroll_region)
+        self.update_page_frames()
+
+        self.page_layer_key = layer_key
+        if not self.tile_update_pending:
+            self.update_visible_tiles()
+
+    def update_page_frames(self):
+        pages = self.pages_in(self.viewport_rect(self.tile_margin))
+        for index in [i for i in self.page_frames if i not in pages]:
+            self.release_page_frame(index)
+        for index in pages:
+            if index not in self.page_frames:
+                self.show_page_frame(index)
+
+    def show_page_frame(self, index):
+        page = self.page_geometry[index]
+        x0, y0 = self.page_origin(index)
+        x1 = x0 + page.width * self.zoom_level
+        y1 = y0 + page.height * self.zoom_level
+        if self.free_page_frames:
+            shadow, border = self.free_page_frames.pop()
+            self.canvas.itemconfigure(shadow, state="normal")
+            self.canvas.itemconfigure(border, state="normal")
+        else:
+            shadow = self.canvas.create_rectangle(0, 0, 0, 0, outline='#cbd5e1', width=2, tags="pdf_shadow")
+            border = self.canvas.create_rectangle(0, 0, 0, 0, outline='#e2e8f0', width=1, tags="pdf_border")
+        self.canvas.coords(shadow, x0-1, y0-1, x1+1, y1+1)
+        self.canvas.coords(border, x0-3, y0-3, x1+1, y1+1)
+        self.page_frames[index] = (shadow, border)
+
+    def release_page_frame(self, index):
+        frame = self.page_frames.pop(index)
+        if len(self.free_page_frames) < 64:
+            for item in frame:
+                self.canvas.itemconfigure(item, state="hidden")
+            self.free_page_frames.append(frame)
+        else:
+            self.canvas.delete(*frame)
 
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    def sync_viewport_pages(self):
+        # Continuous mode: follow the scroll position with frames, overlays and the current page.
+        if not self.continuous or not self.page_tops:
+            return
+        self.update_page_frames()
+        if set(self.overlay_pages()) != self.drawn_pages:
             self.redraw_signatures()
-            self.update_items_listbox()
+        page = self.page_at(self.canvas.canvasy(0) + PAGE_MARGIN)
+        if page != self.viewport_page:
+            self.viewport_page = page
+            if page != self.current_page:
+                self.current_page = page
+                self.update_page_nav()
+                self.update_items_listbox()
+
+    def scroll_to_page(self, index):
+        region = self.scroll_region
+        height = max(1.0, region[3] - region[1])
+        self.canvas.yview_moveto((self.page_tops[index] - PAGE_MARGIN - region[1]) / height)
+        self.viewport_page = self.page_at(self.canvas.canvasy(0) + PAGE_MARGIN)
+
+    def toggle_continuous(self):
+        self.continuous = bool(self.continuous_var.get())
+        if self.pdf_doc is None:
+            return
+        self.page_layer_key = None
+        self.viewport_page = None
+        self.display_page()
+        if self.continuous:
+            self.scroll_to_page(self.current_page)
+        else:
+            self.canvas.yview_moveto(0)
+        self.schedule_tile_update()
+
+    def viewport_rect(self, margin=0):
+        x0 = self.canvas.canvasx(0) - margin
+        y0 = self.canvas.canvasy(0) - margin
+        return (x0, y0,
+                x0 + self.canvas.winfo_width() + 2 * margin,
+                y0 + self.canvas.winfo_height() + 2 * margin)
+
+    def tile_keys_for(self, page_index, viewport):
+        page = self.page_geometry[page_index]
+        ox, oy = self.page_origin(page_index)
+        cols = max(1, -(-int(page.width * self.zoom_level) // TILE_SIZE))
+        rows = max(1, -(-int(page.height * self.zoom_level) // TILE_SIZE))
+        first_col = max(0, int((viewport[0] - ox) // TILE_SIZE))
+        last_col = min(cols - 1, int((viewport[2] - ox) // TILE_SIZE))
+        first_row = max(0, int((viewport[1] - oy) // TILE_SIZE))
+        last_row = min(rows - 1, int((viewport[3] - oy) // TILE_SIZE))
+        return [(self.doc_token, page_index, self.zoom_level, page.rotation, col, row)
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)]
+
+    def schedule_tile_update(self, event=None):
+        if not self.tile_update_pending:
+            self.tile_update_pending = True
+            self.root.after_idle(self.update_visible_tiles)
+
+    def update_visible_tiles(self):
+        self.tile_update_pending = False
+        if self.pdf_doc is None or self.page_layer_key is None:
+            return
+        viewport = self.viewport_rect(self.tile_margin)
+        wanted = [key for index in self.pages_in(viewport) for key in self.tile_keys_for(index, viewport)]
+        self.visible_tiles = set(wanted)
+        for tile_key in list(self.tile_items):
+            if tile_key not in self.visible_tiles:
+                self.release_tile(tile_key)
+        for tile_key in wanted:
+            if tile_key in self.tile_items:
+                continue
+            buffer = self.render_cache.get(tile_key)
+            if buffer is not None:
+                self.show_tile(tile_key, buffer)
+            elif not self.document_locked:
+                self.render_pool.submit(tile_key, render_tile_buffer, self.pdf_path, *tile_key[:3], *tile_key[4:])
+        if not self.document_locked:
+            self.prefetch_neighbors(wanted)
+        self.sync_viewport_pages()
+
+    def show_tile(self, tile_key, buffer):
+        photo = buffer_to_photo(buffer)
+        ox, oy = self.page_origin(tile_key[1])
+        x = ox + tile_key[4] * TILE_SIZE
+        y = oy + tile_key[5] * TILE_SIZE
+        if self.free_tile_items:
+            item = self.free_tile_items.pop()
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfigure(item, image=photo, state="normal")
+        else:
+            item = self.canvas.create_image(x, y, anchor="nw", image=photo, tags="pdf_tile")
+        self.canvas.tag_lower(item)
+        self.tile_items[tile_key] = (item, photo, buffer)
+        if self.preview is not None:
+            # Sharp tiles sit above the resampled preview, which goes once they cover the view.
+            self.canvas.tag_lower("pdf_preview")
+            if self.visible_tiles.issubset(self.tile_items):
+                self.drop_zoom_preview()
+
+    def release_tile(self, tile_key):
+        item = self.tile_items.pop(tile_key)[0]
+        if len(self.free_tile_items) < 64:
+            self.canvas.itemconfigure(item, image="", state="hidden")
+            self.free_tile_items.append(item)
+        else:
+            self.canvas.delete(item)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to display page:\n{e}")
+    def on_page_rendered(self, key, buffer, error):
+        if key[0] != self.doc_token:
+            return
+        if key[1] == "thumb":
+            self.on_thumbnail_rendered(key, buffer, error)
+            return
+        if key[1] == "words":
+            self.on_word_index(key, buffer, error)
+            return
+        if error is not None:
+            if key in self.visible_tiles:
+                self.set_status(f"⚠️ Failed to render page {key[1] + 1}: {error}")
+            return
+        self.render_cache.put(key, buffer, buffer.stride * buffer.height)
+        if key in self.visible_tiles and key not in self.tile_items:
+            self.show_tile(key, buffer)
+
+    def prefetch_neighbors(self, visible):
+        if self.continuous:
+            # Look one screen ahead in both directions instead of whole neighbouring pages.
+            ahead = self.viewport_rect(self.canvas.winfo_height())
+            candidates = [key for index in self.pages_in(ahead) for key in self.tile_keys_for(index, ahead)]
+        else:
+            viewport = self.viewport_rect(self.tile_margin)
+            first = max(0, self.current_page - self.prefetch_radius)
+            last = min(len(self.page_geometry) - 1, self.current_page + self.prefetch_radius)
+            candidates = []
+            for index in sorted(range(first, last + 1), key=lambda i: abs(i - self.current_page)):
+                if index != self.current_page:
+                    candidates.extend(self.tile_keys_for(index, viewport))
+        wanted = set(visible)
+        for key in candidates:
+            wanted.add(key)
+            if key not in self.render_cache and not self.render_pool.is_pending(key):
+                self.render_pool.submit(key, render_tile_buffer, self.pdf_path, *key[:3], *key[4:])
+        self.render_pool.cancel_stale(lambda key: not is_tile_key(key) or key in wanted)
+
+    def set_zoom(self, zoom_level, focus=None):
+        zoom_level = max(MIN_ZOOM, min(MAX_ZOOM, zoom_level))
+        if self.pdf_doc is None or abs(zoom_level - self.zoom_level) < 1e-6:
+            return
+        if focus is None:
+            focus = (self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2)
+        focus_page = self.page_at(self.canvas.canvasy(focus[1]))
+        pdf_x, pdf_y = self.canvas_to_pdf(self.canvas.canvasx(focus[0]), self.canvas.canvasy(focus[1]), focus_page)
+        old_origin = self.page_origin(focus_page)
+        old_zoom = self.zoom_level
+        sources = self.capture_page_view()
+
+        self.zoom_level = zoom_level
+        # Tiles are requested once the zoom settles; until then the preview stands in.
+        self.tile_update_pending = True
+        self.display_page()
 
-    def redraw_signatures(self):
-        for i, sig in enumerate(self.signatures):
-            if sig["page"] == self.current_page:
-                self.draw_signature_on_canvas(sig, i)
+        # Keep the PDF point under the focus position where it was before zooming.
+        canvas_x, canvas_y = self.pdf_to_canvas(pdf_x, pdf_y, focus_page)
+        region = self.scroll_region
+        width = max(1.0, region[2] - region[0])
+        height = max(1.0, region[3] - region[1])
+        self.canvas.xview_moveto((canvas_x - focus[0] - region[0]) / width)
+        self.canvas.yview_moveto((canvas_y - focus[1] - region[1]) / height)
+
+        self.sync_viewport_pages()
+        self.show_zoom_preview(sources, zoom_level / old_zoom, old_origin, self.page_origin(focus_page))
+        self.render_pool.cancel_stale(lambda key: not is_tile_key(key) or key[2] == self.zoom_level)
+        if self.zoom_settle_job is not None:
+            self.root.after_cancel(self.zoom_settle_job)
+        self.zoom_settle_job = self.root.after(self.zoom_settle_ms, self.on_zoom_settled)
+
+        self.zoom_var.set(f"{round(self.zoom_level * 100)}%")
+        self.set_status(f"🔍 Zoom {round(self.zoom_level * 100)}%")
+
+    def on_zoom_settled(self):
+        self.zoom_settle_job = None
+        self.update_visible_tiles()
+
+    def capture_page_view(self):
+        sources = []
+        if self.preview is not None:
+            sources.append(self.preview[:3])
+        for tile_key, (_, _, buffer) in self.tile_items.items():
+            ox, oy = self.page_origin(tile_key[1])
+            image = samples_to_image(buffer.samples, buffer.width, buffer.height, buffer.stride, buffer.alpha, buffer.n)
+            sources.append((image, ox + tile_key[4] * TILE_SIZE, oy + tile_key[5] * TILE_SIZE))
+        return sources
+
+    def show_zoom_preview(self, sources, ratio, old_origin, new_origin):
+        self.drop_zoom_preview()
+        if not sources:
+            return
+        # Work out which part of the old view lands in the new viewport, and resample only that.
+        # The focus page scales about its own origin; in continuous mode other pages are close enough.
+        (ox, oy), (nx, ny) = old_origin, new_origin
+        view = self.viewport_rect()
+        left = max(ox + (view[0] - nx) / ratio, min(s[1] for s in sources))
+        top = max(oy + (view[1] - ny) / ratio, min(s[2] for s in sources))
+        right = min(ox + (view[2] - nx) / ratio, max(s[1] + s[0].width for s in sources))
+        bottom = min(oy + (view[3] - ny) / ratio, max(s[2] + s[0].height for s in sources))
+        if right - left < 1 or bottom - top < 1:
+            return
+        left, top = int(left), int(top)
+        composite = Image.new("RGB", (int(right) - left, int(bottom) - top), "white")
+        for image, x, y in sources:
+            composite.paste(image, (int(x) - left, int(y) - top))
+        size = (max(1, round(composite.width * ratio)), max(1, round(composite.height * ratio)))
+        preview = composite.resize(size, Image.Resampling.BILINEAR)
+        x = nx + (left - ox) * ratio
+        y = ny + (top - oy) * ratio
+        photo = ImageTk.PhotoImage(preview)
+        item = self.canvas.create_image(x, y, anchor="nw", image=photo, tags="pdf_preview")
+        self.canvas.tag_lower(item)
+        self.preview = (preview, x, y, photo)
+
+    def drop_zoom_preview(self):
+        if self.preview is not None:
+            self.canvas.delete("pdf_preview")
+            self.preview = None
+
+    def zoom_in(self, event=None):
+        self.set_zoom(self.zoom_level * ZOOM_STEP)
+
+    def zoom_out(self, event=None):
+        self.set_zoom(self.zoom_level / ZOOM_STEP)
+
+    def zoom_reset(self, event=None):
+        self.set_zoom(1.0)
+
+    def zoom_fit_width(self, event=None):
+        if self.pdf_doc is not None:
+            page = self.page_geometry[self.current_page]
+            self.set_zoom((self.canvas.winfo_width() - 2 * PAGE_MARGIN) / page.width)
+
+    def on_zoom_wheel(self, event):
+        if getattr(event, "num", None) == 5 or getattr(event, "delta", 0) < 0:
+            factor = 1 / ZOOM_STEP
+        else:
+            factor = ZOOM_STEP
+        self.set_zoom(self.zoom_level * factor, focus=(event.x, event.y))
+
+    def layout_thumbnails(self):
+        # Slot positions come from the page sizes read at open time; nothing is rendered up front.
+        for index in list(self.thumb_items):
+            self.release_thumbnail(index)
+        offsets = []
+        y = THUMB_PAD
+        for page in self.page_geometry:
+            offsets.append(y)
+            y += page.height * THUMB_WIDTH / page.width + THUMB_LABEL + THUMB_PAD
+        self.thumb_offsets = offsets
+        self.thumb_total = y
+        self.thumb_canvas.configure(scrollregion=(0, 0, THUMB_WIDTH + 2 * THUMB_PAD, y))
+        self.thumb_canvas.yview_moveto(0)
+        self.schedule_thumbnail_update()
+
+    def thumbnail_height(self, index):
+        page = self.page_geometry[index]
+        return page.height * THUMB_WIDTH / page.width
+
+    def thumbnail_key(self, index):
+        return (self.doc_token, "thumb", index, THUMB_WIDTH)
+
+    def visible_thumbnails(self):
+        top = self.thumb_canvas.canvasy(0)
+        first = bisect.bisect_right(self.thumb_offsets, top - self.thumb_margin) - 1
+        last = bisect.bisect_left(self.thumb_offsets, top + self.thumb_canvas.winfo_height() + self.thumb_margin)
+        return range(max(0, first), min(len(self.thumb_offsets), last))
+
+    def on_thumbnails_scrolled(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self.schedule_thumbnail_update()
+
+    def on_thumbnail_wheel(self, event):
+        if getattr(event, "num", None) == 5 or getattr(event, "delta", 0) < 0:
+            self.thumb_canvas.yview_scroll(3, "units")
+        else:
+            self.thumb_canvas.yview_scroll(-3, "units")
+
+    def schedule_thumbnail_update(self, event=None):
+        if not self.thumb_update_pending:
+            self.thumb_update_pending = True
+            self.root.after_idle(self.update_thumbnails)
+
+    def update_thumbnails(self):
+        self.thumb_update_pending = False
+        if self.pdf_doc is None or not self.thumb_offsets:
+            return
+        visible = self.visible_thumbnails()
+        for index in list(self.thumb_items):
+            if index not in visible:
+                self.release_thumbnail(index)
+        wanted = set()
+        for index in visible:
+            key = self.thumbnail_key(index)
+            wanted.add(key)
+            if index not in self.thumb_items:
+                self.show_thumbnail_slot(index)
+            if self.thumb_items[index][5] is not None:
+                continue
+            buffer = self.render_cache.get(key)
+            if buffer is not None:
+                self.set_thumbnail_image(index, buffer)
+            elif not self.document_locked:
+                self.render_pool.submit(key, render_thumbnail_buffer, self.pdf_path, self.doc_token, index)
+        # Thumbnails scrolled past before their render started are dropped; page tiles are left alone.
+        self.render_pool.cancel_stale(lambda key: key[1] != "thumb" or key in wanted)
+
+    def show_thumbnail_slot(self, index):
+        x, y = THUMB_PAD, self.thumb_offsets[index]
+        height = self.thumbnail_height(index)
+        frame_coords = (x - 2, y - 2, x + THUMB_WIDTH + 2, y + height + 2)
+        label_coords = (x + THUMB_WIDTH / 2, y + height + THUMB_LABEL / 2 + 2)
+        marker_coords = (x + THUMB_WIDTH - 26, y + 4, x + THUMB_WIDTH - 4, y + 20)
+        if self.free_thumb_items:
+            slot = self.free_thumb_items.pop()
+            frame, image, label, marker, badge = slot[:5]
+            self.thumb_canvas.coords(frame, *frame_coords)
+            self.thumb_canvas.coords(image, x, y)
+            self.thumb_canvas.coords(label, *label_coords)
+            self.thumb_canvas.coords(marker, *marker_coords)
+            self.thumb_canvas.coords(badge, (marker_coords[0] + marker_coords[2]) / 2, y + 12)
+            self.thumb_canvas.itemconfigure(frame, state="normal")
+            self.thumb_canvas.itemconfigure(label, text=str(index + 1), state="normal")
+        else:
+            frame = self.thumb_canvas.create_rectangle(*frame_coords, fill=self.colors['white'])
+            image = self.thumb_canvas.create_image(x, y, anchor="nw", state="hidden")
+            label = self.thumb_canvas.create_text(*label_coords, text=str(index + 1),
+                                                  font=('Segoe UI', 9), fill=self.colors['text_secondary'])
+            marker = self.thumb_canvas.create_oval(*marker_coords, fill=self.colors['accent'],
+                                                   outline=self.colors['white'], state="hidden")
+            badge = self.thumb_canvas.create_text((marker_coords[0] + marker_coords[2]) / 2, y + 12,
+                                                  font=('Segoe UI', 8, 'bold'), fill='white', state="hidden")
+        self.thumb_items[index] = [frame, image, label, marker, badge, None]
+        self.style_thumbnail(index)
+
+    def style_thumbnail(self, index):
+        frame, image, label, marker, badge = self.thumb_items[index][:5]
+        current = index == self.current_page
+        self.thumb_canvas.itemconfigure(frame,
+                                        outline=self.colors['primary'] if current else '#cbd5e1',
+                                        width=3 if current else 1)
+        count = self.signatures.count_on_page(index)
+        state = "normal" if count else "hidden"
+        self.thumb_canvas.itemconfigure(marker, state=state)
+        self.thumb_canvas.itemconfigure(badge, text=str(count) if count < 100 else "99+", state=state)
+
+    def refresh_thumbnails(self):
+        for index in self.thumb_items:
+            self.style_thumbnail(index)
+
+    def set_thumbnail_image(self, index, buffer):
+        slot = self.thumb_items[index]
+        photo = buffer_to_photo(buffer)
+        self.thumb_canvas.itemconfigure(slot[1], image=photo, state="normal")
+        slot[5] = photo
+
+    def release_thumbnail(self, index):
+        slot = self.thumb_items.pop(index)
+        if len(self.free_thumb_items) < 64:
+            for item in slot[:5]:
+                self.thumb_canvas.itemconfigure(item, state="hidden")
+            self.thumb_canvas.itemconfigure(slot[1], image="")
+            self.free_thumb_items.append(slot)
+        else:
+            for item in slot[:5]:
+                self.thumb_canvas.delete(item)
+
+    def on_thumbnail_rendered(self, key, buffer, error):
+        if error is not None:
+            return
+        self.render_cache.put(key, buffer, buffer.stride * buffer.height)
+        slot = self.thumb_items.get(key[2])
+        if slot is not None and slot[5] is None:
+            self.set_thumbnail_image(key[2], buffer)
+
+    def reveal_thumbnail(self, index):
+        if not self.thumb_offsets or self.thumb_total <= 0:
+            return
+        top = self.thumb_canvas.canvasy(0)
+        bottom = top + self.thumb_canvas.winfo_height()
+        y0 = self.thumb_offsets[index] - THUMB_PAD
+        y1 = self.thumb_offsets[index] + self.thumbnail_height(index) + THUMB_LABEL
+        if y0 < top or y1 > bottom:
+            self.thumb_canvas.yview_moveto(y0 / self.thumb_total)
+
+    def on_thumbnail_click(self, event):
+        if not self.thumb_offsets:
+            return
+        index = bisect.bisect_right(self.thumb_offsets, self.thumb_canvas.canvasy(event.y)) - 1
+        if index >= 0:
+            self.go_to_page(index)
+
+    def go_to_page(self, index):
+        if self.pdf_doc is None:
+            return
+        index = max(0, min(index, len(self.page_geometry) - 1))
+        if index != self.current_page:
+            self.current_page = index
+            self.selected_item = None
+            self.dragging_item = None
+            self.is_dragging = False
+            if self.continuous and self.page_tops:
+                self.scroll_to_page(index)
+            self.display_page()
+            self.set_status(f"📄 Page {index + 1} of {len(self.page_geometry)}")
+        self.update_page_nav()
+
+    def next_page(self, event=None):
+        if not self.typing_in_entry(event):
+            self.go_to_page(self.current_page + 1)
+
+    def prev_page(self, event=None):
+        if not self.typing_in_entry(event):
+            self.go_to_page(self.current_page - 1)
 
-    def draw_signature_on_canvas(self, sig, index):
-        zoom_level = 1.0
-        x = 25 + (sig["x"] * zoom_level)
-        y = 25 + (sig["y"] * zoom_level)
-        size = int(sig["size"] * zoom_level)
+    def first_page(self, event=None):
+        if not self.typing_in_entry(event):
+            self.go_to_page(0)
+
+    def last_page(self, event=None):
+        if self.pdf_doc is not None and not self.typing_in_entry(event):
+            self.go_to_page(len(self.page_geometry) - 1)
+
+    def jump_to_page(self, event=None):
+        if self.pdf_doc is None:
+            return
+        page_count = len(self.page_geometry)
+        value = simpledialog.askinteger("Go to Page", f"Page number (1-{page_count}):",
+                                        parent=self.root, minvalue=1, maxvalue=page_count)
+        if value:
+            self.go_to_page(value - 1)
 
-        if sig["type"] == "signature":
+    def on_page_entry(self, event=None):
+        try:
+            self.go_to_page(int(self.page_var.get()) - 1)
+        except ValueError:
+            self.update_page_nav()
+
+    def update_page_nav(self):
+        if self.pdf_doc is not None:
+            self.page_var.set(str(self.current_page + 1))
+            self.page_total_var.set(f"/ {len(self.page_geometry)}")
+            self.refresh_thumbnails()
+            self.reveal_thumbnail(self.current_page)
+        else:
+            self.page_var.set("")
+            self.page_total_var.set("/ 0")
+
+    def typing_in_entry(self, event):
+        widget = getattr(event, "widget", None)
+        return widget is not None and hasattr(widget, "winfo_class") and widget.winfo_class() in ("Entry", "TEntry")
+
+    def overlay_pages(self):
+        if not self.continuous:
+            return [self.current_page]
+        return self.pages_in(self.viewport_rect(self.tile_margin))
+
+    def redraw_signatures(self):
+        with profiler.timer("redraw"):
+            self.redraw_overlay_pages()
+
+    def redraw_overlay_pages(self):
+        pages = self.overlay_pages()
+        self.canvas_positions.clear()
+        for page in self.drawn_pages.union(pages):
+            self.placement_index.clear_page(page)
+        self.drawn_pages = set(pages)
+        on_page = [entry for page in pages for entry in self.signatures.on_page(page)]
+        drawn = {item_id for item_id, _ in on_page}
+        for item_id in [i for i in self.overlay_items if i not in drawn]:
+            self.release_overlay_items(item_id)
+        for item_id, sig in on_page:
+            self.draw_signature_on_canvas(sig, item_id)
+        self.trim_overlay_pool()
+        self.update_selection()
+
+    def redraw_signature(self, item_id):
+        if item_id is None:
+            return
+        self.canvas_positions.pop(item_id, None)
+        self.placement_index.remove(item_id)
+        if item_id in self.signatures and self.signatures[item_id].page in self.drawn_pages:
+            self.draw_signature_on_canvas(self.signatures[item_id], item_id)
+        elif item_id in self.overlay_items:
+            self.release_overlay_items(item_id)
+            self.trim_overlay_pool()
+        self.update_selection()
+
+    def set_selected_item(self, item_id):
+        previous = self.selected_item
+        self.selected_item = item_id
+        if self.sprite_mode:
+            # The selection frame is baked into the sprite, so swap the images.
+            if previous != item_id:
+                self.redraw_signature(previous)
+            self.redraw_signature(item_id)
+        self.update_selection()
+
+    def toggle_sprite_mode(self):
+        self.sprite_mode = bool(self.sprite_var.get())
+        # Pooled items are of the other kind now, so start the pool afresh.
+        for item_id in list(self.overlay_items):
+            self.release_overlay_items(item_id)
+        slack, self.overlay_pool_slack = self.overlay_pool_slack, 0
+        self.trim_overlay_pool()
+        self.overlay_pool_slack = slack
+        self.redraw_signatures()
+
+    def create_overlay_items(self):
+        # [background or sprite image, text, last drawn state, text bbox, sprite photo]
+        if self.sprite_mode:
+            image_id = self.canvas.create_image(0, 0, anchor="nw", state="hidden", tags="overlay")
+            return [image_id, None, None, None, None]
+        bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="#e2e8f0", width=1,
+                                             state="hidden", tags="overlay")
+        text_id = self.canvas.create_text(0, 0, anchor="nw", state="hidden", tags="overlay")
+        return [bg_id, text_id, None, None, None]
+
+    def release_overlay_items(self, item_id):
+        items = self.overlay_items.pop(item_id)
+        self.canvas.itemconfigure(items[0], state="hidden")
+        if items[1] is not None:
+            self.canvas.itemconfigure(items[1], state="hidden")
+        items[2] = items[3] = items[4] = None
+        self.free_overlay_items.append(items)
+
+    def trim_overlay_pool(self):
+        while len(self.free_overlay_items) > self.overlay_pool_slack:
+            items = self.free_overlay_items.pop()
+            self.canvas.delete(*[canvas_id for canvas_id in items[:2] if canvas_id is not None])
+
+    def draw_signature_on_canvas(self, sig, item_id):
+        zoom_level = self.zoom_level
+        x, y = self.pdf_to_canvas(sig.x, sig.y, sig.page)
+        size = max(1, int(sig.size * zoom_level))
+
+        if sig.type == "signature":
             font_style = ("Times", size, "italic")  
-        elif sig["type"] == "date":
+        elif sig.type == "date":
             font_style = ("Segoe UI", size, "bold")
         else:
             font_style = ("Segoe UI", size)
 
-        text_id = self.canvas.create_text(x, y, text=sig["text"], anchor="nw", font=font_style, fill=sig["color"], tags=f"sig_{index}")
-        bbox = self.canvas.bbox(f"sig_{index}")
-        
-        if bbox:
-            self.canvas.delete(f"sig_{index}")
-            
-            shadow_offset = 2
-            self.canvas.create_text(x+shadow_offset, y+shadow_offset, text=sig["text"], anchor="nw", 
-                                   font=font_style, fill="#e2e8f0", tags=f"sig_shadow2_{index}")
-            self.canvas.create_text(x+1, y+1, text=sig["text"], anchor="nw", 
-                                   font=font_style, fill="#cbd5e1", tags=f"sig_shadow_{index}")
-            
+        items = self.overlay_items.get(item_id)
+        if items is None:
+            items = self.free_overlay_items.pop() if self.free_overlay_items else self.create_overlay_items()
+            self.overlay_items[item_id] = items
+        bg_id, text_id = items[0], items[1]
+
+        # Pooled items are only reconfigured when what they show has changed.
+        selected = self.sprite_mode and self.selected_item == item_id
+        drawn = (sig.text, font_style, sig.color, x, y, selected)
+        if items[2] != drawn and self.sprite_mode:
+            key = (sig.text, font_style, sig.color, zoom_level, selected)
+            sprite = self.sprite_cache.get(key)
+            if sprite is None:
+                image, text_size = render_placement_sprite(sig.text, font_style, sig.color, selected,
+                                                           self.colors['primary'])
+                sprite = (ImageTk.PhotoImage(image), text_size)
+                self.sprite_cache.put(key, sprite, image.width * image.height * 4)
+            photo, (width, height) = sprite
+            if items[4] is not photo:
+                # The item holds its own reference, so cache eviction never blanks a visible sprite.
+                self.canvas.itemconfigure(bg_id, image=photo, state="normal")
+                items[4] = photo
+            self.canvas.coords(bg_id, x - SPRITE_MARGIN, y - SPRITE_MARGIN)
+            items[2] = drawn
+            items[3] = (x, y, x + width, y + height)
+        elif items[2] != drawn:
+            self.canvas.itemconfigure(text_id, text=sig.text, font=font_style, fill=sig.color, state="normal")
+            self.canvas.coords(text_id, x, y)
+            width, height = self.text_metrics.screen_size(sig.text, font_style, zoom_level)
+            bbox = (x, y, x + width, y + height)
             padding = 6
-            bg_id = self.canvas.create_rectangle(bbox[0]-padding, bbox[1]-padding, 
-                                               bbox[2]+padding, bbox[3]+padding, 
-                                               fill="white", outline="#e2e8f0", width=1, 
-                                               tags=f"sig_bg_{index}")
-            
-            text_id = self.canvas.create_text(x, y, text=sig["text"], anchor="nw", 
-                                            font=font_style, fill=sig["color"], tags=f"sig_{index}")
-            
-            self.canvas.tag_lower(f"sig_shadow2_{index}", f"sig_shadow_{index}")
-            self.canvas.tag_lower(f"sig_shadow_{index}", f"sig_bg_{index}")
-            self.canvas.tag_lower(f"sig_bg_{index}", f"sig_{index}")
-
-        if self.selected_item == index:
-            bbox = self.canvas.bbox(f"sig_{index}")
-            if bbox:
-                glow_padding = 8
-                self.canvas.create_rectangle(bbox[0]-glow_padding, bbox[1]-glow_padding, 
-                                           bbox[2]+glow_padding, bbox[3]+glow_padding, 
-                                           outline=self.colors['primary'], width=3, 
-                                           dash=(10, 5), tags=f"selection_glow_{index}")
-                
-                self.canvas.create_rectangle(bbox[0]-6, bbox[1]-4, bbox[2]+6, bbox[3]+4, 
-                                           outline=self.colors['primary'], width=2, 
-                                           tags=f"selection_{index}")
-                
-                corner_size = 5
-                corners = [(bbox[0]-6, bbox[1]-4), (bbox[2]+6, bbox[1]-4), 
-                          (bbox[0]-6, bbox[3]+4), (bbox[2]+6, bbox[3]+4)]
-                for i, (cx, cy) in enumerate(corners):
-                    self.canvas.create_oval(cx-corner_size, cy-corner_size, 
-                                          cx+corner_size, cy+corner_size, 
-                                          fill=self.colors['primary'], outline='white', 
-                                          width=2, tags=f"corner_{index}_{i}")
-
-        sig["canvas_x"] = x
-        sig["canvas_y"] = y
-        sig["canvas_id"] = text_id
+            self.canvas.coords(bg_id, bbox[0]-padding, bbox[1]-padding, bbox[2]+padding, bbox[3]+padding)
+            if items[2] is None:
+                self.canvas.itemconfigure(bg_id, state="normal")
+            items[2] = drawn
+            items[3] = bbox
+
+        bbox = items[3]
+        x0, y0 = self.canvas_to_pdf(bbox[0], bbox[1], sig.page)
+        x1, y1 = self.canvas_to_pdf(bbox[2], bbox[3], sig.page)
+        self.placement_index.insert(item_id, sig.page, (x0, y0, x1, y1))
+        self.canvas_positions[item_id] = (x, y)
+
+    def update_selection(self):
+        items = None if self.sprite_mode else self.overlay_items.get(self.selected_item)
+        bbox = items[3] if items is not None else None
+        if bbox == self.selection_box:
+            return
+        self.selection_box = bbox
+        if bbox is None:
+            if self.selection_items is not None:
+                for selection_id in self.selection_items:
+                    self.canvas.itemconfigure(selection_id, state="hidden")
+            return
+        if self.selection_items is None:
+            self.selection_items = [
+                self.canvas.create_rectangle(0, 0, 0, 0, outline=self.colors['primary'], width=3,
+                                             dash=(10, 5), tags=("selection", "overlay")),
+                self.canvas.create_rectangle(0, 0, 0, 0, outline=self.colors['primary'], width=2,
+                                             tags=("selection", "overlay")),
+            ]
+            for i in range(4):
+                self.selection_items.append(self.canvas.create_oval(0, 0, 0, 0, fill=self.colors['primary'],
+                                                                   outline='white', width=2,
+                                                                   tags=("selection", "overlay")))
+        glow_id, frame_id = self.selection_items[:2]
+        glow_padding = 8
+        self.canvas.coords(glow_id, bbox[0]-glow_padding, bbox[1]-glow_padding,
+                           bbox[2]+glow_padding, bbox[3]+glow_padding)
+        self.canvas.coords(frame_id, bbox[0]-6, bbox[1]-4, bbox[2]+6, bbox[3]+4)
+        corner_size = 5
+        corners = [(bbox[0]-6, bbox[1]-4), (bbox[2]+6, bbox[1]-4),
+                   (bbox[0]-6, bbox[3]+4), (bbox[2]+6, bbox[3]+4)]
+        for corner_id, (cx, cy) in zip(self.selection_items[2:], corners):
+            self.canvas.coords(corner_id, cx-corner_size, cy-corner_size, cx+corner_size, cy+corner_size)
+        for selection_id in self.selection_items:
+            self.canvas.itemconfigure(selection_id, state="normal")
+        self.canvas.tag_raise("selection")
 
     def on_canvas_click(self, event):
-        if not self.pdf_doc:
+        if self.pdf_doc is None or self.document_locked:
             return
         canvas_x = self.canvas.canvasx(event.x)
         canvas_y = self.canvas.canvasy(event.y)
         clicked_item = self.get_signature_at_position(canvas_x, canvas_y)
-        if clicked_item is not None:
+        if clicked_item is not None and self.save_job is not None:
+            self.set_selected_item(clicked_item)
+            self.refuse_while_saving()
+        elif clicked_item is not None:
             self.dragging_item = clicked_item
-            self.selected_item = clicked_item
+            self.set_selected_item(clicked_item)
             self.is_dragging = True
             sig = self.signatures[clicked_item]
+            self.drag_before = {"x": sig.x, "y": sig.y, "page": sig.page}
             self.drag_start_x = canvas_x
             self.drag_start_y = canvas_y
-            self.drag_offset_x = canvas_x - sig["canvas_x"]
-            self.drag_offset_y = canvas_y - sig["canvas_y"]
+            drawn_x, drawn_y = self.canvas_positions[clicked_item]
+            self.drag_offset_x = canvas_x - drawn_x
+            self.drag_offset_y = canvas_y - drawn_y
             self.canvas.configure(cursor="hand2")
-            self.status_var.set(f"🖱️ Dragging: {sig['text'][:25]}... (release to drop)")
+            self.set_status(f"🖱️ Dragging: {sig.text[:25]}... (release to drop)")
         else:
-            self.selected_item = None
+            self.set_selected_item(None)
             self.is_dragging = False
-        self.display_page()
 
     def on_canvas_drag(self, event):
         if not self.is_dragging or self.dragging_item is None:
             return
-        current_time = time.time() * 1000
-        if current_time - self.last_drag_time < self.drag_update_interval:
-            return
-        self.last_drag_time = current_time
+        self.frames.post("drag", self.apply_drag, event.x, event.y)
 
-        canvas_x = self.canvas.canvasx(event.x)
-        canvas_y = self.canvas.canvasy(event.y)
+    def apply_drag(self, x, y):
+        if not self.is_dragging or self.dragging_item not in self.signatures or self.document_locked:
+            return
+        canvas_x = self.canvas.canvasx(x)
+        canvas_y = self.canvas.canvasy(y)
         sig = self.signatures[self.dragging_item]
         new_canvas_x = canvas_x - self.drag_offset_x
         new_canvas_y = canvas_y - self.drag_offset_y
 
-        zoom_level = 1.0
-        new_x = max(0, (new_canvas_x - 25) / zoom_level)
-        new_y = max(0, (new_canvas_y - 25) / zoom_level)
+        # In continuous mode the pointer decides which page the item lands on.
+        page_index = self.page_at(canvas_y)
+        new_x, new_y = self.canvas_to_pdf(new_canvas_x, new_canvas_y, page_index)
+        new_x = max(0, new_x)
+        new_y = max(0, new_y)
 
-        if self.pdf_doc:
-            page = self.pdf_doc[self.current_page]
-            max_x = page.rect.width - 100
-            max_y = page.rect.height - 50
+        if self.pdf_doc is not None:
+            page = self.page_geometry[page_index]
+            max_x = page.width - self.text_metrics.pdf_width(sig.text, sig.type, float(sig.size))
+            max_y = page.height - float(sig.size)
             new_x = min(new_x, max_x)
             new_y = min(new_y, max_y)
 
-        sig["x"] = new_x
-        sig["y"] = new_y
-        self.move_signature_on_canvas(self.dragging_item, new_canvas_x, new_canvas_y)
-        self.status_var.set(f"🖱️ Dragging: {sig['text'][:25]} to ({int(new_x)}, {int(new_y)})")
-
-    def move_signature_on_canvas(self, index, new_x, new_y):
-        sig = self.signatures[index]
-        if "canvas_id" in sig:
-            old_x = sig["canvas_x"]
-            old_y = sig["canvas_y"]
-            dx = new_x - old_x
-            dy = new_y - old_y
-            self.canvas.move(f"sig_{index}", dx, dy)
-            self.canvas.move(f"sig_bg_{index}", dx, dy)
-            self.canvas.move(f"sig_shadow_{index}", dx, dy)
-            self.canvas.move(f"sig_shadow2_{index}", dx, dy)
-            self.canvas.move(f"selection_{index}", dx, dy)
-            self.canvas.move(f"selection_glow_{index}", dx, dy)
-            for i in range(4):
-                self.canvas.move(f"corner_{index}_{i}", dx, dy)
-            sig["canvas_x"] = new_x
-            sig["canvas_y"] = new_y
+        sig.x = new_x
+        sig.y = new_y
+        if page_index != sig.page:
+            self.signatures.move(self.dragging_item, page_index)
+            self.redraw_signature(self.dragging_item)
+        else:
+            self.move_signature_on_canvas(self.dragging_item, new_canvas_x, new_canvas_y)
+        self.set_status(f"🖱️ Dragging: {sig.text[:25]} to ({int(new_x)}, {int(new_y)})")
+
+    def move_signature_on_canvas(self, item_id, new_x, new_y):
+        items = self.overlay_items.get(item_id)
+        if items is not None and items[2] is not None:
+            drawn = items[2]
+            dx = new_x - drawn[3]
+            dy = new_y - drawn[4]
+            self.canvas.move(items[0], dx, dy)
+            if items[1] is not None:
+                self.canvas.move(items[1], dx, dy)
+            items[2] = drawn[:3] + (new_x, new_y) + drawn[5:]
+            bbox = items[3]
+            items[3] = (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy)
+            self.placement_index.translate(item_id, dx / self.zoom_level, dy / self.zoom_level)
+            self.canvas_positions[item_id] = (new_x, new_y)
+            if self.selected_item == item_id:
+                self.update_selection()
 
     def on_canvas_release(self, event):
+        # Land exactly where the last motion event put the item.
+        self.frames.flush("drag")
         if self.dragging_item is not None:
             sig = self.signatures[self.dragging_item]
             grid_size = 5
-            sig["x"] = round(sig["x"] / grid_size) * grid_size
-            sig["y"] = round(sig["y"] / grid_size) * grid_size
-            self.display_page()
-            self.status_var.set(f"📍 Positioned: {sig['text'][:25]} at ({int(sig['x'])}, {int(sig['y'])})")
+            sig.x = round(sig.x / grid_size) * grid_size
+            sig.y = round(sig.y / grid_size) * grid_size
+            self.redraw_signature(self.dragging_item)
+            self.journal_record("record_change", "move", self.dragging_item, self.drag_before)
+            if sig.page != self.drag_before["page"]:
+                self.update_items_listbox()
+            self.set_status(f"📍 Positioned: {sig.text[:25]} at ({int(sig.x)}, {int(sig.y)})")
         self.is_dragging = False
         self.dragging_item = None
+        self.hover_item = None
         self.canvas.configure(cursor="arrow")
-        self.last_drag_time = 0
 
     def on_canvas_double_click(self, event):
         canvas_x = self.canvas.canvasx(event.x)
@@ -723,36 +1976,44 @@ class LivePDFESign:
             self.edit_signature(clicked_item)
 
     def on_mouse_motion(self, event):
-        if not self.pdf_doc or self.is_dragging:
+        if self.pdf_doc is None or self.is_dragging or self.document_locked:
             return
-        canvas_x = self.canvas.canvasx(event.x)
-        canvas_y = self.canvas.canvasy(event.y)
-        hover_item = self.get_signature_at_position(canvas_x, canvas_y)
+        self.frames.post("hover", self.apply_hover, event.x, event.y)
+
+    def apply_hover(self, x, y):
+        if self.pdf_doc is None or self.is_dragging or self.document_locked:
+            return
+        hover_item = self.get_signature_at_position(self.canvas.canvasx(x), self.canvas.canvasy(y))
+        if hover_item == self.hover_item:
+            return
+        self.hover_item = hover_item
         if hover_item is not None:
             self.canvas.configure(cursor="hand2")
             sig = self.signatures[hover_item]
-            self.status_var.set(f"🖱️ Hover: {sig['text'][:30]} (click to select, double-click to edit)")
+            self.set_status(f"🖱️ Hover: {sig.text[:30]} (click to select, double-click to edit)")
         else:
             self.canvas.configure(cursor="arrow")
-            if not self.is_dragging:
-                self.status_var.set("📄 Document ready - Click 'Add Signature' to start signing")
+            self.set_status("📄 Document ready - Click 'Add Signature' to start signing")
+
+    def set_status(self, text):
+        self.frames.post("status", self.status_var.set, text)
 
     def get_signature_at_position(self, canvas_x, canvas_y):
-        for i, sig in enumerate(self.signatures):
-            if sig["page"] == self.current_page and "canvas_x" in sig:
-                bbox = self.canvas.bbox(f"sig_{i}")
-                if bbox:
-                    padding = 5
-                    if (bbox[0] - padding <= canvas_x <= bbox[2] + padding and bbox[1] - padding <= canvas_y <= bbox[3] + padding):
-                        return i
-        return None
+        with profiler.timer("hit_test"):
+            page = self.page_at(canvas_y)
+            x, y = self.canvas_to_pdf(canvas_x, canvas_y, page)
+            return self.placement_index.query_point(page, x, y, self.hit_padding / self.zoom_level)
 
     def add_signature_dialog(self):
+        if self.refuse_while_saving():
+            return
         dialog = SignatureDialog(self.root, "signature")
         if dialog.result:
             self.add_signature_at_center(dialog.result, "signature")
 
     def add_text_dialog(self):
+        if self.refuse_while_saving():
+            return
         dialog = SignatureDialog(self.root, "text")
         if dialog.result:
             self.add_signature_at_center(dialog.result, "text")
@@ -761,93 +2022,189 @@ class LivePDFESign:
         date_str = datetime.now().strftime("%B %d, %Y")
         self.add_signature_at_center(date_str, "date")
 
+    def apply_rules_dialog(self):
+        if self.pdf_doc is None or self.refuse_while_saving():
+            return
+        rules_path = filedialog.askopenfilename(title="Select Placement Rules", filetypes=[("JSON files", "*.json")])
+        if not rules_path:
+            return
+        try:
+            rules = load_anchor_rules(rules_path)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            # Valid JSON of the wrong shape (a bare object, strings instead of rules) fails as a type error.
+            messagebox.showerror("Error", f"Failed to load placement rules:\n{e}")
+            return
+        self.pending_rules = rules
+        if self.word_index is not None and self.word_index[0] == self.doc_token:
+            self.apply_anchor_rules()
+            return
+        # Indexing a long document is slow the first time, so it runs in the render workers.
+        self.render_pool.submit((self.doc_token, "words"), build_word_index, self.pdf_path, self.doc_token)
+        self.set_status("🔎 Indexing document text…")
+
+    def on_word_index(self, key, index, error):
+        if error is not None:
+            self.pending_rules = None
+            self.set_status(f"❌ Failed to index document text: {error}")
+            return
+        self.word_index = (key[0], index)
+        if self.pending_rules is not None:
+            self.apply_anchor_rules()
+
+    def apply_anchor_rules(self):
+        rules, self.pending_rules = self.pending_rules, None
+        if self.save_job is not None:
+            self.set_status("⚠️ Placement rules skipped - a save is in progress")
+            return
+        placements, missing = resolve_anchor_rules(self.word_index[1], rules, self.text_metrics)
+        for sig in placements:
+            item_id = self.signatures.add(sig)
+            self.journal_record("record_add", item_id)
+        self.redraw_signatures()
+        self.update_items_listbox()
+        status = f"📌 Placed {len(placements)} item(s) from {len(rules)} rule(s)"
+        if missing:
+            status += f" - not found: {', '.join(rule.anchor for rule in missing)[:60]}"
+        self.set_status(status)
+
     def add_signature_at_center(self, text, sig_type):
-        if not self.pdf_doc:
+        if self.pdf_doc is None or self.refuse_while_saving():
             return
-        page = self.pdf_doc[self.current_page]
-        page_width, page_height = page.rect.width, page.rect.height
+        page = self.page_geometry[self.current_page]
+        page_width, page_height = page.width, page.height
         
         size = self.signature_size if sig_type == "signature" else self.text_size
         color = self.signature_color if sig_type == "signature" else self.text_color
         
-        sig = {
-            "text": text,
-            "type": sig_type,
-            "x": (page_width - 100) / 2,
-            "y": (page_height - 30) / 2,
-            "size": size,
-            "color": color,
-            "page": self.current_page,
-        }
-        self.signatures.append(sig)
-        self.display_page()
-        self.status_var.set(f"➕ Added: {text[:25]}")
+        sig = Placement(text, sig_type, (page_width - 100) / 2, (page_height - 30) / 2, size, color,
+                        self.current_page)
+        item_id = self.signatures.add(sig)
+        self.journal_record("record_add", item_id)
+        self.draw_signature_on_canvas(sig, item_id)
+        self.update_items_listbox()
+        self.set_status(f"➕ Added: {text[:25]}")
 
     def update_items_listbox(self):
         if hasattr(self, "items_listbox"):
             self.items_listbox.delete(0, tk.END)
-            for i, sig in enumerate(self.signatures):
-                if sig["page"] == self.current_page:
-                    display_text = f"{sig['type'].title()}: {sig['text'][:25]}"
-                    self.items_listbox.insert(tk.END, display_text)
+            self.listbox_ids = []
+            for item_id, sig in self.signatures.on_page(self.current_page):
+                display_text = f"{sig.type.title()}: {sig.text[:25]}"
+                self.items_listbox.insert(tk.END, display_text)
+                self.listbox_ids.append(item_id)
+        self.refresh_thumbnails()
+
+    def listbox_selection(self):
+        sel = self.items_listbox.curselection() if hasattr(self, "items_listbox") else []
+        if sel and sel[0] < len(self.listbox_ids):
+            return self.listbox_ids[sel[0]]
+        return None
 
     def highlight_selected_item(self, event=None):
-        if hasattr(self, "items_listbox"):
-            sel = self.items_listbox.curselection()
-            if sel:
-                index = sel[0]
-                sigs_on_page = [i for i, s in enumerate(self.signatures) if s["page"] == self.current_page]
-                if index < len(sigs_on_page):
-                    self.selected_item = sigs_on_page[index]
-                    self.display_page()
+        item_id = self.listbox_selection()
+        if item_id is not None:
+            self.set_selected_item(item_id)
 
     def edit_selected_item(self, event=None):
-        sel = self.items_listbox.curselection() if hasattr(self, "items_listbox") else []
-        if sel:
-            index = sel[0]
-            sigs_on_page = [i for i, s in enumerate(self.signatures) if s["page"] == self.current_page]
-            if index < len(sigs_on_page):
-                self.edit_signature(sigs_on_page[index])
-
-    def edit_signature(self, index):
-        sig = self.signatures[index]
-        dialog = SignatureDialog(self.root, sig["type"], initial=sig["text"])
+        item_id = self.listbox_selection()
+        if item_id is not None:
+            self.edit_signature(item_id)
+
+    def edit_signature(self, item_id):
+        if self.refuse_while_saving():
+            return
+        sig = self.signatures[item_id]
+        dialog = SignatureDialog(self.root, sig.type, initial=sig.text)
         if dialog.result:
-            self.signatures[index]["text"] = dialog.result
-            self.display_page()
-            self.status_var.set(f"✏️ Edited: {dialog.result[:25]}")
+            before = {"text": sig.text}
+            sig.text = dialog.result
+            self.journal_record("record_change", "edit", item_id, before)
+            self.redraw_signature(item_id)
+            self.update_items_listbox()
+            self.set_status(f"✏️ Edited: {dialog.result[:25]}")
 
     def delete_selected_item(self):
-        sel = self.items_listbox.curselection() if hasattr(self, "items_listbox") else []
-        if sel:
-            index = sel[0]
-            sigs_on_page = [i for i, s in enumerate(self.signatures) if s["page"] == self.current_page]
-            if index < len(sigs_on_page):
-                actual_index = sigs_on_page[index]
-                removed = self.signatures.pop(actual_index)
-                self.display_page()
-                self.status_var.set(f"🗑️ Deleted: {removed['text'][:25]}")
-
-    def hex_to_rgb01(self, color_str):
-        if not color_str:
-            return (0, 0, 0)
-        s = color_str.strip()
-        if s.startswith("#"):
-            s = s[1:]
-        if len(s) == 3:
-            s = "".join([c * 2 for c in s])
+        if self.refuse_while_saving():
+            return
+        item_id = self.listbox_selection()
+        if item_id is not None:
+            removed = self.signatures.remove(item_id)
+            self.journal_record("record_delete", item_id, removed)
+            if self.selected_item == item_id:
+                self.selected_item = None
+            self.redraw_signature(item_id)
+            self.update_items_listbox()
+            self.set_status(f"🗑️ Deleted: {removed.text[:25]}")
+
+    def open_journal(self, pdf_path):
+        start = time.perf_counter()
+        self.journal = SessionJournal(pdf_path)
+        try:
+            restored = self.journal.restore(self.signatures)
+        except OSError as e:
+            self.journal = None
+            self.set_status(f"⚠️ Session journal unavailable: {e}")
+            return 0, 0.0
+        return restored, (time.perf_counter() - start) * 1000
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal_record("close")
+            self.journal = None
+
+    def journal_record(self, method, *args):
+        # Journaling is best effort: a read-only folder must not stop anyone signing.
+        if self.journal is None:
+            return
+        try:
+            if method == "reset":
+                self.journal.reset()
+            else:
+                getattr(self.journal, method)(self.signatures, *args)
+        except OSError as e:
+            self.journal = None
+            self.set_status(f"⚠️ Session journal disabled: {e}")
+
+    def undo(self, event=None):
+        if not self.typing_in_entry(event):
+            self.step_journal("undo")
+
+    def redo(self, event=None):
+        if not self.typing_in_entry(event):
+            self.step_journal("redo")
+
+    def step_journal(self, direction):
+        if self.journal is None or self.is_dragging or self.refuse_while_saving():
+            return
         try:
-            r = int(s[0:2], 16) / 255.0
-            g = int(s[2:4], 16) / 255.0
-            b = int(s[4:6], 16) / 255.0
-            return (r, g, b)
-        except Exception:
-            return (0, 0, 0)
+            op = getattr(self.journal, direction)(self.signatures)
+        except OSError as e:
+            self.journal = None
+            self.set_status(f"⚠️ Session journal disabled: {e}")
+            return
+        if op is None:
+            self.set_status(f"ℹ️ Nothing to {direction}")
+            return
+        item_id = op["id"]
+        if item_id in self.signatures:
+            sig = self.signatures[item_id]
+        else:
+            sig = Placement.from_dict(op["placement"])
+            if self.selected_item == item_id:
+                self.selected_item = None
+        if sig.page not in self.drawn_pages:
+            self.go_to_page(sig.page)
+        self.redraw_signature(item_id)
+        self.update_items_listbox()
+        verb = "Undid" if direction == "undo" else "Redid"
+        self.set_status(f"↩️ {verb} {op['op']}: {sig.text[:25]}")
 
     def save_pdf(self):
-        if not self.pdf_doc:
+        if self.pdf_doc is None:
             messagebox.showwarning("Warning", "Please open a PDF document first.")
             return
+        if self.refuse_while_saving():
+            return
         
         initial = os.path.splitext(os.path.basename(self.pdf_path or "signed.pdf"))[0] + "_signed.pdf"
         out_path = filedialog.asksaveasfilename(
@@ -858,42 +2215,183 @@ class LivePDFESign:
         )
         if not out_path:
             return
-        
-        try:
-            doc = fitz.open(self.pdf_path) if self.pdf_path else self.pdf_doc
-            
-            for i, sig in enumerate(self.signatures):
-                page = doc[sig["page"]]
-                fontsize = float(sig["size"])
-                color = self.hex_to_rgb01(sig["color"])
-                fontname = "Times-Italic" if sig["type"] == "signature" else ("Helvetica-Bold" if sig["type"] == "date" else "Helvetica")
-                
-                x = max(0, min(sig["x"], page.rect.width - 2))
-                y = max(0, min(sig["y"], page.rect.height - 2))
-                
-                page.insert_text(
-                    fitz.Point(x, y),
-                    sig["text"],
-                    fontsize=fontsize,
-                    fontname=fontname,
-                    fill=color, 
-                )
-            
-            if doc is self.pdf_doc:
-                doc.save(out_path)
+
+        src_path = self.pdf_path
+        placements = self.signatures.snapshot()
+        metrics = self.text_metrics
+        profile = self.save_profile
+
+        def run(progress, cancel):
+            sign_pdf(src_path, placements, out_path, progress=progress, cancel=cancel, metrics=metrics,
+                     profile=profile)
+
+        self.start_save(run, out_path, in_place=False)
+
+    def save_pdf_in_place(self):
+        if self.pdf_doc is None:
+            messagebox.showwarning("Warning", "Please open a PDF document first.")
+            return
+        if self.refuse_while_saving():
+            return
+        if not self.signatures:
+            self.set_status("ℹ️ Nothing to save - add a signature or text first")
+            return
+        if not can_save_incrementally(self.pdf_doc, self.pdf_path):
+            messagebox.showwarning("Warning", "This document can't be updated in place.\n\nUse 'Save As…' to write a signed copy instead.")
+            return
+        filename = os.path.basename(self.pdf_path)
+        if not messagebox.askyesno("Save In Place", f"Append the {len(self.signatures)} placed item(s) to {filename}?\n\nThe original file will be updated."):
+            return
+
+        doc = self.pdf_doc
+        placements = self.signatures.snapshot()
+        metrics = self.text_metrics
+
+        def run(progress, cancel):
+            # Reuse the open document and append only the changed page streams.
+            with profiler.timer("stamp"):
+                stamp_placements(doc, placements, progress, cancel, metrics)
+            with profiler.timer("save"):
+                save_document(doc, doc.name, incremental=True, cancel=cancel)
+
+        self.document_locked = True
+        self.start_save(run, self.pdf_path, in_place=True)
+
+    def start_save(self, target, out_path, in_place):
+        # The UI thread stays off fitz while the job runs: page geometry is already cached, and
+        # pdf_doc is only ever compared with None because its truthiness calls page_count.
+        self.save_job = SaveJob(target, out_path, in_place)
+        self.set_save_controls(saving=True)
+        self.set_status(f"💾 Saving {os.path.basename(out_path)}…")
+        self.root.after(self.save_poll_interval, self.poll_save)
+
+    def poll_save(self):
+        job = self.save_job
+        if job is None:
+            return
+        outcome = None
+        while True:
+            try:
+                event = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "stamp":
+                job.pages_done, job.pages_total = event[1], event[2]
             else:
-                doc.save(out_path)
-                doc.close()
-            
-            self.status_var.set(f"✅ Successfully saved: {os.path.basename(out_path)}")
+                outcome = event
+        if outcome is None:
+            self.set_status(self.describe_save_progress(job))
+            self.root.after(self.save_poll_interval, self.poll_save)
+            return
+        self.finish_save(job, outcome)
+
+    def describe_save_progress(self, job):
+        filename = os.path.basename(job.out_path)
+        if job.cancel.is_set():
+            return f"⛔ Cancelling save of {filename}…"
+        if job.pages_total and job.pages_done < job.pages_total:
+            return f"💾 Stamping {filename}: page {job.pages_done}/{job.pages_total}…"
+        if job.in_place:
+            return f"💾 Appending changes to {filename}…"
+        return f"💾 Writing {filename}: {job.bytes_written() / (1024 * 1024):.1f} MB written…"
+
+    def finish_save(self, job, outcome):
+        self.save_job = None
+        self.document_locked = False
+        self.set_save_controls(saving=False)
+        status, error = outcome[0], outcome[1]
+        filename = os.path.basename(job.out_path)
+        elapsed = time.perf_counter() - job.started
+        profiler.record("save_pdf", elapsed)
+        profiler.count(f"save_{status}")
+
+        if job.in_place and status != "done":
+            # The open document may already carry stamped text; reload it from the untouched file.
+            self.reload_document()
+
+        if status == "cancelled":
+            self.set_status(f"⛔ Save cancelled - {filename} was not written")
+        elif status == "error":
+            self.set_status(f"❌ Failed to save {filename}")
+            messagebox.showerror("Error", f"Failed to save PDF:\n{str(error)}\n\nPlease check file permissions and try again.")
+        elif job.in_place:
+            # The placements are now part of the page content, and the file on disk has changed.
+            self.render_cache.invalidate_document(self.doc_token)
+            self.doc_token += 1
+            self.signatures.clear()
+            self.journal_record("reset")
+            self.placement_index.clear()
+            self.selected_item = None
+            self.dragging_item = None
+            self.page_layer_key = None
+            self.layout_thumbnails()
+            self.display_page()
+            self.set_status(f"✅ Saved in place: {filename} ({elapsed * 1000:.0f} ms)")
+        else:
+            size = os.path.getsize(job.out_path) / 1e6
+            self.set_status(f"✅ Successfully saved: {filename} ({elapsed:.1f} s, {size:.1f} MB, {self.save_profile})")
             
-            success_msg = f"Your signed PDF has been saved successfully!\n\n📁 Location: {out_path}\n\n🎉 Ready to share or print!"
+            success_msg = f"Your signed PDF has been saved successfully!\n\n📁 Location: {job.out_path}\n\n🎉 Ready to share or print!"
             messagebox.showinfo("Success - Document Saved", success_msg)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save PDF:\n{str(e)}\n\nPlease check file permissions and try again.")
+
+    def cancel_save(self, event=None):
+        if self.save_job is not None:
+            self.save_job.cancel.set()
+            self.set_status(self.describe_save_progress(self.save_job))
+
+    def set_save_controls(self, saving):
+        state = tk.DISABLED if saving else tk.NORMAL
+        self.save_btn.configure(state=state)
+        self.save_in_place_btn.configure(state=state)
+        if saving:
+            self.cancel_save_btn.pack(side=tk.RIGHT)
+        else:
+            self.cancel_save_btn.pack_forget()
+
+    def refuse_while_saving(self):
+        if self.save_job is None:
+            return False
+        self.set_status("⏳ A save is in progress - placements are locked until it finishes")
+        return True
+
+    def reload_document(self):
+        self.pdf_doc.close()
+        self.render_cache.invalidate_document(self.doc_token)
+        self.pdf_doc = fitz.open(self.pdf_path)
+        self.page_geometry = read_page_geometry(self.pdf_doc)
+        self.doc_token += 1
+        self.page_layer_key = None
+        self.layout_thumbnails()
+        self.display_page()
+
+def parse_gui_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="pdf_esign",
+        description=f"Live PDF e-sign editor. Headless commands ({', '.join(esign_core.CLI_COMMANDS)}) "
+                    "are passed through to esign_core; see 'pdf_esign.py batch --help'.")
+    parser.add_argument("pdf", nargs="?", default=None, help="PDF to open on start-up")
+    parser.add_argument("--perf", action="store_true",
+                        help="time the hot paths, show a live overlay and write a JSON report on exit")
+    parser.add_argument("--perf-report", default=None, metavar="PATH",
+                        help=f"where --perf writes its report (default: {profiler.report_path})")
+    parser.add_argument("--profile", choices=sorted(SAVE_PROFILES),
+                        default=os.environ.get("ESIGN_SAVE_PROFILE", DEFAULT_SAVE_PROFILE),
+                        help="save profile for 'Save As' (default: $ESIGN_SAVE_PROFILE, else "
+                             f"{DEFAULT_SAVE_PROFILE}); fast skips garbage collection, compact is smallest")
+    args = parser.parse_args(argv)
+    # argparse checks choices only for values given on the command line, not for the default.
+    if args.profile not in SAVE_PROFILES:
+        parser.error(f"ESIGN_SAVE_PROFILE={args.profile!r} is not a save profile "
+                     f"(choose from {', '.join(sorted(SAVE_PROFILES))})")
+    return args
 
 if __name__ == "__main__":
+    args = parse_gui_args(sys.argv[1:])
+    if args.perf:
+        profiler.enabled = True
+    if args.perf_report:
+        profiler.report_path = args.perf_report
+
     root = tk.Tk()
     
     try:
@@ -908,7 +2406,9 @@ if __name__ == "__main__":
     except Exception:
         pass
     
-    app = LivePDFESign(root)
+    app = LivePDFESign(root, save_profile=args.profile)
+    if args.pdf:
+        app.open_pdf(os.path.abspath(args.pdf))
     
     root.update_idletasks()
     x = (root.winfo_screenwidth() // 2) - (root.winfo_width() // 2)
@@ -0,0 +1,117 @@
+import json
+import os
+import subprocess
+import sys
+
+import fitz
+import pytest
+
+from esign_core import main
+
+
+def make_pdf(path, pages=3):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 100), f"Signature: ____ page {i}", fontsize=12)
+    doc.save(path)
+    doc.close()
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.fixture
+def inbox(tmp_path, monkeypatch):
+    monkeypatch.setenv("ESIGN_CACHE_DIR", str(tmp_path / "cache"))
+    directory = tmp_path / "in"
+    (directory / "sub").mkdir(parents=True)
+    make_pdf(directory / "a.pdf")
+    make_pdf(directory / "b.pdf", pages=1)
+    make_pdf(directory / "sub" / "c.pdf")
+    return directory
+
+
+def page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text() for page in doc]
+
+
+def test_batch_stamps_every_pdf_and_counts_negative_pages_from_the_end(inbox, tmp_path):
+    template = write_json(tmp_path / "template.json", [
+        {"text": "Jane Doe", "type": "signature", "x": 100, "y": 200, "page": 0},
+        {"text": "Approved", "type": "text", "x": 100, "y": 300, "page": -1},
+    ])
+    out = tmp_path / "out"
+
+    assert main(["batch", str(inbox), str(out), "-t", template, "-w", "1"]) == 0
+    assert sorted(os.listdir(out)) == ["a_signed.pdf", "b_signed.pdf"]
+    pages = page_texts(out / "a_signed.pdf")
+    assert "Jane Doe" in pages[0] and "Approved" not in pages[0]
+    assert "Approved" in pages[2] and "Jane Doe" not in pages[2]
+    assert "Jane Doe" in page_texts(out / "b_signed.pdf")[0] and "Approved" in page_texts(out / "b_signed.pdf")[0]
+    assert page_texts(inbox / "a.pdf")[0].count("Jane Doe") == 0
+
+
+def test_batch_recursive_with_a_custom_suffix(inbox, tmp_path):
+    template = write_json(tmp_path / "template.json", [{"text": "JD", "x": 10, "y": 10}])
+    out = tmp_path / "out"
+    assert main(["batch", str(inbox), str(out), "-t", template, "-w", "1", "--recursive", "--suffix=-x"]) == 0
+    assert os.path.exists(out / "sub" / "c-x.pdf")
+
+
+def test_batch_fails_a_page_outside_a_short_document(inbox, tmp_path, capsys):
+    template = write_json(tmp_path / "template.json", [{"text": "JD", "x": 10, "y": 10, "page": -2}])
+    out = tmp_path / "out"
+    assert main(["batch", str(inbox), str(out), "-t", template, "-w", "1"]) == 1
+    report = capsys.readouterr().out
+    assert "FAILED" in report and "b.pdf" in report and "out of range" in report
+    assert os.listdir(out) == ["a_signed.pdf"]
+
+
+def test_missing_anchor_exits_1_in_batch_as_in_anchors(inbox, tmp_path, capsys):
+    rules = write_json(tmp_path / "rules.json", [{"anchor": "Signature:", "text": "JD"},
+                                                 {"anchor": "Witness:", "text": "W"}])
+    out = tmp_path / "out"
+    assert main(["batch", str(inbox), str(out), "-r", rules, "-w", "1"]) == 1
+    assert "2 missing anchors" in capsys.readouterr().out
+    assert "JD" in page_texts(out / "a_signed.pdf")[0]
+
+    assert main(["anchors", str(inbox / "a.pdf"), "-r", rules]) == 1
+
+    found = write_json(tmp_path / "found.json", [{"anchor": "Signature:", "text": "JD"}])
+    assert main(["batch", str(inbox), str(out), "-r", found, "-w", "1"]) == 0
+    assert main(["anchors", str(inbox / "a.pdf"), "-r", found]) == 0
+
+
+def test_anchors_writes_a_template_batch_can_use(inbox, tmp_path):
+    rules = write_json(tmp_path / "rules.json", [{"anchor": "Signature:", "text": "JD", "occurrence": "all"}])
+    template = tmp_path / "template.json"
+    assert main(["anchors", str(inbox / "a.pdf"), "-r", rules, "-o", str(template)]) == 0
+    placements = json.loads(template.read_text())
+    assert [p["page"] for p in placements] == [0, 1, 2]
+    assert main(["batch", str(inbox), str(tmp_path / "out"), "-t", str(template), "-w", "1",
+                 "--pattern", "a.pdf"]) == 0
+
+
+def test_batch_usage_errors(inbox, tmp_path, capsys):
+    assert main(["batch", str(inbox), str(tmp_path / "out")]) == 2
+    template = write_json(tmp_path / "template.json", [{"text": "JD", "x": 10, "y": 10}])
+    assert main(["batch", str(tmp_path / "empty"), str(tmp_path / "out"), "-t", template]) == 1
+    assert "No files matching" in capsys.readouterr().err
+    with pytest.raises(SystemExit) as error:
+        main(["batch", str(inbox), str(tmp_path / "out"), "-t", template, "--profile", "tiny"])
+    assert error.value.code == 2
+
+
+def test_pdf_esign_script_runs_commands_without_tk(inbox, tmp_path):
+    template = write_json(tmp_path / "template.json", [{"text": "JD", "x": 10, "y": 10}])
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import runpy, sys; sys.modules['tkinter'] = None; "
+            f"sys.argv = ['pdf_esign.py', '--perf-report', {str(tmp_path / 'perf.json')!r}, 'batch', "
+            f"{str(inbox)!r}, {str(tmp_path / 'out')!r}, '-t', {template!r}, '-w', '1']; "
+            "runpy.run_path('pdf_esign.py', run_name='__main__')")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert os.path.exists(tmp_path / "out" / "a_signed.pdf")
@@ -0,0 +1,262 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+import fitz
+import pytest
+
+from esign_service import read_multipart, RequestError, serve
+
+BOUNDARY = "esign-test-boundary"
+
+
+def make_pdf(pages=2, lines=1):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), [f"Signature: line {i}"] * lines, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def placements(count=1, page=0):
+    return [{"text": f"Jane Doe {i}", "type": "signature", "x": 100 + i % 300, "y": 100 + i % 500, "page": page}
+            for i in range(count)]
+
+
+def multipart(pdf, **fields):
+    parts = [(name, "application/json", json.dumps(value).encode()) for name, value in fields.items()]
+    parts.append(("pdf", "application/pdf", pdf))
+    body = b""
+    for name, content_type, data in parts:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{name}\"\r\n"
+                 f"Content-Type: {content_type}\r\n\r\n").encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.fixture(scope="module")
+def server():
+    started = threading.Event()
+    servers = []
+
+    def ready(server):
+        servers.append(server)
+        started.set()
+
+    thread = threading.Thread(target=serve, kwargs={"port": 0, "workers": 1, "max_queue": 1, "max_mb": 1,
+                                                    "timeout": 60, "ready": ready}, daemon=True)
+    thread.start()
+    assert started.wait(120)
+    yield servers[0]
+    servers[0].shutdown()
+    thread.join(120)
+
+
+def request(server, method, path, body=None, headers=None, **kwargs):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=120)
+    try:
+        conn.request(method, path, body=body, headers=headers or {}, **kwargs)
+        response = conn.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        conn.close()
+
+
+def sign(server, pdf, items=None, path="/sign", **headers):
+    if items is not None:
+        headers["X-Placements"] = json.dumps(items)
+    return request(server, "POST", path, pdf, {"Content-Type": "application/pdf", **headers})
+
+
+def metrics(server):
+    return json.loads(request(server, "GET", "/metrics")[2])
+
+
+def wait_until_idle(server, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        current = metrics(server)
+        if current["in_flight"] == 0 and current["signing"] == 0:
+            return current
+        time.sleep(0.05)
+    raise AssertionError(f"service still busy: {current}")
+
+
+def test_signs_a_pdf_with_placements_in_a_header(server):
+    status, headers, body = sign(server, make_pdf(), placements(1, page=1))
+    assert status == 200
+    assert headers["Content-Type"] == "application/pdf"
+    assert int(headers["Content-Length"]) == len(body)
+    with fitz.open(stream=body) as doc:
+        assert "Jane Doe 0" in doc[1].get_text()
+
+
+def test_signs_a_large_placement_set_from_a_multipart_body(server):
+    rules = [{"anchor": "Signature:", "text": "JD", "type": "text"}, {"anchor": "Witness", "text": "x"}]
+    body = multipart(make_pdf(), placements=placements(2000), rules=rules)
+    status, headers, signed = request(server, "POST", "/sign", body,
+                                      {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert status == 200, signed
+    assert headers["X-Esign-Placements"] == "2001"
+    assert json.loads(headers["X-Esign-Missing-Anchors"]) == ["Witness"]
+    with fitz.open(stream=signed) as doc:
+        assert "Jane Doe 1999" in doc[0].get_text()
+
+
+def test_chunked_upload(server):
+    pdf = make_pdf(pages=20, lines=30)
+    chunks = (pdf[i:i + 5000] for i in range(0, len(pdf), 5000))
+    status, _, body = request(server, "POST", "/sign", chunks,
+                              {"Content-Type": "application/pdf", "Transfer-Encoding": "chunked",
+                               "X-Placements": json.dumps(placements(3))}, encode_chunked=True)
+    assert status == 200
+    assert fitz.open(stream=body).page_count == 20
+
+
+@pytest.mark.parametrize("headers, body", [
+    ({}, None),
+    ({"X-Placements": "not json"}, None),
+    ({"X-Placements": json.dumps({"text": "x"})}, None),
+    ({"X-Placements": json.dumps([{"text": "x", "x": 1, "y": 1, "type": "stamp"}])}, None),
+    ({"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}, b"--" + BOUNDARY.encode() + b"--\r\n"),
+    ({"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}, b"garbage"),
+])
+def test_bad_requests_get_400(server, headers, body):
+    headers = {"Content-Type": "application/pdf", **headers}
+    status, _, data = request(server, "POST", "/sign", body if body is not None else make_pdf(), headers)
+    assert status == 400
+    assert "error" in json.loads(data)
+
+
+def test_unknown_profile_and_endpoint(server):
+    assert sign(server, make_pdf(), placements(), path="/sign?profile=tiny")[0] == 400
+    assert sign(server, make_pdf(), placements(), path="/stamp")[0] == 404
+
+
+def test_oversized_upload_gets_413_before_the_body_is_read(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=60)
+    conn.putrequest("POST", "/sign")
+    conn.putheader("Content-Length", str(2 * 1024 * 1024))
+    conn.putheader("X-Placements", json.dumps(placements()))
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 413
+    conn.close()
+    wait_until_idle(server)
+
+
+def test_full_queue_gets_429(server):
+    service = server.service
+    held = [service.admit() for _ in range(service.capacity)]
+    try:
+        assert all(held)
+        status, headers, _ = sign(server, make_pdf(), placements())
+        assert status == 429
+        assert headers["Retry-After"] == "1"
+
+        # With Expect: 100-continue the refusal arrives before any of the body is sent.
+        with socket.create_connection(server.server_address, timeout=30) as sock:
+            sock.sendall(b"POST /sign HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/pdf\r\n"
+                         b"Content-Length: 1000000\r\nExpect: 100-continue\r\n\r\n")
+            assert b" 429 " in sock.recv(4096).split(b"\r\n")[0]
+    finally:
+        for _ in held:
+            service.release()
+    assert metrics(server)["rejected"] >= 2
+    assert sign(server, make_pdf(), placements())[0] == 200
+
+
+def test_oversized_header_gets_431_with_expect_continue(server):
+    header = json.dumps(placements(2000))
+    assert len(header) > 65536
+    with socket.create_connection(server.server_address, timeout=30) as sock:
+        sock.sendall(b"POST /sign HTTP/1.1\r\nHost: localhost\r\nContent-Length: 1000000\r\n"
+                     b"Expect: 100-continue\r\nX-Placements: " + header.encode() + b"\r\n\r\n")
+        assert b" 431 " in sock.recv(4096).split(b"\r\n")[0]
+
+
+def test_unreadable_pdf_gets_422_without_server_paths(server):
+    status, _, body = sign(server, b"%PDF-1.7 this is not really a pdf", placements())
+    assert status == 422
+    error = json.loads(body)["error"]
+    assert server.service.tmp_dir not in error
+    assert ".pdf" not in error
+
+
+def test_placement_off_the_document_gets_422(server):
+    for page in (2, -3):
+        status, _, body = sign(server, make_pdf(pages=2), placements(1, page=page))
+        assert status == 422
+        assert json.loads(body)["error"] == f"Page index {page} is out of range for a 2-page document"
+
+
+def test_negative_pages_count_from_the_end_like_batch(server):
+    status, _, body = sign(server, make_pdf(pages=3), placements(1, page=-1))
+    assert status == 200
+    with fitz.open(stream=body) as doc:
+        assert "Jane Doe 0" in doc[2].get_text()
+        assert "Jane Doe 0" not in doc[0].get_text()
+
+
+def test_crashed_worker_is_replaced(server):
+    service = server.service
+    restarts = metrics(server)["worker_restarts"]
+    with pytest.raises(Exception):
+        service.executor.submit(os._exit, 1).result(timeout=60)
+
+    status, _, body = sign(server, make_pdf(), placements())
+    assert status == 200
+    assert fitz.open(stream=body).page_count == 2
+    assert metrics(server)["worker_restarts"] == restarts + 1
+    assert sign(server, make_pdf(), placements())[0] == 200
+
+
+def test_timed_out_job_keeps_its_slot_and_files_until_the_worker_finishes(server, monkeypatch):
+    service = server.service
+    monkeypatch.setattr(service, "timeout", 0.05)
+    body = multipart(make_pdf(pages=300, lines=40), placements=placements(3000))
+    status, _, _ = request(server, "POST", "/sign?profile=compact", body,
+                           {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert status == 504
+    busy = metrics(server)
+    assert busy["in_flight"] == 1 and busy["signing"] == 1
+    assert os.listdir(service.tmp_dir)
+
+    idle = wait_until_idle(server)
+    assert idle["timed_out"] >= 1
+    assert os.listdir(service.tmp_dir) == []
+
+
+def test_metrics_and_healthz(server):
+    status, _, body = request(server, "GET", "/healthz")
+    assert (status, body) == (200, b"ok\n")
+    current = metrics(server)
+    for name in ("in_flight", "queue_depth", "signed", "rejected", "docs_per_sec", "docs_per_sec_1m", "latency"):
+        assert name in current
+    assert current["capacity"] == 2
+
+
+def test_multipart_reader_handles_delimiters_split_across_chunks():
+    pdf = bytes(range(256)) * 500 + b"\r\n--" + BOUNDARY[:-3].encode()
+    body = multipart(pdf, placements=placements(2))
+    received = {}
+
+    def open_part(name):
+        received[name] = bytearray()
+        return received[name].extend
+
+    for size in (1, 7, 64, 4096):
+        received.clear()
+        read_multipart((body[i:i + size] for i in range(0, len(body), size)), BOUNDARY.encode(), open_part)
+        assert bytes(received["pdf"]) == pdf
+        assert json.loads(received["placements"]) == placements(2)
+
+
+def test_multipart_reader_rejects_a_truncated_body():
+    body = multipart(b"%PDF-1.7", placements=placements())[:-10]
+    with pytest.raises(RequestError) as error:
+        read_multipart(iter([body]), BOUNDARY.encode(), lambda name: lambda data: None)
+    assert error.value.status == 400
@@ -0,0 +1,96 @@
+import pytest
+
+from esign_render import FrameScheduler
+
+
+class FakeRoot:
+    # Records what Tk would schedule, so frames run only when the test says so.
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, callback):
+        self.jobs.append(("after", ms, callback))
+        return len(self.jobs)
+
+    def after_idle(self, callback):
+        self.jobs.append(("idle", None, callback))
+        return len(self.jobs)
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for _, _, callback in jobs:
+            callback()
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+def test_updates_with_the_same_name_coalesce_to_the_latest(root):
+    frames, calls = FrameScheduler(root), []
+    for x in range(5):
+        frames.post("drag", lambda *args: calls.append(args), x, x * 2)
+    assert len(root.jobs) == 1 and calls == []
+    root.run()
+    assert calls == [(4, 8)]
+    stats = frames.stats()
+    assert (stats["frames"], stats["posted"], stats["coalesced"]) == (1, 5, 4)
+
+
+def test_names_run_in_first_posted_order(root):
+    frames, calls = FrameScheduler(root), []
+    frames.post("hover", calls.append, "hover 1")
+    frames.post("status", calls.append, "status")
+    frames.post("hover", calls.append, "hover 2")
+    root.run()
+    assert calls == ["hover 2", "status"]
+
+
+def test_first_frame_runs_when_idle_and_the_next_waits_out_the_budget(root):
+    frames = FrameScheduler(root, frame_ms=1000)
+    frames.post("a", lambda: None)
+    assert root.jobs[0][0] == "idle"
+    root.run()
+    frames.post("a", lambda: None)
+    kind, ms, _ = root.jobs[0]
+    assert kind == "after" and 900 < ms <= 1001
+
+
+def test_updates_posted_during_a_frame_wait_for_the_next_one(root):
+    frames, calls = FrameScheduler(root, frame_ms=0), []
+
+    def chain(n):
+        calls.append(n)
+        if n < 3:
+            frames.post("chain", chain, n + 1)
+
+    frames.post("chain", chain, 1)
+    for expected in ([1], [1, 2], [1, 2, 3]):
+        root.run()
+        assert calls == expected
+    assert root.jobs == [] and frames.stats()["frames"] == 3
+
+
+def test_flush_runs_now_and_cancel_drops(root):
+    frames, calls = FrameScheduler(root), []
+    frames.post("drag", calls.append, "drag")
+    frames.post("hover", calls.append, "hover")
+    frames.flush("drag")
+    assert calls == ["drag"]
+    frames.cancel("hover")
+    frames.flush("missing")
+    root.run()
+    assert calls == ["drag"]
+
+
+def test_frame_time_stats(root):
+    frames = FrameScheduler(root, history=3)
+    assert frames.stats()["avg_ms"] == 0.0 and frames.stats()["max_ms"] == 0.0
+    for _ in range(5):
+        frames.post("a", lambda: None)
+        root.run()
+    assert len(frames.frame_times) == 3
+    stats = frames.stats()
+    assert stats["frames"] == 5
+    assert 0 <= stats["avg_ms"] <= stats["p95_ms"] <= stats["max_ms"]
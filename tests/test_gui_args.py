@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("tkinter")
+
+from pdf_esign import parse_gui_args
+
+
+def test_defaults(monkeypatch):
+    monkeypatch.delenv("ESIGN_SAVE_PROFILE", raising=False)
+    args = parse_gui_args([])
+    assert (args.pdf, args.perf, args.perf_report, args.profile) == (None, False, None, "fast")
+
+
+def test_flags_in_any_order():
+    args = parse_gui_args(["--perf", "doc.pdf", "--profile", "compact", "--perf-report", "out.json"])
+    assert (args.pdf, args.perf, args.perf_report, args.profile) == ("doc.pdf", True, "out.json", "compact")
+
+
+def test_profile_defaults_to_the_environment(monkeypatch):
+    monkeypatch.setenv("ESIGN_SAVE_PROFILE", "compact")
+    assert parse_gui_args([]).profile == "compact"
+    assert parse_gui_args(["--profile", "fast"]).profile == "fast"
+
+
+def test_unknown_profile_is_rejected_at_startup(monkeypatch, capsys):
+    monkeypatch.delenv("ESIGN_SAVE_PROFILE", raising=False)
+    with pytest.raises(SystemExit) as error:
+        parse_gui_args(["--profile", "compcat"])
+    assert error.value.code == 2
+
+    monkeypatch.setenv("ESIGN_SAVE_PROFILE", "compcat")
+    with pytest.raises(SystemExit) as error:
+        parse_gui_args(["doc.pdf"])
+    assert error.value.code == 2
+    assert "ESIGN_SAVE_PROFILE='compcat'" in capsys.readouterr().err
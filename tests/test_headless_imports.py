@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ["esign_core", "esign_render", "esign_service", "benchmarks.bench_suite",
+                                    "benchmarks.bench_pixmap_conversion"])
+def test_imports_without_tk(module):
+    # A None entry in sys.modules makes any import of tkinter raise ImportError, as on a server without Tk.
+    code = f"import sys; sys.modules['tkinter'] = None; import {module}; assert 'PIL.ImageTk' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,67 @@
+import pytest
+
+from esign_render import PageRenderCache
+
+
+def key(doc, page, zoom=1.0):
+    return (doc, page, zoom)
+
+
+def test_hits_misses_and_hit_rate():
+    cache = PageRenderCache()
+    assert cache.get(key(1, 0)) is None
+    cache.put(key(1, 0), "page0", 100)
+    assert cache.get(key(1, 0)) == "page0"
+    assert cache.get(key(1, 0)) == "page0"
+    assert key(1, 0) in cache and key(1, 1) not in cache
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (2, 1, 1, 100)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_memory_cap_evicts_least_recently_used_first():
+    cache = PageRenderCache(max_bytes=300)
+    for page in range(3):
+        cache.put(key(1, page), page, 100)
+    cache.get(key(1, 0))
+    cache.put(key(1, 3), 3, 150)
+    assert list(cache.entries) == [key(1, 0), key(1, 3)]
+    assert cache.total_bytes == 250
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entry_cap():
+    cache = PageRenderCache(max_bytes=10 ** 9, max_entries=2)
+    for page in range(5):
+        cache.put(key(1, page), page, 1)
+    assert list(cache.entries) == [key(1, 3), key(1, 4)]
+    assert cache.total_bytes == 2 and cache.evictions == 3
+
+
+def test_replacing_a_key_updates_the_byte_count():
+    cache = PageRenderCache(max_bytes=1000)
+    cache.put(key(1, 0), "small", 100)
+    cache.put(key(1, 0), "large", 400)
+    assert cache.total_bytes == 400 and cache.get(key(1, 0)) == "large"
+
+
+def test_oversized_buffer_is_not_cached_and_evicts_nothing():
+    cache = PageRenderCache(max_bytes=500)
+    cache.put(key(1, 0), "page0", 100)
+    cache.put(key(1, 1), "huge", 501)
+    assert key(1, 1) not in cache
+    assert list(cache.entries) == [key(1, 0)] and cache.total_bytes == 100
+    # Replacing an entry with one too large to keep drops the stale one.
+    cache.put(key(1, 0), "huge", 501)
+    assert key(1, 0) not in cache and cache.total_bytes == 0
+
+
+def test_invalidate_document_drops_only_that_documents_entries():
+    cache = PageRenderCache()
+    cache.put(key(1, 0), "a", 10)
+    cache.put(key(2, 0), "b", 20)
+    cache.put(key(1, 1, 2.0), "c", 30)
+    cache.invalidate_document(1)
+    assert list(cache.entries) == [key(2, 0)] and cache.total_bytes == 20
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.total_bytes == 0
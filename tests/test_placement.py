@@ -0,0 +1,60 @@
+import pickle
+
+import pytest
+
+from esign_core import DEFAULT_COLORS, DEFAULT_SIZES, Placement
+
+
+def test_from_dict_round_trips_through_to_dict():
+    original = Placement("Jane Doe", "signature", 12.5, 40.0, 18.0, "#3b82f6", 3)
+    data = original.to_dict()
+    assert data == {"text": "Jane Doe", "type": "signature", "x": 12.5, "y": 40.0, "size": 18.0,
+                    "color": "#3b82f6", "page": 3}
+    assert Placement.from_dict(data).to_dict() == data
+
+
+def test_from_dict_fills_in_defaults_and_coerces_numbers():
+    placement = Placement.from_dict({"text": 42, "x": "10", "y": 20, "type": "date"})
+    assert placement.to_dict() == {"text": "42", "type": "date", "x": 10.0, "y": 20.0,
+                                   "size": float(DEFAULT_SIZES["date"]), "color": DEFAULT_COLORS["date"],
+                                   "page": 0}
+    assert Placement.from_dict({"text": "t", "x": 0, "y": 0}).type == "text"
+
+
+@pytest.mark.parametrize("data", [
+    ["text", 1, 2],
+    "Jane Doe",
+    None,
+    {"text": "x", "x": 1},
+    {"x": 1, "y": 2},
+    {"text": "x", "x": 1, "y": 2, "type": "stamp"},
+    {"text": "x", "x": None, "y": 2},
+    {"text": "x", "x": "left", "y": 2},
+    {"text": "x", "x": [1], "y": 2},
+    {"text": "x", "x": float("nan"), "y": 2},
+    {"text": "x", "x": 1, "y": float("inf")},
+    {"text": "x", "x": 1, "y": 2, "size": 0},
+    {"text": "x", "x": 1, "y": 2, "page": "last"},
+    {"text": "x", "x": 1, "y": 2, "page": float("inf")},
+])
+def test_from_dict_rejects_bad_input_with_value_error(data):
+    with pytest.raises(ValueError):
+        Placement.from_dict(data)
+
+
+def test_slots_keep_instances_dict_free():
+    placement = Placement("A", "text", 1, 2, 14, "#000000")
+    assert not hasattr(placement, "__dict__")
+    with pytest.raises(AttributeError):
+        placement.colour = "#ffffff"
+
+
+def test_copy_and_pickle_are_independent_equal_records():
+    placement = Placement("A", "signature", 1, 2, 18, "#3b82f6", 4)
+    copy = placement.copy()
+    copy.x = 99
+    assert placement.x == 1
+    restored = pickle.loads(pickle.dumps(placement))
+    assert restored.to_dict() == placement.to_dict()
+    # __reduce__ ships a flat tuple instead of the slots state dict.
+    assert len(pickle.dumps(placement)) < len(pickle.dumps(placement.to_dict()))
@@ -0,0 +1,77 @@
+from esign_core import PlacementIndex
+
+
+def test_box_spanning_cells_is_found_from_every_cell():
+    index = PlacementIndex(cell_size=32)
+    index.insert(1, 0, (20, 20, 80, 40))
+    for x, y in [(20, 20), (31.9, 30), (32, 32), (63.9, 39), (64, 40), (80, 40)]:
+        assert index.query_point(0, x, y) == 1
+    assert index.query_point(0, 80.1, 40) is None
+    assert index.query_point(0, 50, 19.9) is None
+
+
+def test_padding_reaches_into_the_neighbouring_cell():
+    index = PlacementIndex(cell_size=32)
+    index.insert(1, 0, (34, 34, 60, 50))
+    assert index.query_point(0, 30, 40) is None
+    assert index.query_point(0, 30, 40, padding=5) == 1
+    assert index.query_point(0, 28, 40, padding=5) is None
+
+
+def test_overlapping_boxes_return_the_lowest_key():
+    index = PlacementIndex(cell_size=32)
+    index.insert(7, 0, (0, 0, 100, 100))
+    index.insert(3, 0, (50, 50, 150, 150))
+    assert index.query_point(0, 75, 75) == 3
+    assert index.query_point(0, 25, 25) == 7
+    assert index.query_point(0, 125, 125) == 3
+
+
+def test_pages_are_separate():
+    index = PlacementIndex()
+    index.insert(1, 0, (10, 10, 50, 30))
+    assert index.query_point(1, 20, 20) is None
+    assert index.query_point(0, 20, 20) == 1
+
+
+def test_translate_moves_the_box_across_cells():
+    index = PlacementIndex(cell_size=32)
+    index.insert(1, 0, (10, 10, 30, 20))
+    index.translate(1, 100, 64)
+    assert index.query_point(0, 20, 15) is None
+    assert index.query_point(0, 120, 80) == 1
+    assert index.boxes[1] == (0, 110, 74, 130, 84)
+    # Nothing is left behind in the cells the box used to cover.
+    assert sorted(index.pages[0]) == [(3, 2), (4, 2)]
+
+
+def test_reinserting_on_another_page_moves_the_item():
+    index = PlacementIndex()
+    index.insert(1, 0, (10, 10, 50, 30))
+    index.insert(1, 2, (10, 10, 50, 30))
+    assert index.query_point(0, 20, 20) is None
+    assert index.query_point(2, 20, 20) == 1
+
+
+def test_remove_drops_the_box_and_empty_cells():
+    index = PlacementIndex(cell_size=32)
+    index.insert(1, 0, (0, 0, 100, 100))
+    index.insert(2, 0, (10, 10, 20, 20))
+    index.remove(1)
+    assert index.query_point(0, 90, 90) is None
+    assert index.query_point(0, 15, 15) == 2
+    assert list(index.pages[0]) == [(0, 0)]
+    index.remove(2)
+    index.remove(2)
+    assert index.query_point(0, 15, 15) is None
+    assert index.pages[0] == {}
+
+
+def test_clear_page_forgets_only_that_page():
+    index = PlacementIndex()
+    index.insert(1, 0, (10, 10, 50, 30))
+    index.insert(2, 1, (10, 10, 50, 30))
+    index.clear_page(0)
+    assert index.query_point(0, 20, 20) is None
+    assert index.query_point(1, 20, 20) == 2
+    assert 1 not in index.boxes
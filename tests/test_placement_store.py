@@ -0,0 +1,77 @@
+import pytest
+
+from esign_core import Placement, PlacementStore
+
+
+def placement(text, page=0):
+    return Placement(text, "text", 10, 20, 14, "#1e293b", page)
+
+
+@pytest.fixture
+def store():
+    store = PlacementStore()
+    for text, page in [("A", 0), ("B", 2), ("C", 0), ("D", 1)]:
+        store.add(placement(text, page))
+    return store
+
+
+def texts(items):
+    return [p.text for p in items]
+
+
+def test_ids_are_stable_and_never_reused_after_a_delete(store):
+    assert list(store.items) == [1, 2, 3, 4]
+    store.remove(4)
+    assert store.add(placement("E")) == 5
+    assert store[2].text == "B" and 4 not in store
+
+
+def test_explicit_ids_move_next_id_past_them():
+    store = PlacementStore()
+    assert store.add(placement("A"), 10) == 10
+    assert store.add(placement("B")) == 11
+    assert store.add(placement("C"), 3) == 3
+    assert store.next_id == 12
+
+
+def test_pages_are_bucketed_and_iterated_in_page_order(store):
+    assert [item_id for item_id, _ in store.on_page(0)] == [1, 3]
+    assert store.count_on_page(0) == 2 and store.count_on_page(5) == 0
+    assert store.on_page(5) == []
+    assert [(page, texts(items)) for page, items in store.by_page()] == [(0, ["A", "C"]), (1, ["D"]), (2, ["B"])]
+
+
+def test_remove_returns_the_placement_and_drops_empty_buckets(store):
+    removed = store.remove(4)
+    assert removed.text == "D"
+    assert 1 not in store.pages
+    assert len(store) == 3
+    with pytest.raises(KeyError):
+        store.remove(4)
+
+
+def test_move_rebuckets_under_the_same_id(store):
+    moved = store.move(1, 2)
+    assert moved.page == 2 and store[1] is moved
+    assert texts(p for _, p in store.on_page(0)) == ["C"]
+    assert [item_id for item_id, _ in store.on_page(2)] == [2, 1]
+    store.move(3, 2)
+    assert 0 not in store.pages
+    assert len(store) == 4
+
+
+def test_snapshot_is_a_deep_copy(store):
+    copy = store.snapshot()
+    store[1].x = 999
+    store.move(2, 0)
+    store.remove(3)
+    assert copy[1].x == 10
+    assert copy[2].page == 2 and copy.count_on_page(0) == 2
+    assert texts(copy) == ["A", "B", "C", "D"]
+
+
+def test_clear_keeps_ids_moving_forward(store):
+    store.clear()
+    assert len(store) == 0 and store.pages == {}
+    assert list(store.by_page()) == []
+    assert store.add(placement("E")) == 5
@@ -0,0 +1,106 @@
+import json
+import threading
+
+import pytest
+
+from esign_core import LATENCY_BUCKETS_MS, LatencyHistogram, Profiler
+
+
+def histogram(samples):
+    h = LatencyHistogram()
+    for ms in samples:
+        h.add(ms)
+    return h
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    h = histogram(range(1, 101))
+    assert h.percentile(0.5) == 50
+    assert h.percentile(0.25) == 25
+    assert h.percentile(0.26) == 50
+    assert h.percentile(0.95) == 100
+    assert h.percentile(0.0) == 1
+
+
+def test_percentiles_never_exceed_the_largest_sample():
+    h = histogram([3, 3, 3])
+    assert h.percentile(0.5) == 3
+    assert h.percentile(0.99) == 3
+
+
+def test_samples_on_a_bound_land_in_that_bucket():
+    h = histogram([1, 1.0001, 0.05])
+    assert h.to_dict()["buckets"] == {"<=0.1": 1, "<=1": 1, "<=2.5": 1}
+
+
+def test_overflow_bucket_reports_the_maximum():
+    h = histogram([5, LATENCY_BUCKETS_MS[-1] * 2])
+    data = h.to_dict()
+    assert data["overflow"] == 1
+    assert h.percentile(0.99) == LATENCY_BUCKETS_MS[-1] * 2
+    assert h.percentile(0.5) == 5
+
+
+def test_to_dict_summary():
+    data = histogram([2, 4, 6]).to_dict()
+    assert (data["count"], data["total_ms"], data["mean_ms"], data["max_ms"]) == (3, 12, 4, 6)
+    assert data["p50_ms"] == 5
+    empty = LatencyHistogram().to_dict()
+    assert (empty["count"], empty["mean_ms"], empty["p99_ms"], empty["buckets"]) == (0, 0.0, 0.0, {})
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    assert profiler.timer("a") is profiler.timer("b")
+    with profiler.timer("a"):
+        pass
+    profiler.record("a", 1.0)
+    profiler.count("n")
+    assert profiler.report()["counters"] == {} and profiler.report()["timings"] == {}
+    assert profiler.timing("a") is None
+
+
+def test_enabled_profiler_times_counts_and_dumps(tmp_path):
+    profiler = Profiler(enabled=True, report_path=str(tmp_path / "report.json"))
+    with profiler.timer("render"):
+        pass
+    profiler.record("render", 0.002)
+    profiler.count("hits")
+    profiler.count("hits", 4)
+    assert profiler.timing("render")["count"] == 2
+    assert profiler.timing("render")["max_ms"] == 2
+
+    path = profiler.dump(extra={"cache": {"entries": 3}})
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["counters"] == {"hits": 5}
+    assert report["timings"]["render"]["count"] == 2
+    assert report["cache"] == {"entries": 3}
+
+    profiler.reset()
+    assert profiler.report()["counters"] == {} and profiler.timing("render") is None
+
+
+def test_timer_records_even_when_the_block_raises():
+    profiler = Profiler(enabled=True)
+    with pytest.raises(RuntimeError):
+        with profiler.timer("save"):
+            raise RuntimeError("disk full")
+    assert profiler.timing("save")["count"] == 1
+
+
+def test_concurrent_recording_loses_nothing():
+    profiler = Profiler(enabled=True)
+
+    def worker():
+        for _ in range(5000):
+            profiler.record("op", 0.001)
+            profiler.count("op")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.timing("op")["count"] == 20000
+    assert profiler.report()["counters"]["op"] == 20000
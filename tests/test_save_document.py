@@ -0,0 +1,147 @@
+import os
+import threading
+
+import fitz
+import pytest
+
+from esign_core import Placement, SaveCancelled, partial_path, save_document, sign_pdf
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"Page {i}")
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class CancelAfter:
+    # Reports cancelled from the nth check on, to land between specific steps of a save.
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def placements():
+    return [Placement(f"Jane Doe {page}", "signature", 100, 100, 18, "#3b82f6", page) for page in range(3)]
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".part")]
+
+
+def test_cancel_before_stamping_writes_nothing(pdf, tmp_path):
+    original = read(pdf)
+    cancel = threading.Event()
+    cancel.set()
+    out = str(tmp_path / "signed.pdf")
+    with pytest.raises(SaveCancelled):
+        sign_pdf(pdf, placements(), out, cancel=cancel)
+    assert read(pdf) == original
+    assert not os.path.exists(out)
+    assert leftovers(tmp_path) == []
+
+
+def test_cancel_between_pages(pdf, tmp_path):
+    original = read(pdf)
+    cancel = threading.Event()
+    stamped = []
+
+    def progress(stage, done, total):
+        stamped.append(done)
+        cancel.set()
+
+    out = str(tmp_path / "signed.pdf")
+    with pytest.raises(SaveCancelled):
+        sign_pdf(pdf, placements(), out, progress=progress, cancel=cancel)
+    assert stamped == [1]
+    assert read(pdf) == original
+    assert not os.path.exists(out)
+    assert leftovers(tmp_path) == []
+
+
+@pytest.mark.parametrize("profile", ["fast", "compact"])
+def test_cancel_after_the_side_file_is_written_removes_it(pdf, tmp_path, monkeypatch, profile):
+    written = []
+    save = fitz.Document.save
+
+    def recording_save(doc, path, **options):
+        save(doc, path, **options)
+        written.append(os.path.getsize(path))
+
+    monkeypatch.setattr(fitz.Document, "save", recording_save)
+    out = str(tmp_path / "signed.pdf")
+    with open(out, "wb") as f:
+        f.write(b"previous output")
+    # Three page checks and the one before saving pass; the one before os.replace fires.
+    with pytest.raises(SaveCancelled):
+        sign_pdf(pdf, placements(), out, cancel=CancelAfter(4), profile=profile)
+    assert len(written) == 1 and written[0] > 0
+    assert read(out) == b"previous output"
+    assert leftovers(tmp_path) == []
+
+
+def test_failed_write_removes_the_side_file(pdf, tmp_path, monkeypatch):
+    out = str(tmp_path / "signed.pdf")
+
+    def torn_save(doc, path, **options):
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.7 half written")
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(fitz.Document, "save", torn_save)
+    with pytest.raises(RuntimeError):
+        sign_pdf(pdf, placements(), out)
+    assert not os.path.exists(out)
+    assert not os.path.exists(partial_path(out))
+
+
+def test_full_save_replaces_the_output(pdf, tmp_path):
+    out = str(tmp_path / "signed.pdf")
+    sign_pdf(pdf, placements(), out)
+    assert leftovers(tmp_path) == []
+    with fitz.open(out) as doc:
+        assert [page.get_text().count("Jane Doe") for page in doc] == [1, 1, 1]
+
+
+def test_incremental_save_of_an_unmodified_document_round_trips(pdf):
+    original = read(pdf)
+    doc = fitz.open(pdf)
+    save_document(doc, pdf, incremental=True)
+    doc.close()
+
+    saved = read(pdf)
+    assert saved.startswith(original)
+    with fitz.open(pdf) as doc:
+        assert doc.page_count == 3
+        assert [page.get_text().strip() for page in doc] == ["Page 0", "Page 1", "Page 2"]
+        assert doc.can_save_incrementally()
+
+
+def test_incremental_save_appends_the_stamped_pages(pdf):
+    original = read(pdf)
+    sign_pdf(pdf, placements(), pdf, incremental=True)
+    assert read(pdf).startswith(original)
+    with fitz.open(pdf) as doc:
+        assert "Jane Doe 2" in doc[2].get_text()
+
+
+def test_incremental_save_to_another_file_is_refused(pdf, tmp_path):
+    doc = fitz.open(pdf)
+    try:
+        with pytest.raises(ValueError):
+            save_document(doc, str(tmp_path / "copy.pdf"), incremental=True)
+    finally:
+        doc.close()
+    assert leftovers(tmp_path) == []
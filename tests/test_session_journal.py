@@ -0,0 +1,245 @@
+import os
+
+import fitz
+import pytest
+
+from esign_core import Placement, PlacementStore, SessionJournal, journal_path
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page()
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def add(journal, store, text, x=10, y=20, page=0):
+    item_id = store.add(Placement(text, "signature", x, y, 18, "#3b82f6", page))
+    journal.record_add(store, item_id)
+    return item_id
+
+
+def move(journal, store, item_id, x, y, page=None):
+    placement = store[item_id]
+    before = {"x": placement.x, "y": placement.y, "page": placement.page}
+    if page is not None and page != placement.page:
+        store.move(item_id, page)
+    placement.x, placement.y = x, y
+    journal.record_change(store, "move", item_id, before)
+
+
+def delete(journal, store, item_id):
+    journal.record_delete(store, item_id, store.remove(item_id))
+
+
+def reopen(pdf, **kwargs):
+    journal = SessionJournal(pdf, **kwargs)
+    store = PlacementStore()
+    restored = journal.restore(store)
+    return journal, store, restored
+
+
+def state(store):
+    return sorted((item_id, p.text, p.x, p.y, p.page) for item_id, p in store.items.items())
+
+
+def test_restore_replays_adds_moves_and_deletes(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    a = add(journal, store, "A")
+    b = add(journal, store, "B")
+    move(journal, store, a, 100, 200, page=2)
+    delete(journal, store, b)
+    journal.close()
+
+    journal, restored_store, restored = reopen(pdf)
+    assert restored == 1
+    assert state(restored_store) == state(store) == [(a, "A", 100, 200, 2)]
+    assert restored_store.count_on_page(2) == 1
+    assert restored_store.next_id == store.next_id
+
+
+def test_restore_after_undo_and_redo(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    a = add(journal, store, "A")
+    b = add(journal, store, "B")
+    move(journal, store, a, 50, 60)
+    assert journal.undo(store)["op"] == "move"
+    assert journal.undo(store)["op"] == "add"
+    assert journal.redo(store)["op"] == "add"
+    journal.close()
+
+    journal, restored_store, _ = reopen(pdf)
+    assert state(restored_store) == state(store) == [(a, "A", 10, 20, 0), (b, "B", 10, 20, 0)]
+    assert journal.can_undo()
+    journal.undo(restored_store)
+    assert state(restored_store) == [(a, "A", 10, 20, 0)]
+
+
+def test_new_edit_after_undo_discards_the_redo_tail(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    add(journal, store, "B")
+    journal.undo(store)
+    add(journal, store, "C")
+    assert not journal.can_redo()
+    journal.close()
+
+    _, restored_store, _ = reopen(pdf)
+    assert [p.text for p in restored_store] == ["A", "C"]
+
+
+def test_compaction_drops_the_redo_tail_for_good(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    b = add(journal, store, "B")
+    move(journal, store, b, 300, 300)
+    journal.undo(store)
+    journal.undo(store)
+    assert journal.can_redo()
+    journal.close(store)
+
+    assert not journal.can_redo()
+    with open(journal.path, encoding="utf-8") as f:
+        text = f.read()
+    assert '"B"' not in text and "undo" not in text and "redo" not in text
+
+    journal, store, _ = reopen(pdf)
+    assert [p.text for p in store] == ["A"]
+    assert not journal.can_redo()
+    assert journal.redo(store) is None
+    add(journal, store, "C")
+    journal.undo(store)
+    journal.redo(store)
+    journal.close(store)
+
+    journal, store, _ = reopen(pdf)
+    assert [p.text for p in store] == ["A", "C"]
+
+
+def test_compaction_keeps_only_recent_undo_steps(pdf):
+    journal, store = SessionJournal(pdf, compact_every=8, keep_history=2), PlacementStore()
+    for text in "ABCDEFGHIJ":
+        add(journal, store, text)
+    assert journal.lines < 8
+
+    journal, store, _ = reopen(pdf, keep_history=2)
+    assert [p.text for p in store] == list("ABCDEFGHIJ")
+    assert journal.undo(store) and journal.undo(store)
+    assert journal.undo(store) is None
+    assert [p.text for p in store] == list("ABCDEFGH")
+
+
+def test_torn_last_line_is_skipped_and_rewritten(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    add(journal, store, "B")
+    journal.close()
+    with open(journal_path(pdf), "a", encoding="utf-8") as f:
+        f.write('{"op":"add","id":9,"placement":{"text":"C"')
+
+    journal, store, restored = reopen(pdf)
+    assert restored == 2
+    assert [p.text for p in store] == ["A", "B"]
+    with open(journal.path, encoding="utf-8") as f:
+        assert f.read().endswith("\n")
+
+    add(journal, store, "D")
+    journal.close()
+    _, store, _ = reopen(pdf)
+    assert [p.text for p in store] == ["A", "B", "D"]
+
+
+def test_journal_for_a_changed_pdf_is_set_aside(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    journal.close()
+    with open(pdf, "ab") as f:
+        f.write(b"\n% changed elsewhere\n")
+
+    journal, store, restored = reopen(pdf)
+    assert restored == 0 and len(store) == 0
+    assert os.path.exists(journal.path + ".bad")
+    assert not os.path.exists(journal.path)
+
+
+def test_reset_forgets_everything_and_starts_a_fresh_file(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    journal.undo(store)
+    journal.reset()
+    assert not os.path.exists(journal.path)
+    assert not journal.can_undo() and not journal.can_redo()
+
+    store.clear()
+    add(journal, store, "B")
+    journal.close()
+    _, store, restored = reopen(pdf)
+    assert restored == 1
+    assert [p.text for p in store] == ["B"]
+
+
+def test_empty_session_leaves_no_file(pdf):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    a = add(journal, store, "A")
+    delete(journal, store, a)
+    journal.undo(store)
+    journal.undo(store)
+    journal.close(store)
+    assert not os.path.exists(journal.path)
+
+
+def write_journal(pdf, *lines):
+    journal, store = SessionJournal(pdf), PlacementStore()
+    add(journal, store, "A")
+    journal.close()
+    with open(journal.path, encoding="utf-8") as f:
+        header, first = f.readline(), f.readline()
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.write("".join(line.format(header=header.strip(), first=first.strip()) + "\n" for line in lines))
+    return journal.path
+
+
+@pytest.mark.parametrize("lines", [
+    ["[1, 2]"],
+    ["7"],
+    ['"journal"'],
+    ['{{"journal": 1, "pdf": [1]}}'],
+    ["{header}", "{first}", "[1]"],
+    ["{header}", "{first}", "42"],
+    ["{header}", "{first}", '"add"'],
+    ["{header}", "{first}", '{{"id": 1}}'],
+    ["{header}", "{first}", '{{"op": "move", "id": 1, "before": {{"x": 1}}, "after": {{"colour": 2}}}}'],
+    ["{header}", "{first}", '{{"op": "base", "items": 5}}'],
+    ["{header}", '{{"op": "undo"}}'],
+    ["{header}", "{first}", '{{"op": "redo"}}'],
+])
+def test_malformed_journal_is_set_aside(pdf, lines):
+    path = write_journal(pdf, *lines)
+
+    journal, store, restored = reopen(pdf)
+    assert restored == 0 and len(store) == 0
+    assert not journal.can_undo() and not journal.can_redo()
+    assert os.path.exists(path + ".bad")
+    assert not os.path.exists(path)
+
+
+def test_journal_that_cannot_be_set_aside_is_overwritten(pdf, monkeypatch):
+    path = write_journal(pdf, "{header}", "{first}", "[1]")
+
+    def refuse(src, dst):
+        raise PermissionError(13, "Permission denied", dst)
+
+    monkeypatch.setattr(os, "replace", refuse)
+    journal, store, restored = reopen(pdf)
+    monkeypatch.undo()
+    assert restored == 0 and len(store) == 0
+    assert not os.path.exists(path + ".bad")
+
+    add(journal, store, "B")
+    journal.close()
+    _, store, _ = reopen(pdf)
+    assert [p.text for p in store] == ["B"]
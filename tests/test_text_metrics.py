@@ -0,0 +1,69 @@
+import threading
+
+import fitz
+
+from esign_core import TextMetrics, pdf_fontname
+
+
+def counting(value, calls):
+    def compute():
+        calls.append(value)
+        return value
+    return compute
+
+
+def test_lookup_computes_once_per_key():
+    metrics, calls = TextMetrics(), []
+    assert metrics.lookup("a", counting(1.5, calls)) == 1.5
+    assert metrics.lookup("a", counting(9.9, calls)) == 1.5
+    assert calls == [1.5]
+    assert metrics.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_zero_width_results_are_cached_too():
+    metrics, calls = TextMetrics(), []
+    metrics.lookup("", counting(0.0, calls))
+    metrics.lookup("", counting(0.0, calls))
+    assert calls == [0.0]
+
+
+def test_eviction_keeps_the_cache_at_its_bound_and_drops_the_least_recently_used():
+    metrics = TextMetrics(max_entries=3)
+    for key in "abc":
+        metrics.lookup(key, lambda: 1.0)
+    metrics.lookup("a", lambda: 1.0)
+    metrics.lookup("d", lambda: 1.0)
+    assert list(metrics.entries) == ["c", "a", "d"]
+
+    for i in range(100):
+        metrics.lookup(i, lambda: 1.0)
+        assert len(metrics.entries) <= 3
+    assert list(metrics.entries) == [97, 98, 99]
+    assert metrics.stats()["misses"] == 104
+
+
+def test_pdf_width_matches_mupdf_and_keys_on_type_and_size():
+    metrics = TextMetrics()
+    expected = fitz.get_text_length("Jane Doe", fontname=pdf_fontname("signature"), fontsize=18)
+    assert metrics.pdf_width("Jane Doe", "signature", 18) == expected
+    metrics.pdf_width("Jane Doe", "signature", 18)
+    metrics.pdf_width("Jane Doe", "text", 18)
+    metrics.pdf_width("Jane Doe", "signature", 12)
+    assert metrics.stats() == {"hits": 1, "misses": 3, "entries": 3}
+
+
+def test_shared_between_threads_without_exceeding_the_bound():
+    metrics = TextMetrics(max_entries=50)
+
+    def worker(offset):
+        for i in range(2000):
+            key = (offset + i) % 120
+            assert metrics.lookup(key, lambda: float(key)) == float(key)
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(metrics.entries) <= 50
+    assert metrics.hits + metrics.misses == 8000
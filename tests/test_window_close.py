@@ -0,0 +1,77 @@
+import json
+
+import fitz
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+import pdf_esign
+from esign_core import journal_path, profiler
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("needs a display")
+    root.withdraw()
+    yield root
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def close_window(root):
+    # Invokes whatever the window manager's close button would.
+    root.tk.call(root.protocol("WM_DELETE_WINDOW"))
+
+
+def assert_destroyed(root):
+    with pytest.raises(tk.TclError):
+        root.winfo_exists()
+
+
+def test_window_close_writes_the_report_and_closes_the_journal(root, pdf, tmp_path, monkeypatch):
+    report = tmp_path / "profile.json"
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "report_path", str(report))
+    app = pdf_esign.LivePDFESign(root)
+    app.open_pdf(pdf)
+    app.add_signature_at_center("Jane Doe", "signature")
+    root.update()
+
+    close_window(root)
+
+    assert_destroyed(root)
+    assert app.journal is None
+    assert "timings" in json.loads(report.read_text())
+    with open(journal_path(pdf), encoding="utf-8") as f:
+        assert "Jane Doe" in f.read()
+    profiler.reset()
+
+
+def test_window_close_waits_for_a_running_save(root, pdf, monkeypatch):
+    monkeypatch.setattr(pdf_esign.messagebox, "askyesno", lambda *args, **kwargs: True)
+    app = pdf_esign.LivePDFESign(root)
+    app.open_pdf(pdf)
+    app.add_signature_at_center("Jane Doe", "signature")
+    app.save_pdf_in_place()
+    job = app.save_job
+    assert job is not None
+
+    close_window(root)
+
+    assert_destroyed(root)
+    assert not job.thread.is_alive()
@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+import pytest
+
+import esign_core
+from esign_core import WordIndex, file_sha256, load_anchor_rules, load_word_index, prune_word_index_cache
+
+
+def make_pdf(path, lines):
+    doc = fitz.open()
+    for text in lines:
+        doc.new_page().insert_text((72, 100), text, fontsize=12)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def refuse_build(doc):
+    raise AssertionError("index was rebuilt instead of read from the cache")
+
+
+def test_first_load_builds_and_caches_by_content_hash(tmp_path, cache_dir):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____", "Date: ____"])
+    index = load_word_index(pdf, cache_dir=cache_dir)
+    assert index.page_count == 2
+    assert [page for page, _ in index.find("date:")] == [1]
+    assert os.listdir(cache_dir) == [file_sha256(pdf) + ".json"]
+
+
+def test_same_content_hits_the_cache_even_under_another_name(tmp_path, cache_dir, monkeypatch):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____"])
+    built = load_word_index(pdf, cache_dir=cache_dir)
+    copy = str(tmp_path / "renamed.pdf")
+    shutil.copyfile(pdf, copy)
+    monkeypatch.setattr(WordIndex, "build", staticmethod(refuse_build))
+
+    cached = load_word_index(copy, cache_dir=cache_dir)
+    assert cached.pages == built.pages
+    assert cached.find("Signature") == built.find("Signature")
+
+
+def test_edited_pdf_misses_the_stale_cache(tmp_path, cache_dir):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____"])
+    load_word_index(pdf, cache_dir=cache_dir)
+    make_pdf(pdf, ["Witness: ____"])
+
+    index = load_word_index(pdf, cache_dir=cache_dir)
+    assert index.find("Witness")
+    assert not index.find("Signature")
+    assert len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.parametrize("content", ["not json", '{"version": 0, "pages": []}', '{"version": 1}'])
+def test_unreadable_or_old_cache_entry_is_rebuilt(tmp_path, cache_dir, content):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____"])
+    os.makedirs(cache_dir)
+    cache_path = os.path.join(cache_dir, file_sha256(pdf) + ".json")
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    index = load_word_index(pdf, cache_dir=cache_dir)
+    assert index.find("Signature")
+    with open(cache_path, encoding="utf-8") as f:
+        assert WordIndex.from_dict(json.load(f)).pages == index.pages
+
+
+def test_unwritable_cache_still_returns_the_index(tmp_path):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____"])
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert load_word_index(pdf, cache_dir=str(blocker / "cache")).find("Signature")
+
+
+def write_entry(cache_dir, name, size, age):
+    path = os.path.join(cache_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, ns=(0, (1_000_000 - age) * 1_000_000_000))
+    return path
+
+
+def test_prune_removes_least_recently_used_entries_down_to_80_percent(tmp_path):
+    cache_dir = str(tmp_path)
+    for age in range(10):
+        write_entry(cache_dir, f"{age}.json", 100, age)
+    assert prune_word_index_cache(cache_dir, 1000) == 0
+    assert len(os.listdir(cache_dir)) == 10
+
+    assert prune_word_index_cache(cache_dir, 900) == 3
+    assert sorted(os.listdir(cache_dir)) == [f"{age}.json" for age in range(7)]
+
+
+def test_prune_tolerates_a_missing_directory(tmp_path):
+    assert prune_word_index_cache(str(tmp_path / "missing"), 0) == 0
+
+
+def test_cache_hits_keep_entries_alive_under_the_cap(tmp_path, cache_dir, monkeypatch):
+    pdfs = [make_pdf(tmp_path / f"{i}.pdf", [f"Signature {i}: ____"]) for i in range(4)]
+    entries = [os.path.join(cache_dir, file_sha256(pdf) + ".json") for pdf in pdfs]
+    for age, pdf in enumerate(pdfs[:3]):
+        load_word_index(pdf, cache_dir=cache_dir)
+        os.utime(entries[age], ns=(0, (age + 1) * 1_000_000_000))
+    with monkeypatch.context() as patch:
+        patch.setattr(WordIndex, "build", staticmethod(refuse_build))
+        load_word_index(pdfs[0], cache_dir=cache_dir)
+
+    # Room for three entries but not four: the write of a fourth evicts the least recently used one.
+    cap = int(max(os.path.getsize(path) for path in entries[:3]) * 3.9)
+    monkeypatch.setattr(esign_core, "WORD_INDEX_PRUNE_EVERY", 1)
+    load_word_index(pdfs[3], cache_dir=cache_dir, max_bytes=cap)
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(entries[i]) for i in (0, 2, 3))
+
+
+def test_cache_limit_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("ESIGN_CACHE_MAX_MB", "1.5")
+    assert esign_core.word_index_cache_limit() == 1536 * 1024
+    monkeypatch.setenv("ESIGN_CACHE_MAX_MB", "lots")
+    assert esign_core.word_index_cache_limit() == esign_core.WORD_INDEX_CACHE_MB * 1024 * 1024
+
+
+def test_concurrent_writers_of_the_same_hash_leave_one_valid_entry(tmp_path, cache_dir):
+    pdf = make_pdf(tmp_path / "a.pdf", ["Signature: ____"] * 20)
+    expected = load_word_index(pdf, cache_dir=str(tmp_path / "reference"))
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = list(executor.map(load_word_index, [pdf] * 16, [None] * 16, [cache_dir] * 16))
+    assert all(index.pages == expected.pages for index in results)
+    assert os.listdir(cache_dir) == [file_sha256(pdf) + ".json"]
+    with open(os.path.join(cache_dir, file_sha256(pdf) + ".json"), encoding="utf-8") as f:
+        assert WordIndex.from_dict(json.load(f)).pages == expected.pages
+
+
+@pytest.mark.parametrize("content", ['{"rules": 5}', '["anchor"]', '[{"text": "x", "type": "text"}]', "[{"])
+def test_badly_shaped_rules_raise_what_the_dialog_catches(tmp_path, content):
+    path = tmp_path / "rules.json"
+    path.write_text(content)
+    with pytest.raises((OSError, ValueError, TypeError, KeyError, AttributeError)):
+        load_anchor_rules(str(path))